@@ -0,0 +1,132 @@
+"""
+Requests/sec of the API at several concurrency levels.
+
+Each level runs ``--duration`` seconds of closed-loop traffic: N client threads
+each send the next request as soon as the previous one returns. Responses are
+fetched with ``Cache-Control: no-cache`` and without ``If-None-Match``, so
+repeat queries are not answered by 304s (the server-side response cache still
+applies; set RESPONSE_CACHE_BACKEND=off on the server to measure raw handlers).
+
+Usage:
+    python bench/api_throughput.py --url http://localhost:8000 --out before.json
+    # ... switch branches / restart the server ...
+    python bench/api_throughput.py --url http://localhost:8000 --out after.json --compare before.json
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+
+# (method, path, JSON body) requests cycled by each client
+DEFAULT_REQUESTS = [
+    ("GET", "/team/search?q=ars", None),
+    ("GET", "/team/search?q=real", None),
+    ("GET", "/players/search?q=saka", None),
+    ("GET", "/players/search/aggregate?q=son", None),
+    ("GET", "/players/search/aggregate?q=mart", None),
+]
+
+
+def _send(base: str, method: str, path: str, body) -> int:
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base + path, data=data, method=method)
+    req.add_header("Cache-Control", "no-cache")
+    if data is not None:
+        req.add_header("Content-Type", "application/json")
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def run_level(base: str, requests: list, concurrency: int, duration: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(seed: int):
+        nonlocal errors
+        rng = random.Random(seed)
+        local, bad = [], 0
+        while time.perf_counter() < stop_at:
+            method, path, body = rng.choice(requests)
+            t0 = time.perf_counter()
+            try:
+                status = _send(base, method, path, body)
+            except Exception:
+                status = 0
+            local.append(time.perf_counter() - t0)
+            bad += status >= 400 or status == 0
+        with lock:
+            latencies.extend(local)
+            errors += bad
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Measure API requests/sec at several concurrency levels")
+    ap.add_argument("--url", default="http://localhost:8000")
+    ap.add_argument("--concurrency", default="1,16,64", help="Comma-separated client counts")
+    ap.add_argument("--duration", type=float, default=15.0, help="Seconds per level")
+    ap.add_argument("--requests", help="JSON file with [method, path, body] entries (default: search endpoints)")
+    ap.add_argument("--out", help="Write results to this JSON file")
+    ap.add_argument("--compare", help="Earlier --out file to print a before/after table against")
+    args = ap.parse_args()
+
+    requests = DEFAULT_REQUESTS
+    if args.requests:
+        with open(args.requests) as f:
+            requests = [tuple(r) for r in json.load(f)]
+
+    results = []
+    for n in (int(x) for x in args.concurrency.split(",")):
+        r = run_level(args.url, requests, n, args.duration)
+        results.append(r)
+        print(
+            f"c={n:<4} {r['rps']:8.1f} req/s  p50 {r['p50_ms']:7.1f} ms  p95 {r['p95_ms']:7.1f} ms"
+            f"  p99 {r['p99_ms']:7.1f} ms  errors {r['errors']}"
+        )
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"url": args.url, "duration": args.duration, "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            before = {r["concurrency"]: r for r in json.load(f)["results"]}
+        print("\nconcurrency   before req/s   after req/s   change")
+        for r in results:
+            b = before.get(r["concurrency"])
+            if b is None:
+                continue
+            change = (r["rps"] / b["rps"] - 1) * 100 if b["rps"] else float("nan")
+            print(f"{r['concurrency']:>11}   {b['rps']:12.1f}   {r['rps']:11.1f}   {change:+6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
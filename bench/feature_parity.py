@@ -0,0 +1,96 @@
+"""
+Parity check: inference features for historical seasons equal training features.
+
+Builds each league's training set with ``scripts/v1.py`` and rebuilds every row
+with ``simulator.build_feature_vector_baseline`` for the same league. Every
+model input must match (NaN matches NaN) and each league's ``columns.json`` must
+list the features the shared library builds, in order. Run it after touching
+``src/lib/ml/features`` or either caller, and before caching features.
+
+Usage:
+    python bench/feature_parity.py                 # all leagues, exit 1 on any mismatch
+    python bench/feature_parity.py --leagues pl    # one league
+    python bench/feature_parity.py --rtol 1e-9     # allow float summation-order differences
+    python bench/feature_parity.py --show 20       # print up to 20 mismatching cells
+"""
+import argparse
+import contextlib
+import io
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+
+def compare(train: pd.DataFrame, infer: pd.DataFrame, cols: list[str], rtol: float) -> pd.DataFrame:
+    """One row per (Season, Squad, feature) cell that differs."""
+    a = train[cols].to_numpy(dtype=float)
+    b = infer[cols].to_numpy(dtype=float)
+    same = (np.isnan(a) & np.isnan(b)) | np.isclose(a, b, rtol=rtol, atol=0.0)
+    rows, feats = np.nonzero(~same)
+    return pd.DataFrame({
+        "Season": train["Season"].to_numpy()[rows],
+        "Squad": train["Squad"].to_numpy()[rows],
+        "feature": np.asarray(cols)[feats],
+        "train": a[rows, feats],
+        "infer": b[rows, feats],
+    })
+
+
+def check_league(sim, v1, slug: str, rtol: float, show: int) -> bool:
+    from src.lib.ml.features.schema import NUM_FEATURES
+
+    lg = sim.LEAGUE_MODELS[slug]
+    ok = True
+    if list(lg.schema.numeric) != NUM_FEATURES:
+        print(f"[{slug}] columns.json lists {len(lg.schema.numeric)} features, the library builds "
+              f"{len(NUM_FEATURES)} (or in another order): retrain or regenerate {lg.models_dir / 'columns.json'}")
+        ok = False
+
+    with contextlib.redirect_stdout(io.StringIO()):         # v1 prints per-season progress
+        train = v1.build_team_season_dataset_multi(slug)
+    if train.empty:
+        print(f"[{slug}] no rows in the training set; nothing to compare.")
+        return False
+
+    infer = pd.concat([sim.build_feature_vector_baseline(r.Squad, r.Season, slug) for r in train.itertuples()],
+                      ignore_index=True)
+    cols = NUM_FEATURES
+    diffs = compare(train, infer, cols, rtol)
+
+    print(f"[{slug}] {len(train)} {lg.name} rows x {len(cols)} features, "
+          f"seasons {', '.join(sorted(train['Season'].unique()))}")
+    if diffs.empty:
+        print(f"[{slug}] training and inference features match")
+    else:
+        ok = False
+        print(f"[{slug}] {len(diffs)} mismatching cells in {diffs[['Season', 'Squad']].drop_duplicates().shape[0]} rows; "
+              f"by feature: {diffs['feature'].value_counts().to_dict()}")
+        if show:
+            print(diffs.head(show).to_string(index=False))
+    return ok
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--leagues", nargs="+", default=None, help="league slugs or names (default: all)")
+    ap.add_argument("--rtol", type=float, default=0.0, help="relative tolerance (default: exact)")
+    ap.add_argument("--show", type=int, default=10, help="mismatching cells to print per league")
+    args = ap.parse_args(argv)
+
+    from src.lib.ml.inference import simulator as sim
+    from src.lib.ml.leagues import LEAGUES, league_slug
+    from src.lib.ml.scripts import v1
+
+    slugs = [league_slug(l) for l in args.leagues] if args.leagues else list(LEAGUES)
+    results = [check_league(sim, v1, slug, args.rtol, args.show) for slug in slugs]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+Replay a traffic file against the API and report latency per endpoint.
+
+By default the app is started with uvicorn against the benchmark database
+(BENCH_DB_NAME, see bench/seed.py) and stopped afterwards; pass ``--url`` to
+target a server that is already running. Traffic comes from bench/traffic.py.
+
+For every endpoint the report has request count, throughput, error rate and
+p50/p95/p99 latency. ``--out`` saves it as JSON; ``--compare`` checks a run
+against an earlier file and exits 1 when p95 or the error rate regressed by
+more than ``--max-regression``.
+
+Usage:
+    python bench/seed.py && python bench/traffic.py
+    python bench/loadtest.py --concurrency 16 --duration 60 --out bench/results/base.json
+    python bench/loadtest.py --concurrency 16 --duration 60 --compare bench/results/base.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from api_throughput import _send
+from seed import ROOT, bench_db_name
+
+
+def load_traffic(path: str) -> list[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+class Server:
+    """uvicorn running the app against the benchmark database."""
+
+    def __init__(self, port: int, workers: int, env: dict[str, str]):
+        self.url = f"http://127.0.0.1:{port}"
+        self.port = port
+        self.workers = workers
+        self.env = env
+        self._proc: subprocess.Popen | None = None
+
+    def start(self, timeout: float) -> None:
+        env = {**os.environ, "DB_NAME": bench_db_name(), "PYTHONPATH": str(ROOT), **self.env}
+        self._proc = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.app.api.common.app:app",
+             "--host", "127.0.0.1", "--port", str(self.port), "--workers", str(self.workers),
+             "--log-level", "warning"],
+            cwd=ROOT, env=env,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._proc.poll() is not None:
+                raise RuntimeError(f"server exited with code {self._proc.returncode}")
+            try:
+                with urllib.request.urlopen(self.url + "/ready", timeout=2) as r:
+                    if r.status == 200:
+                        return
+            except Exception:
+                pass
+            time.sleep(0.5)
+        self.stop()
+        raise RuntimeError(f"server not ready after {timeout}s")
+
+    def stop(self) -> None:
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.terminate()
+            try:
+                self._proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+
+
+def replay(base: str, traffic: list[dict], concurrency: int, duration: float, seed: int = 0):
+    """Closed-loop replay: each client walks its own shuffled copy of the traffic."""
+    samples: list[tuple[str, float, int]] = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client(i: int):
+        order = traffic[:]
+        random.Random(seed + i).shuffle(order)
+        local = []
+        k = 0
+        while time.perf_counter() < stop_at:
+            r = order[k % len(order)]
+            k += 1
+            t0 = time.perf_counter()
+            try:
+                status = _send(base, r["method"], r["path"], r.get("body"))
+            except Exception:
+                status = 0
+            local.append((r["endpoint"], time.perf_counter() - t0, status))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - t0
+
+
+def _percentile(sorted_ms: list[float], p: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, int(p * len(sorted_ms)))]
+
+
+def summarize(samples: list[tuple[str, float, int]], elapsed: float) -> dict:
+    groups: dict[str, list[tuple[float, int]]] = defaultdict(list)
+    for endpoint, latency, status in samples:
+        groups[endpoint].append((latency, status))
+        groups["ALL"].append((latency, status))
+
+    out = {}
+    for endpoint, rows in sorted(groups.items()):
+        ms = sorted(lat * 1000 for lat, _ in rows)
+        errors = sum(1 for _, status in rows if status == 0 or status >= 400)
+        out[endpoint] = {
+            "requests": len(rows),
+            "rps": len(rows) / elapsed,
+            "error_rate": errors / len(rows),
+            "p50_ms": _percentile(ms, 0.50),
+            "p95_ms": _percentile(ms, 0.95),
+            "p99_ms": _percentile(ms, 0.99),
+            "statuses": {str(s): c for s, c in sorted(Counter(status for _, status in rows).items())},
+        }
+    return out
+
+
+def print_report(endpoints: dict) -> None:
+    print(f"{'endpoint':<28}{'reqs':>8}{'req/s':>9}{'err%':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, r in endpoints.items():
+        print(
+            f"{name:<28}{r['requests']:>8}{r['rps']:>9.1f}{r['error_rate'] * 100:>7.1f}"
+            f"{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+        )
+
+
+def compare(before: dict, after: dict, max_regression: float) -> list[str]:
+    """Endpoints whose p95 or error rate got worse by more than ``max_regression``."""
+    failures = []
+    print(f"\n{'endpoint':<28}{'p95 before':>12}{'p95 after':>12}{'change':>9}{'err before':>12}{'err after':>11}")
+    for name, a in after.items():
+        b = before.get(name)
+        if b is None:
+            continue
+        change = a["p95_ms"] / b["p95_ms"] - 1 if b["p95_ms"] else 0.0
+        print(
+            f"{name:<28}{b['p95_ms']:>12.1f}{a['p95_ms']:>12.1f}{change * 100:>+8.1f}%"
+            f"{b['error_rate'] * 100:>11.1f}%{a['error_rate'] * 100:>10.1f}%"
+        )
+        if change > max_regression:
+            failures.append(f"{name}: p95 {b['p95_ms']:.1f} -> {a['p95_ms']:.1f} ms")
+        if a["error_rate"] - b["error_rate"] > max_regression:
+            failures.append(f"{name}: error rate {b['error_rate']:.1%} -> {a['error_rate']:.1%}")
+    return failures
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load-test the API with recorded traffic")
+    ap.add_argument("--url", help="Target a running server instead of starting one")
+    ap.add_argument("--traffic", default=str(Path(__file__).resolve().parent / "traffic.jsonl"))
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--duration", type=float, default=60.0, help="Measured seconds")
+    ap.add_argument("--warmup", type=float, default=5.0, help="Unmeasured seconds before measuring")
+    ap.add_argument("--port", type=int, default=8055)
+    ap.add_argument("--workers", type=int, default=1, help="uvicorn workers for the started server")
+    ap.add_argument("--cache", action="store_true", help="Keep the response cache on (default: off)")
+    ap.add_argument("--ready-timeout", type=float, default=180.0)
+    ap.add_argument("--out", help="Save results as JSON")
+    ap.add_argument("--compare", help="Earlier --out file to check for regressions")
+    ap.add_argument("--max-regression", type=float, default=0.15, help="Allowed relative p95 increase")
+    args = ap.parse_args()
+
+    traffic = load_traffic(args.traffic)
+    server = None
+    base = args.url
+    if base is None:
+        server = Server(args.port, args.workers, {} if args.cache else {"RESPONSE_CACHE_BACKEND": "off"})
+        print(f"Starting server on {server.url} (database {bench_db_name()}) ...")
+        server.start(args.ready_timeout)
+        base = server.url
+
+    try:
+        if args.warmup > 0:
+            replay(base, traffic, args.concurrency, args.warmup, seed=1_000)
+        samples, elapsed = replay(base, traffic, args.concurrency, args.duration)
+    finally:
+        if server is not None:
+            server.stop()
+
+    endpoints = summarize(samples, elapsed)
+    print_report(endpoints)
+
+    result = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "url": base,
+        "traffic": args.traffic,
+        "concurrency": args.concurrency,
+        "duration": elapsed,
+        "response_cache": None if args.url else args.cache,   # unknown for an external server
+        "endpoints": endpoints,
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nSaved {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)["endpoints"]
+        failures = compare(before, endpoints, args.max_regression)
+        if failures:
+            print("\nRegressions:\n  " + "\n  ".join(failures))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
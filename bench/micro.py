@@ -0,0 +1,219 @@
+"""
+Micro-benchmarks for the simulator and feature-engineering hot paths.
+
+Every case runs on the bundled CSVs at the sizes the API and training script
+actually see (one league-season of players, one squad, three-season histories).
+Each case is timed with ``timeit``-style auto-ranging: the call count is chosen
+so one repeat takes at least ``--min-time`` seconds, and the median of
+``--repeat`` repeats is reported per call.
+
+A fixed calibration workload is timed right before every repeat, and
+``--check`` compares each case's median time relative to it. A machine that is
+uniformly slower than when the baseline was recorded (CPU steal, frequency
+scaling, another job) slows both equally and does not trip the gate. A slowdown
+also has to exceed ``--min-delta-ms`` to count, so sub-millisecond jitter on
+fast cases cannot fail it.
+
+Usage:
+    python bench/micro.py                         # run and print
+    python bench/micro.py -k swap                 # only cases whose name contains "swap"
+    python bench/micro.py --update                # rewrite bench/micro_baseline.json
+    python bench/micro.py --check                 # exit 1 if any case is >25% slower than baseline
+    python bench/micro.py --check --max-regression 10 --min-delta-ms 2
+
+Timings depend on the machine, so refresh the baseline (``--update``) on the
+machine that runs ``--check``.
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE = Path(__file__).resolve().parent / "micro_baseline.json"
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+SEASON = "2024-2025"
+TARGET = "2025-2026"
+TEAM = "Arsenal"
+INCOMING = "Mohamed Salah"
+
+
+def _sim():
+    from src.lib.ml.inference import simulator
+    simulator.warm_up()
+    return simulator
+
+
+def case_team_features_from_players():
+    sim = _sim()
+    players = sim.SEASONS.read(SEASON, sim.LEAGUE_NAME)
+    return lambda: sim._team_features_from_players(players)
+
+
+def case_apply_transfer_to_players():
+    sim = _sim()
+    players = sim.SEASONS.read(SEASON, sim.LEAGUE_NAME)
+    squad = players[players["Squad"] == TEAM].copy()
+    incoming = sim.SEASONS.read(SEASON, "")
+    incoming = incoming[incoming["Player"] == INCOMING].iloc[0]
+    leaving = squad.sort_values("Min", ascending=False)["Player"].iloc[0]
+    return lambda: sim.apply_transfer_to_players(squad, incoming, 2000, {leaving: 1500})
+
+
+def case_history_features():
+    from src.lib.ml.features.history import history_features
+    sim = _sim()
+    rng = np.random.default_rng(0)
+    # one /recommend scan: every Big-5 player as a candidate row (a 96-squad batch is too short to time)
+    hist = rng.normal(1.0, 0.3, size=(2800, 3, len(sim.HIST_METRICS)))
+    hist[rng.random(hist.shape) < 0.1] = np.nan
+    return lambda: history_features(hist, sim.HIST_METRICS)
+
+
+def case_build_feature_vector_with_swap():
+    sim = _sim()
+    return lambda: sim.build_feature_vector_with_swap(TEAM, TARGET, INCOMING, None, 2000, None)
+
+
+def case_predict_with_and_without_transfer():
+    sim = _sim()
+    return lambda: sim.predict_with_and_without_transfer(TEAM, TARGET, INCOMING, 2000)
+
+
+def _v1():
+    from src.lib.ml.scripts import v1
+    return v1
+
+
+def case_v1_build_team_features_from_players():
+    v1 = _v1()
+    players = v1.load_player_df_for_season(SEASON)
+    return lambda: v1.build_team_features_from_players(players)
+
+
+def case_v1_build_team_season_dataset_multi():
+    v1 = _v1()
+    return v1.build_team_season_dataset_multi
+
+
+CASES = {
+    name[len("case_"):]: fn for name, fn in globals().items() if name.startswith("case_") and callable(fn)
+}
+
+
+def _calibration():
+    """Fixed pandas/numpy workload of the same kind as the cases; only its speed matters."""
+    import pandas as pd
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"g": rng.integers(0, 100, 20_000), "x": rng.random(20_000), "y": rng.random(20_000)})
+    return lambda: (df.groupby("g")[["x", "y"]].sum(), np.sort(df["x"].to_numpy()))
+
+
+def _autorange(fn, min_time: float) -> int:
+    """Calls per repeat so one repeat takes at least ``min_time`` seconds."""
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time:
+            return number
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+
+
+def _time(fn, number: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return (time.perf_counter() - t0) / number
+
+
+def measure(fn, calib, repeat: int, min_time: float) -> tuple[float, float]:
+    """Median seconds per call over ``repeat`` repeats, and the median ratio to ``calib``.
+
+    Each repeat of ``fn`` directly follows a repeat of ``calib``, so both see the
+    same machine load.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()                                            # warm caches and lazy imports
+        number = _autorange(fn, min_time)
+        n_calib = _autorange(calib, min_time / 2)
+        secs, ratios = [], []
+        for _ in range(repeat):
+            c = _time(calib, n_calib)
+            t = _time(fn, number)
+            secs.append(t)
+            ratios.append(t / c)
+    return float(np.median(secs)), float(np.median(ratios))
+
+
+def _fmt(sec: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if sec >= scale:
+            return f"{sec / scale:8.2f} {unit}"
+    return f"{sec / 1e-9:8.0f} ns"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Micro-benchmarks for simulator and feature-engineering code")
+    ap.add_argument("-k", dest="filter", help="Only run cases whose name contains this string")
+    ap.add_argument("--repeat", type=int, default=9)
+    ap.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per repeat")
+    ap.add_argument("--baseline", default=str(BASELINE))
+    ap.add_argument("--update", action="store_true", help="Write results as the new baseline")
+    ap.add_argument("--check", action="store_true", help="Fail when a case regressed against the baseline")
+    ap.add_argument("--max-regression", type=float, default=25.0, help="Allowed slowdown in percent")
+    ap.add_argument("--min-delta-ms", type=float, default=1.0,
+                    help="Slowdowns smaller than this many milliseconds per call never fail --check")
+    args = ap.parse_args()
+
+    baseline = {}
+    if Path(args.baseline).exists():
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("cases", {})
+
+    results, failures = {}, []
+    calib = _calibration()
+    for name, setup in CASES.items():
+        if args.filter and args.filter not in name:
+            continue
+        with contextlib.redirect_stdout(io.StringIO()):
+            fn = setup()
+        sec, relative = measure(fn, calib, args.repeat, args.min_time)
+        results[name] = {"sec_per_call": sec, "relative": relative}
+
+        line = f"{name:<42}{_fmt(sec)}"
+        base = baseline.get(name, {})
+        if base.get("sec_per_call"):
+            # Machine-speed corrected when the baseline has a relative time
+            ratio = relative / base["relative"] if base.get("relative") else sec / base["sec_per_call"]
+            change = (ratio - 1) * 100
+            delta_ms = (ratio - 1) * base["sec_per_call"] * 1000
+            line += f"   baseline {_fmt(base['sec_per_call'])}  {change:+6.1f}%"
+            if change > args.max_regression and delta_ms > args.min_delta_ms:
+                failures.append(f"{name}: {change:+.1f}%, {delta_ms:+.2f} ms "
+                                f"(limit {args.max_regression:.0f}% and {args.min_delta_ms:g} ms)")
+        print(line)
+
+    if args.update:
+        merged = {**baseline, **results}
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": platform.platform(), "python": platform.python_version(), "cases": merged}, f, indent=2)
+        print(f"\nWrote {args.baseline}")
+
+    if args.check and failures:
+        print("\nRegressions:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+-- Tables the API reads, with the columns its queries use. Only for the
+-- benchmark database built by bench/seed.py; migrations run on top of this.
+
+DROP MATERIALIZED VIEW IF EXISTS player_summary_recent;
+DROP TABLE IF EXISTS player_season_summary;
+DROP TABLE IF EXISTS players;
+DROP TABLE IF EXISTS teams;
+DROP TABLE IF EXISTS schema_migrations;
+
+CREATE TABLE teams (
+    id            integer PRIMARY KEY,
+    name          text NOT NULL,
+    country       text,
+    league        text,
+    wins_2425     integer,
+    points_2425   integer,
+    position_2425 integer,
+    losses_2425   integer
+);
+
+CREATE TABLE players (
+    id          integer PRIMARY KEY,
+    name        text NOT NULL,
+    nation      text,
+    primary_pos text
+);
+
+CREATE TABLE player_season_summary (
+    player_id         integer NOT NULL REFERENCES players (id),
+    team_id           integer REFERENCES teams (id),
+    season            text NOT NULL,
+    season_start_year integer NOT NULL,
+    matches           integer,
+    goals             integer,
+    assists           integer,
+    clean_sheets      integer,
+    save_pct          double precision
+);
@@ -0,0 +1,184 @@
+"""
+Build a local benchmark database from the CSVs in src/lib/data.
+
+Creates ``players``, ``teams`` and ``player_season_summary`` (bench/schema.sql),
+loads them from the ``fbref_clean_*`` and ``*_team_clean`` files, then applies
+the repo's migrations and refreshes the materialized views, so the API runs
+against the same schema as production.
+
+Connection settings come from DB_HOST / DB_PORT / DB_USER / DB_PASS; the
+database is BENCH_DB_NAME (default ``transfermation_bench``) and is created if
+missing. Its tables are dropped and rebuilt on every run.
+
+Usage:
+    python bench/seed.py
+"""
+import argparse
+import io
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import psycopg2
+from dotenv import load_dotenv
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.lib.ml.leagues import LEAGUES
+
+DATA_DIR = ROOT / "src" / "lib" / "data"
+SCHEMA = Path(__file__).resolve().parent / "schema.sql"
+
+LEAGUE_COUNTRY = {
+    "Premier League": "England",
+    "La Liga": "Spain",
+    "Bundesliga": "Germany",
+    "Serie A": "Italy",
+    "Ligue 1": "France",
+}
+
+CURRENT_SEASON = "2024-2025"
+
+
+def bench_db_name() -> str:
+    return os.getenv("BENCH_DB_NAME", "transfermation_bench")
+
+
+def _int(s: pd.Series) -> pd.Series:
+    return pd.to_numeric(s, errors="coerce").round().astype("Int64")
+
+
+def load_teams() -> pd.DataFrame:
+    """One row per club; 2024-25 record from that season's table. Ids follow name order."""
+    rows = []
+    for f in sorted(DATA_DIR.glob("*_team_clean.csv")):
+        slug, season = f.stem[: -len("_team_clean")].split("_", 1)
+        league = LEAGUES.get(slug)
+        if league is None:
+            continue
+        df = pd.read_csv(f).sort_values(["Pts", "GD", "GF"], ascending=False).reset_index(drop=True)
+        df["league"] = league
+        df["season"] = season.replace("_", "-")
+        df["position"] = df.index + 1
+        rows.append(df[["Squad", "league", "season", "W", "Pts", "L", "position"]])
+    seasons = pd.concat(rows, ignore_index=True)
+
+    latest = seasons.sort_values("season").groupby("Squad").tail(1).set_index("Squad")
+    current = seasons[seasons["season"] == CURRENT_SEASON].set_index("Squad")
+    teams = pd.DataFrame({"name": sorted(latest.index)})
+    teams["id"] = range(1, len(teams) + 1)
+    teams["league"] = teams["name"].map(latest["league"])
+    teams["country"] = teams["league"].map(LEAGUE_COUNTRY)
+    teams["wins_2425"] = _int(teams["name"].map(current["W"]))
+    teams["points_2425"] = _int(teams["name"].map(current["Pts"]))
+    teams["position_2425"] = _int(teams["name"].map(current["position"]))
+    teams["losses_2425"] = _int(teams["name"].map(current["L"]))
+    return teams[["id", "name", "country", "league", "wins_2425", "points_2425", "position_2425", "losses_2425"]]
+
+
+def load_player_seasons() -> pd.DataFrame:
+    frames = [
+        pd.read_csv(p, usecols=["Player", "Nation", "Pos", "Squad", "Season", "MP", "Gls", "Ast", "CS", "Save%"])
+        for p in sorted(DATA_DIR.glob("fbref_clean_*.csv"))
+    ]
+    df = pd.concat(frames, ignore_index=True).sort_values("Season", kind="stable")
+    df["Nation"] = df["Nation"].fillna("").astype(str).str.split().str[-1].fillna("")
+    df["Pos"] = df["Pos"].astype(str).str.split(",").str[0]
+    return df
+
+
+def load_players(seasons: pd.DataFrame) -> pd.DataFrame:
+    """One row per (name, nation); ids follow that order, so they are stable across runs."""
+    players = (
+        seasons.groupby(["Player", "Nation"])["Pos"].last().reset_index()
+        .rename(columns={"Player": "name", "Nation": "nation", "Pos": "primary_pos"})
+    )
+    players["id"] = range(1, len(players) + 1)
+    return players[["id", "name", "nation", "primary_pos"]]
+
+
+def load_summary(seasons: pd.DataFrame, players: pd.DataFrame, teams: pd.DataFrame) -> pd.DataFrame:
+    pid = players.set_index(["name", "nation"])["id"]
+    tid = teams.set_index("name")["id"]
+    return pd.DataFrame({
+        "player_id": pid.reindex(pd.MultiIndex.from_arrays([seasons["Player"], seasons["Nation"]])).to_numpy(),
+        "team_id": _int(seasons["Squad"].map(tid)).to_numpy(),
+        "season": seasons["Season"].to_numpy(),
+        "season_start_year": seasons["Season"].str[:4].astype(int).to_numpy(),
+        "matches": _int(seasons["MP"]).to_numpy(),
+        "goals": _int(seasons["Gls"]).to_numpy(),
+        "assists": _int(seasons["Ast"]).to_numpy(),
+        "clean_sheets": _int(seasons["CS"]).to_numpy(),
+        "save_pct": pd.to_numeric(seasons["Save%"], errors="coerce").to_numpy(),
+    })
+
+
+def _copy(cur, table: str, df: pd.DataFrame) -> None:
+    buf = io.StringIO()
+    df.to_csv(buf, index=False, header=False, na_rep="\\N")
+    buf.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buf)
+
+
+def _connect(dbname: str):
+    return psycopg2.connect(
+        dbname=dbname,
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASS"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT", "5432"),
+    )
+
+
+def ensure_database(name: str) -> None:
+    conn = _connect("postgres")
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_database WHERE datname = %s;", (name,))
+            if cur.fetchone() is None:
+                cur.execute(f'CREATE DATABASE "{name}";')
+                print(f"Created database {name}")
+    finally:
+        conn.close()
+
+
+def main():
+    load_dotenv()
+    ap = argparse.ArgumentParser(description="Seed the benchmark database from src/lib/data")
+    ap.add_argument("--force", action="store_true", help="Allow BENCH_DB_NAME to equal DB_NAME")
+    args = ap.parse_args()
+
+    name = bench_db_name()
+    if name == os.getenv("DB_NAME") and not args.force:
+        sys.exit(f"BENCH_DB_NAME is the application database ({name}); its tables would be dropped. Use --force.")
+
+    teams = load_teams()
+    seasons = load_player_seasons()
+    players = load_players(seasons)
+    summary = load_summary(seasons, players, teams)
+
+    ensure_database(name)
+    conn = _connect(name)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(SCHEMA.read_text())
+            _copy(cur, "teams", teams)
+            _copy(cur, "players", players)
+            _copy(cur, "player_season_summary", summary)
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"Loaded {len(teams)} teams, {len(players)} players, {len(summary)} player-seasons into {name}")
+
+    env = {**os.environ, "DB_NAME": name}
+    for script in ("migrate.py", "refresh.py"):
+        subprocess.run([sys.executable, str(ROOT / "src" / "lib" / "db" / script)], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
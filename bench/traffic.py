@@ -0,0 +1,101 @@
+"""
+Generate a replayable traffic file for bench/loadtest.py.
+
+Mimics how the frontend uses the API: typing a name fires one search per
+keystroke, so most requests are short prefixes of real player and team names;
+a smaller share are ``/prediction/predict`` and ``/prediction/whatif`` calls
+for real Premier League squads. Player and team ids match bench/seed.py.
+
+Each output line is one request:
+    {"endpoint": "/team/search", "method": "GET", "path": "/team/search?q=ars"}
+    {"endpoint": "/prediction/whatif", "method": "POST", "path": "/prediction/whatif", "body": {...}}
+
+Usage:
+    python bench/traffic.py --sessions 400 --out bench/traffic.jsonl
+"""
+import argparse
+import json
+import random
+from urllib.parse import quote
+
+import pandas as pd
+
+from seed import CURRENT_SEASON, DATA_DIR, load_player_seasons, load_players, load_teams
+
+NEXT_SEASON = "2025-2026"
+
+
+def _prefixes(name: str, rng: random.Random) -> list[str]:
+    """Keystroke-by-keystroke prefixes, stopping once the user would pick a result."""
+    stop = min(len(name), rng.randint(3, 8))
+    return [name[:i] for i in range(2, stop + 1) if name[:i].strip()]
+
+
+def _get(endpoint: str, q: str) -> dict:
+    return {"endpoint": endpoint, "method": "GET", "path": f"{endpoint}?q={quote(q)}"}
+
+
+def _post(endpoint: str, body: dict) -> dict:
+    return {"endpoint": endpoint, "method": "POST", "path": endpoint, "body": body}
+
+
+def build(sessions: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    teams = load_teams()
+    seasons = load_player_seasons()
+    players = load_players(seasons)
+
+    current = seasons[seasons["Season"] == CURRENT_SEASON]
+    pl_teams = teams.loc[teams["league"] == "Premier League", "name"].tolist()
+    merged = pd.read_csv(DATA_DIR / f"fbref_merged_{CURRENT_SEASON.replace('-', '_')}.csv", usecols=["Player", "Squad", "Min"])
+    squads = {t: merged[(merged["Squad"] == t) & (merged["Min"] >= 450)] for t in pl_teams}
+
+    out = []
+    for _ in range(sessions):
+        # Pick a destination club, then an incoming player, as a user would
+        team = rng.choice(pl_teams)
+        out += [_get("/team/search", p) for p in _prefixes(team, rng)]
+
+        row = current.sample(1, random_state=rng.randint(0, 2**31 - 1)).iloc[0]
+        out += [_get("/players/search/aggregate", p) for p in _prefixes(row["Player"], rng)]
+        if rng.random() < 0.3:
+            out.append(_get("/players/search", row["Player"]))
+
+        player_id = players.loc[(players["name"] == row["Player"]) & (players["nation"] == row["Nation"]), "id"]
+        team_id = teams.loc[teams["name"] == team, "id"]
+        if rng.random() < 0.5 and len(player_id) and len(team_id):
+            out.append(_post("/prediction/predict", {"player_id": int(player_id.iloc[0]), "team_id": int(team_id.iloc[0])}))
+
+        squad = squads[team]
+        if len(squad):
+            leaving = squad.sample(1, random_state=rng.randint(0, 2**31 - 1)).iloc[0]
+            minutes = int(min(leaving["Min"], rng.choice([900, 1800, 2700])))
+            out.append(_post("/prediction/whatif", {
+                "team_name": team,
+                "incoming_player_name": row["Player"],
+                "target_season": NEXT_SEASON,
+                "projected_minutes_in": minutes,
+                "outgoing_minutes": {leaving["Player"]: minutes},
+                "cross_league_scale": 1.0,
+            }))
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate benchmark traffic from src/lib/data")
+    ap.add_argument("--sessions", type=int, default=400, help="Simulated user sessions")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="bench/traffic.jsonl")
+    args = ap.parse_args()
+
+    lines = build(args.sessions, args.seed)
+    with open(args.out, "w") as f:
+        for r in lines:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    counts = pd.Series([r["endpoint"] for r in lines]).value_counts()
+    print(f"Wrote {len(lines)} requests to {args.out}")
+    print(counts.to_string())
+
+
+if __name__ == "__main__":
+    main()
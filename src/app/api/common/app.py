@@ -1,11 +1,48 @@
-from fastapi import FastAPI
+import os
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from .autocomplete import AUTOCOMPLETE
+from .cache import RESPONSE_CACHE
+from .db import DatabaseUnavailable, init_pool, close_pool, init_async_pool, close_async_pool, pool_stats, get_conn
+from .models import MODELS
+from .scoring import shutdown_scoring
+from .warmup import WARMUP
 from ..players.search import router as players_router
 from ..teams.search import router as team_router
 from ..prediction.predict import router as prediction_router
+from ....lib import metrics
+
+# Set SERVER_TIMING=1 to send per-stage timings in a Server-Timing response header
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0").lower() in ("1", "true", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        init_pool()
+    except Exception as e:
+        # Keep serving; the pool retries opening on first checkout.
+        print(f"Warning: database pool not initialised at startup: {e}")
+    try:
+        await init_async_pool()
+    except Exception as e:
+        print(f"Warning: async database pool not initialised at startup: {e}")
+    MODELS.load_all()
+    WARMUP.start()
+    AUTOCOMPLETE.start()
+    yield
+    AUTOCOMPLETE.stop()
+    shutdown_scoring()
+    await close_async_pool()
+    close_pool()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -13,25 +50,72 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Cache", "Server-Timing"],
 )
 
+@app.middleware("http")
+async def record_timings(request: Request, call_next):
+    spans = metrics.start_request()
+    t0 = time.perf_counter()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+    finally:
+        elapsed = time.perf_counter() - t0
+        # Route template (e.g. /team/search), not the raw path, to keep label cardinality bounded
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.REQUEST_SECONDS.observe(elapsed, request.method, route, status)
+    if SERVER_TIMING:
+        response.headers["Server-Timing"] = metrics.server_timing(spans, elapsed)
+    return response
+
+@app.exception_handler(DatabaseUnavailable)
+async def database_unavailable(request: Request, exc: DatabaseUnavailable):
+    return JSONResponse({"detail": str(exc)}, status_code=503)
+
 app.include_router(players_router)
 app.include_router(team_router)
 app.include_router(prediction_router)
 
 @app.get("/health")
 def health() -> dict:
-    return {"status": "ok"}
+    """Liveness: always 200, with warm-up progress so a worker stuck retrying is visible."""
+    return {"status": "ok", "warmup": WARMUP.status, "warmup_error": WARMUP.error}
+
+@app.get("/ready")
+def ready():
+    """200 once models and season data are warm; 503 before (for load balancers)."""
+    body = {"ready": WARMUP.ready, "warmup": WARMUP.state(), "models": MODELS.status()}
+    return JSONResponse(body, status_code=200 if WARMUP.ready else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Request and stage latency histograms in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/db")
+def db_metrics() -> dict:
+    return pool_stats()
+
+@app.get("/metrics/cache")
+def cache_metrics() -> dict:
+    return RESPONSE_CACHE.stats()
+
+@app.get("/autocomplete/status")
+def autocomplete_status() -> dict:
+    return AUTOCOMPLETE.status()
+
+@app.get("/models")
+def models_status() -> dict:
+    return MODELS.status()
 
 @app.get("/test-db")
 def test_db():
     try:
-        from .db import get_conn
-        conn = get_conn()
-        with conn.cursor() as cur:
+        with get_conn() as conn, conn.cursor() as cur:
             cur.execute("SELECT COUNT(*) FROM players")
             count = cur.fetchone()[0]
-        conn.close()
         return {"status": "ok", "player_count": count}
     except Exception as e:
         return {"status": "error", "error": str(e)}
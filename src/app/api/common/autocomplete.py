@@ -0,0 +1,434 @@
+import bisect
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from datetime import date
+from pathlib import Path
+
+from psycopg2.extras import RealDictCursor
+
+from .db import DB_HOST, get_conn
+from .search import PLAYER_SUMMARY_COLUMNS, PLAYER_SUMMARY_LIVE, player_summary_ready
+from ....lib.ml.leagues import LEAGUES
+
+# Set AUTOCOMPLETE_INDEX=1 to serve typeahead from memory instead of Postgres
+AUTOCOMPLETE_INDEX = os.getenv("AUTOCOMPLETE_INDEX", "0").lower() in ("1", "true", "yes")
+# auto: database when DB_HOST is set (CSV if that fails), db, csv
+AUTOCOMPLETE_SOURCE = os.getenv("AUTOCOMPLETE_SOURCE", "auto").lower()
+AUTOCOMPLETE_REFRESH_SECS = float(os.getenv("AUTOCOMPLETE_REFRESH_SECS", "300"))
+
+DATA_DIR = Path(__file__).resolve().parents[4] / "src" / "lib" / "data"
+
+LEAGUE_COUNTRY = {
+    "Premier League": "England",
+    "La Liga": "Spain",
+    "Bundesliga": "Germany",
+    "Serie A": "Italy",
+    "Ligue 1": "France",
+}
+
+# Letters NFKD leaves alone but unaccent() folds
+_FOLD = str.maketrans({"ø": "o", "ł": "l", "đ": "d", "æ": "ae", "œ": "oe", "ı": "i", "ð": "d", "þ": "th"})
+
+
+def fold(s: str) -> str:
+    """Lowercase and strip accents, close to Postgres ``unaccent(lower(s))``."""
+    s = unicodedata.normalize("NFKD", str(s).casefold().translate(_FOLD))
+    return "".join(c for c in s if not unicodedata.combining(c))
+
+
+def tokens(s: str) -> list[str]:
+    return re.findall(r"[a-z0-9]+", fold(s))
+
+
+def _within(a: str, b: str, k: int) -> bool:
+    """Edit distance (adjacent swaps count as one edit) between ``a`` and ``b`` is at most ``k``."""
+    if abs(len(a) - len(b)) > k:
+        return False
+    prev2: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i]
+        for j in range(1, len(b) + 1):
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d = min(d, prev2[j - 2] + 1)
+            cur.append(d)
+        if min(cur) > k:
+            return False
+        prev2, prev = prev, cur
+    return prev[-1] <= k
+
+
+def _entry_hash(key, row: dict, name: str, weight: float) -> int:
+    raw = repr((key, sorted(row.items()), name, weight)).encode()
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "big")
+
+
+class PrefixIndex:
+    """Token index over one entity type (players or teams).
+
+    Every query token must match a token of the name, either as a prefix or,
+    for tokens of 4+ characters, within a small edit distance of a name token
+    with the same first letter. Results rank exact names first, then names that
+    start with the query, whole-token prefix matches, and fuzzy matches last;
+    ties go to the higher ``weight``.
+
+    ``digest`` is an order-independent hash of the contents (XOR of one hash
+    per entry), kept up to date by ``sync``: equal contents give equal digests
+    in every process, whatever order they were loaded in.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: dict = {}                       # key -> (row, folded name, distinct tokens, weight)
+        self._postings: dict[str, set] = {}         # token -> keys
+        self._vocab: list[str] | None = None        # sorted tokens, rebuilt lazily after changes
+        self._hashes: dict = {}                     # key -> entry hash
+        self.digest = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _add(self, key, row: dict, name: str, weight: float) -> None:
+        toks = tuple(dict.fromkeys(tokens(name)))
+        self._rows[key] = (row, " ".join(tokens(name)), toks, weight)
+        h = _entry_hash(key, row, name, weight)
+        self._hashes[key] = h
+        self.digest ^= h
+        for t in toks:
+            if t not in self._postings:
+                self._postings[t] = set()
+                self._vocab = None
+            self._postings[t].add(key)
+
+    def _remove(self, key) -> None:
+        entry = self._rows.pop(key, None)
+        if entry is None:
+            return
+        self.digest ^= self._hashes.pop(key)
+        for t in entry[2]:
+            keys = self._postings.get(t)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[t]
+                    self._vocab = None
+
+    def sync(self, entries: dict) -> tuple[int, int]:
+        """Apply ``{key: (row, name, weight)}`` as the new contents, touching only changed keys."""
+        with self._lock:
+            removed = [k for k in self._rows if k not in entries]
+            for k in removed:
+                self._remove(k)
+            changed = 0
+            for k, (row, name, weight) in entries.items():
+                cur = self._rows.get(k)
+                if cur is not None and cur[0] == row and cur[3] == weight:
+                    continue
+                self._remove(k)
+                self._add(k, row, name, weight)
+                changed += 1
+            return changed, len(removed)
+
+    def _vocabulary(self) -> list[str]:
+        if self._vocab is None:
+            self._vocab = sorted(self._postings)
+        return self._vocab
+
+    def _prefix_keys(self, t: str, vocab: list[str]) -> set:
+        out: set = set()
+        i = bisect.bisect_left(vocab, t)
+        while i < len(vocab) and vocab[i].startswith(t):
+            out |= self._postings[vocab[i]]
+            i += 1
+        return out
+
+    def _fuzzy_keys(self, t: str, vocab: list[str]) -> set:
+        out: set = set()
+        if len(t) < 4:
+            return out
+        k = 1 if len(t) < 6 else 2
+        lo = bisect.bisect_left(vocab, t[0])
+        hi = bisect.bisect_left(vocab, chr(ord(t[0]) + 1))
+        for tok in vocab[lo:hi]:
+            # Typeahead input is usually a partial word: compare against the token's prefix too
+            if _within(t, tok[: len(t)], k) or _within(t, tok, k):
+                out |= self._postings[tok]
+        return out
+
+    def search(self, q: str, limit: int = 20, offset: int = 0) -> list[dict]:
+        """Up to ``limit`` best matches for ``q``, skipping the first ``offset``."""
+        qt = tokens(q)
+        if not qt:
+            return []
+        qf = " ".join(qt)
+        with self._lock:
+            vocab = self._vocabulary()
+            prefix = [self._prefix_keys(t, vocab) for t in qt]
+            exact = set.intersection(*prefix)
+            loose = exact
+            if len(exact) < offset + limit:
+                # Fuzzy pass only when prefix matches cannot fill the page
+                loose = set.intersection(*(p | self._fuzzy_keys(t, vocab) for t, p in zip(qt, prefix)))
+
+            def rank(key):
+                row, name, _, weight = self._rows[key]
+                tier = 0 if name == qf else 1 if name.startswith(qf) else 2 if key in exact else 3
+                return (tier, -weight, name)
+
+            keys = sorted(loose, key=rank)[offset:offset + limit]
+            return [self._rows[k][0] for k in keys]
+
+
+def _season_start(season: str) -> int:
+    return int(str(season)[:4])
+
+
+def _players_from_db() -> dict:
+    with get_conn() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+        if player_summary_ready(cur):
+            cur.execute(f"SELECT {PLAYER_SUMMARY_COLUMNS} FROM player_summary_recent;")
+        else:
+            cur.execute(PLAYER_SUMMARY_LIVE.format(where="TRUE"))
+        rows = cur.fetchall()
+    out = {}
+    for r in rows:
+        r = dict(r)
+        if r.get("avg_save_pct") is not None:
+            r["avg_save_pct"] = float(r["avg_save_pct"])
+        out[r["id"]] = (r, r["name"], float(r["total_goals"] or 0))
+    return out
+
+
+def _teams_from_db() -> dict:
+    with get_conn() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+        cur.execute(
+            """
+            SELECT
+                tm.id,
+                tm.name,
+                tm.country,
+                tm.league,
+                '2024-2025' AS latest_season,
+                true AS active_2024_2025,
+                tm.wins_2425,
+                tm.points_2425,
+                tm.position_2425,
+                tm.losses_2425
+            FROM teams tm
+            WHERE tm.league IN (
+                  'Premier League',
+                  'La Liga',
+                  'Bundesliga',
+                  'Serie A',
+                  'Ligue 1'
+              );
+            """
+        )
+        rows = cur.fetchall()
+    return {r["id"]: (dict(r), r["name"], 0.0) for r in rows}
+
+
+def _csv_files() -> list[Path]:
+    from ....lib.columnar import source_path
+
+    # the file each table is actually read from (Parquet sidecar when up to date)
+    csvs = sorted(DATA_DIR.glob("fbref_clean_*.csv")) + sorted(DATA_DIR.glob("*_team_clean.csv"))
+    return [source_path(p) for p in csvs]
+
+
+def _none(x):
+    return None if x != x else x   # NaN -> None
+
+
+def _players_from_csv() -> dict:
+    import pandas as pd
+    from ....lib.columnar import read_table
+
+    min_year = date.today().year - 4
+    frames = []
+    for p in sorted(DATA_DIR.glob("fbref_clean_*.csv")):
+        df = read_table(p, ["Player", "Nation", "Pos", "Squad", "Season", "MP", "Gls", "Ast", "CS", "Save%"])
+        frames.append(df[df["Season"].map(_season_start) >= min_year])
+    if not frames:
+        return {}
+    df = pd.concat(frames, ignore_index=True).sort_values("Season", kind="stable")
+    df["Nation"] = df["Nation"].fillna("").astype(str).str.split().str[-1].fillna("")
+    df["Pos"] = df["Pos"].astype(str).str.split(",").str[0]
+
+    g = df.groupby(["Player", "Nation"], sort=False)
+    agg = g.agg(
+        primary_pos=("Pos", "last"),
+        teams=("Squad", lambda s: ", ".join(sorted(s.dropna().astype(str).unique()))),
+        first_season=("Season", "first"),
+        last_season=("Season", "last"),
+        seasons_count=("Season", "nunique"),
+        total_matches=("MP", "sum"),
+        total_goals=("Gls", "sum"),
+        total_assists=("Ast", "sum"),
+        total_clean_sheets=("CS", lambda s: s.sum(min_count=1)),
+        avg_save_pct=("Save%", "mean"),
+    ).reset_index()
+
+    out = {}
+    for r in agg.to_dict("records"):
+        pid = zlib.crc32(f"{r['Player']}|{r['Nation']}".encode())
+        row = {
+            "id": pid,
+            "name": r["Player"],
+            "nation": r["Nation"],
+            "primary_pos": r["primary_pos"],
+            "teams": r["teams"],
+            "first_season": r["first_season"],
+            "last_season": r["last_season"],
+            "seasons_count": int(r["seasons_count"]),
+            "total_matches": int(r["total_matches"]),
+            "total_goals": int(r["total_goals"]),
+            "total_assists": int(r["total_assists"]),
+            "total_clean_sheets": _none(float(r["total_clean_sheets"])),
+            "avg_save_pct": _none(round(float(r["avg_save_pct"]), 2)),
+        }
+        out[pid] = (row, r["Player"], float(row["total_goals"]))
+    return out
+
+
+def _teams_from_csv() -> dict:
+    from ....lib.columnar import read_table
+
+    # <league-slug>_<season>_team_clean.csv; the Comp column in these files is not reliable
+    files = sorted(DATA_DIR.glob("*_team_clean.csv"))
+    parsed = [(f, *f.stem[: -len("_team_clean")].split("_", 1)) for f in files]
+    seasons = sorted({season for _, _, season in parsed})
+    if not seasons:
+        return {}
+    latest = seasons[-1]
+    current = latest.replace("_", "-") == "2024-2025"
+
+    out = {}
+    for f, slug, season in parsed:
+        league = LEAGUES.get(slug)
+        if season != latest or league is None:
+            continue
+        df = read_table(f, ["Squad", "W", "L", "Pts", "GD", "GF"]).sort_values(["Pts", "GD", "GF"], ascending=False)
+        for pos, r in enumerate(df.to_dict("records"), 1):
+            tid = zlib.crc32(f"team|{r['Squad']}".encode())
+            row = {
+                "id": tid,
+                "name": r["Squad"],
+                "country": LEAGUE_COUNTRY[league],
+                "league": league,
+                "latest_season": "2024-2025",
+                "active_2024_2025": True,
+                "wins_2425": int(r["W"]) if current else None,
+                "points_2425": int(r["Pts"]) if current else None,
+                "position_2425": pos if current else None,
+                "losses_2425": int(r["L"]) if current else None,
+            }
+            out[tid] = (row, r["Squad"], 0.0)
+    return out
+
+
+class AutocompleteIndex:
+    """In-process typeahead for players and teams, refreshed in the background.
+
+    Built from the ``players``/``teams`` tables, or from the ``fbref_clean_*`` and
+    ``*_team_clean`` CSVs when no database is configured. Refreshes re-read the
+    source (CSV only when a file changed) and re-index only rows that changed.
+    Rows have the same shape as ``/players/search/aggregate`` and ``/team/search``.
+    """
+
+    def __init__(self, enabled: bool, source: str = "auto", refresh_secs: float = 300.0):
+        self.enabled = enabled
+        self.source = source
+        self.refresh_secs = refresh_secs
+        self.players = PrefixIndex()
+        self.teams = PrefixIndex()
+        self.active_source: str | None = None
+        self.loaded_at: float | None = None
+        self.error: str | None = None
+        self._csv_mtimes: dict[str, float] = {}
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self.enabled and self.loaded_at is not None
+
+    def version(self) -> str:
+        """Digest of the indexed rows; responses built from the index are keyed by it.
+
+        A refresh that changes nothing keeps the version, so cached pages stay valid.
+        """
+        return f"{self.players.digest:016x}{self.teams.digest:016x}" if self.ready else "-"
+
+    def _load_db(self) -> None:
+        players, teams = _players_from_db(), _teams_from_db()
+        self._apply("db", players, teams)
+
+    def _load_csv(self) -> None:
+        mtimes = {str(p): p.stat().st_mtime for p in _csv_files()}
+        if self.active_source == "csv" and mtimes == self._csv_mtimes:
+            return
+        players, teams = _players_from_csv(), _teams_from_csv()
+        self._csv_mtimes = mtimes
+        self._apply("csv", players, teams)
+
+    def _apply(self, source: str, players: dict, teams: dict) -> None:
+        p_changed, p_removed = self.players.sync(players)
+        t_changed, t_removed = self.teams.sync(teams)
+        self.active_source, self.loaded_at, self.error = source, time.time(), None
+        print(
+            f"Autocomplete index ({source}): {len(self.players)} players (+{p_changed}/-{p_removed}), "
+            f"{len(self.teams)} teams (+{t_changed}/-{t_removed})"
+        )
+
+    def refresh(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            if self.source == "csv" or (self.source == "auto" and not DB_HOST):
+                self._load_csv()
+            else:
+                try:
+                    self._load_db()
+                except Exception as e:
+                    if self.source == "db":
+                        raise
+                    print(f"Autocomplete: database unavailable ({e}); using CSV files")
+                    self._load_csv()
+        except Exception as e:
+            self.error = str(e)
+            print(f"Autocomplete refresh failed: {e}")
+            return
+        print(f"Autocomplete refresh took {time.perf_counter() - t0:.2f}s")
+
+    def _run(self) -> None:
+        self.refresh()
+        while not self._stop.wait(self.refresh_secs):
+            self.refresh()
+
+    def start(self) -> None:
+        if self.enabled and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="autocomplete", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def status(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "source": self.active_source,
+            "players": len(self.players),
+            "teams": len(self.teams),
+            "loaded_at": self.loaded_at,
+            "error": self.error,
+        }
+
+
+AUTOCOMPLETE = AutocompleteIndex(AUTOCOMPLETE_INDEX, AUTOCOMPLETE_SOURCE, AUTOCOMPLETE_REFRESH_SECS)
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+
+# memory (default), redis, or off
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+# Search results are read from the database, which has no cheap version signal,
+# so they rely on the TTL. Predictions are keyed by model/data version as well.
+RESPONSE_CACHE_SEARCH_TTL = float(os.getenv("RESPONSE_CACHE_SEARCH_TTL", "300"))
+RESPONSE_CACHE_PREDICTION_TTL = float(os.getenv("RESPONSE_CACHE_PREDICTION_TTL", "3600"))
+# Seconds between re-computing a version (stat calls on model / data files)
+RESPONSE_CACHE_VERSION_CHECK_SECS = float(os.getenv("RESPONSE_CACHE_VERSION_CHECK_SECS", "5"))
+
+
+class MemoryBackend:
+    """Thread-safe LRU of ``key -> (expires_at, value)``."""
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisBackend:
+    """Any Redis-protocol server (Redis, Valkey, KeyDB); entries expire server-side."""
+
+    name = "redis"
+    blocking = True            # network round trips: run off the event loop
+
+    def __init__(self, url: str, prefix: str = "transfermation:"):
+        import redis  # optional dependency
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5)
+        self._client.ping()
+
+    def get(self, key: str) -> bytes | None:
+        return self._client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    def clear(self) -> None:
+        for k in self._client.scan_iter(self.prefix + "*"):
+            self._client.delete(k)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._client.scan_iter(self.prefix + "*"))
+
+
+class Version:
+    """Memoizes a version function for ``interval`` seconds so hits avoid file stats."""
+
+    def __init__(self, fn: Callable[[], str], interval: float = RESPONSE_CACHE_VERSION_CHECK_SECS):
+        self.fn = fn
+        self.interval = interval
+        self._value = ""
+        self._checked_at: float | None = None
+
+    def __call__(self) -> str:
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.interval:
+            self._value, self._checked_at = str(self.fn()), now
+        return self._value
+
+
+class WithHeaders(NamedTuple):
+    """Returned by ``compute`` to cache response headers (e.g. a pagination cursor) with the body."""
+
+    data: Any
+    headers: dict
+
+
+def normalize_query(q: str) -> str:
+    """Search is case-insensitive, so case and outer/inner whitespace runs share one entry."""
+    return " ".join(q.split()).lower()
+
+
+class ResponseCache:
+    """Caches encoded JSON responses by endpoint, version and normalized request.
+
+    Keys include a version string, so loading a new model or new data changes
+    the key and old entries simply age out. Responses carry an ETag (hash of
+    the body) and ``Cache-Control: max-age``; a matching ``If-None-Match``
+    gets a ``304`` without a body. Extra headers returned via ``WithHeaders``
+    are stored with the body and sent on hits and ``304``s. Errors (raised
+    exceptions) are never cached.
+    A failing backend is treated as a miss rather than failing the request.
+    Calls to a network backend (Redis) run in the thread pool, off the event loop.
+    """
+
+    def __init__(self, backend: str, url: str, maxsize: int):
+        self.enabled = backend != "off"
+        self.backend = None
+        self.error: str | None = None
+        if backend == "redis":
+            try:
+                self.backend = RedisBackend(url)
+            except Exception as e:
+                self.error = str(e)
+                print(f"Response cache: Redis unavailable ({e}); using in-process LRU")
+        if self.backend is None:
+            self.backend = MemoryBackend(maxsize)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "not_modified": 0, "errors": 0}
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+
+    @staticmethod
+    def key(namespace: str, version: str, params: Any) -> str:
+        raw = json.dumps(jsonable_encoder(params), sort_keys=True, separators=(",", ":"))
+        return f"{namespace}:{version}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    def _lookup(self, key: str) -> bytes | None:
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            self.error = str(e)
+            self._count("errors")
+            return None
+
+    def _store(self, key: str, value: bytes, ttl: float) -> None:
+        try:
+            self.backend.set(key, value, ttl)
+        except Exception as e:
+            self.error = str(e)
+            self._count("errors")
+
+    async def _call(self, fn: Callable, *args):
+        return await run_in_threadpool(fn, *args) if self.backend.blocking else fn(*args)
+
+    async def _get(self, namespace: str, params: Any, version: Callable[[], str] | None):
+        """``(key, (etag, body, extra headers, status) or None)``; the key is None when caching is off."""
+        if not self.enabled:
+            return None, None
+        key = self.key(namespace, version() if version else "-", params)
+        entry = await self._call(self._lookup, key)
+        # Stored as etag (34 bytes) + extra headers as JSON + newline + body
+        sep = -1 if entry is None else entry.find(b"\n", 34)
+        if sep < 0:
+            self._count("misses")
+            return key, None
+        self._count("hits")
+        return key, (entry[:34].decode(), entry[sep + 1:], json.loads(entry[34:sep]), "HIT")
+
+    async def _put(self, key: str | None, data: Any, ttl: float):
+        extra = {}
+        if isinstance(data, WithHeaders):
+            data, extra = data
+        body = _encode(data)
+        etag = _etag(body)
+        if key is None:
+            return etag, body, extra, "BYPASS"
+        value = etag.encode() + json.dumps(extra, separators=(",", ":")).encode() + b"\n" + body
+        await self._call(self._store, key, value, ttl)
+        return etag, body, extra, "MISS"
+
+    def _reply(self, request: Request, entry, ttl: float) -> Response:
+        etag, body, extra, status = entry
+        if etag in request.headers.get("if-none-match", ""):
+            self._count("not_modified")
+            return Response(status_code=304, headers={**_headers(etag, ttl, status), **extra})
+        return _response(body, etag, ttl, status, extra)
+
+    async def arespond(
+        self,
+        request: Request,
+        namespace: str,
+        params: Any,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+        version: Callable[[], str] | None = None,
+    ) -> Response:
+        """Return the cached response for ``params``, awaiting ``compute()`` and storing it on a miss."""
+        key, entry = await self._get(namespace, params, version)
+        if entry is None:
+            entry = await self._put(key, await compute(), ttl)
+        return self._reply(request, entry, ttl)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+        s["enabled"] = self.enabled
+        s["backend"] = self.backend.name
+        s["error"] = self.error
+        try:
+            s["entries"] = len(self.backend)
+        except Exception:
+            s["entries"] = None
+        return s
+
+
+def _encode(data: Any) -> bytes:
+    # Same encoding as FastAPI's default JSONResponse
+    return json.dumps(jsonable_encoder(data), ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def _etag(body: bytes) -> str:
+    # Always 34 bytes: quotes around 32 hex digits
+    return f'"{hashlib.md5(body).hexdigest()}"'
+
+
+def _headers(etag: str, ttl: float, status: str) -> dict:
+    return {"ETag": etag, "Cache-Control": f"private, max-age={int(ttl)}", "X-Cache": status}
+
+
+def _response(body: bytes, etag: str, ttl: float, status: str, extra: dict) -> Response:
+    return Response(content=body, media_type="application/json", headers={**_headers(etag, ttl, status), **extra})
+
+
+RESPONSE_CACHE = ResponseCache(RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_URL, RESPONSE_CACHE_SIZE)
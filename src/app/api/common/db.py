@@ -1,7 +1,18 @@
+import asyncio
 import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+import psycopg
 import psycopg2
+import psycopg_pool
+from psycopg.rows import dict_row
+from psycopg2 import pool as pg_pool
 from dotenv import load_dotenv
 
+from ....lib.metrics import span
+
 # Load environment variables
 load_dotenv()
 
@@ -11,37 +22,271 @@ DB_NAME = os.getenv("DB_NAME")
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
-def get_conn():
-    try:
-        conn = psycopg2.connect(
-            dbname=DB_NAME,
-            user=DB_USER,
-            password=DB_PASS,
-            host=DB_HOST,
-            port=DB_PORT,
-        )
-        
-        # Test the connection
-        with conn.cursor() as cur:
-            cur.execute("SELECT 1")
-            cur.fetchone()
-            
-        # Create extension if needed
+# Pool sizing / behaviour
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "1"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+# The psycopg2 pool only serves background work (autocomplete refresh, /test-db)
+DB_SYNC_POOL_MAX = int(os.getenv("DB_SYNC_POOL_MAX", "2"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))        # max seconds to wait for a free connection
+DB_POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", "30"))  # idle seconds before a checkout is pinged
+DB_POOL_RETRY_SECS = float(os.getenv("DB_POOL_RETRY_SECS", "5"))   # seconds to fail fast after a failed connect
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection frees up within DB_POOL_TIMEOUT."""
+
+
+class DatabaseUnavailable(Exception):
+    """Raised when the async pool cannot connect; the API answers 503."""
+
+
+class ConnectionPool:
+    """Process-wide psycopg2 pool with bounded waiting and checkout stats.
+
+    ThreadedConnectionPool raises as soon as it is exhausted, so a semaphore
+    sized to ``maxconn`` makes callers queue instead. Connections are only
+    pinged on checkout when they have been idle longer than ``ping_after``.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float, ping_after: float):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._last_used: dict[int, float] = {}
+        self._stats = {
+            "checkouts": 0,
+            "in_use": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "discarded": 0,
+            "checkout_ms_total": 0.0,
+            "checkout_ms_max": 0.0,
+        }
+
+    def _connect_kwargs(self) -> dict:
+        return dict(dbname=DB_NAME, user=DB_USER, password=DB_PASS, host=DB_HOST, port=DB_PORT)
+
+    def open(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                return
+            try:
+                self._pool = pg_pool.ThreadedConnectionPool(self.minconn, self.maxconn, **self._connect_kwargs())
+            except Exception as e:
+                print(f"Database connection error: {e}")
+                print(f"DB_HOST: {DB_HOST}")
+                print(f"DB_NAME: {DB_NAME}")
+                print(f"DB_USER: {DB_USER}")
+                print(f"DB_PORT: {DB_PORT}")
+                raise
+        self._ensure_extensions()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+                self._last_used.clear()
+
+    def _ensure_extensions(self) -> None:
+        """Run once per pool instead of once per request."""
+        conn = self._pool.getconn()
         try:
             with conn.cursor() as cur:
                 cur.execute("CREATE EXTENSION IF NOT EXISTS unaccent;")
-                conn.commit()
+            conn.commit()
         except Exception as e:
             print(f"Warning: Could not create unaccent extension: {e}")
             conn.rollback()
-            
-        return conn
-    except Exception as e:
-        print(f"Database connection error: {e}")
-        print(f"DB_HOST: {DB_HOST}")
-        print(f"DB_NAME: {DB_NAME}")
-        print(f"DB_USER: {DB_USER}")
-        print(f"DB_PORT: {DB_PORT}")
-        raise e
+        finally:
+            self._pool.putconn(conn)
+
+    def _healthy(self, conn) -> bool:
+        if conn.closed:
+            return False
+        idle = time.monotonic() - self._last_used.get(id(conn), 0.0)
+        if idle < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+                cur.fetchone()
+            conn.rollback()
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            return False
+
+    def _checkout(self):
+        # One retry: a stale connection is dropped and replaced by a fresh one.
+        for _ in range(2):
+            conn = self._pool.getconn()
+            if self._healthy(conn):
+                return conn
+            self._pool.putconn(conn, close=True)
+            self._last_used.pop(id(conn), None)
+            with self._lock:
+                self._stats["discarded"] += 1
+        return self._pool.getconn()
+
+    @contextmanager
+    def connection(self):
+        if self._pool is None:
+            self.open()
+
+        t0 = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["waits"] += 1
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self._stats["timeouts"] += 1
+                raise PoolTimeout(f"No database connection available within {self.timeout}s")
+
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+
+        elapsed_ms = (time.perf_counter() - t0) * 1000.0
+        with self._lock:
+            self._stats["checkouts"] += 1
+            self._stats["in_use"] += 1
+            self._stats["checkout_ms_total"] += elapsed_ms
+            self._stats["checkout_ms_max"] = max(self._stats["checkout_ms_max"], elapsed_ms)
+
+        try:
+            yield conn
+        finally:
+            self._last_used[id(conn)] = time.monotonic()
+            # putconn rolls back any open transaction and drops broken connections
+            self._pool.putconn(conn, close=bool(conn.closed))
+            with self._lock:
+                self._stats["in_use"] -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            s = dict(self._stats)
+        s["checkout_ms_avg"] = (s["checkout_ms_total"] / s["checkouts"]) if s["checkouts"] else 0.0
+        s["min_size"] = self.minconn
+        s["max_size"] = self.maxconn
+        s["open"] = self._pool is not None
+        return s
+
+
+class AsyncPool:
+    """psycopg 3 async pool used by the routers, sized by the same DB_POOL_* settings.
+
+    Connections return dict rows and bind parameters client-side, so the
+    ``%(name)s`` SQL shared with the psycopg2 pool behaves identically.
+    After a failed open, requests fail straight away for ``retry_secs``
+    instead of each waiting ``timeout`` on an unreachable server.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float, retry_secs: float):
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.retry_secs = retry_secs
+        self._pool: psycopg_pool.AsyncConnectionPool | None = None
+        self._lock = asyncio.Lock()
+        self._failed: tuple[float, str] | None = None   # (monotonic time, error) of the last failed open
+
+    def _conninfo(self) -> str:
+        kwargs = dict(dbname=DB_NAME, user=DB_USER, password=DB_PASS, host=DB_HOST, port=DB_PORT)
+        return psycopg.conninfo.make_conninfo(**{k: v for k, v in kwargs.items() if v is not None})
+
+    async def open(self) -> None:
+        async with self._lock:
+            if self._pool is not None:
+                return
+            if self._failed is not None and time.monotonic() - self._failed[0] < self.retry_secs:
+                raise DatabaseUnavailable(f"Database unavailable: {self._failed[1]}")
+            pool = psycopg_pool.AsyncConnectionPool(
+                self._conninfo(),
+                min_size=self.minconn,
+                max_size=self.maxconn,
+                timeout=self.timeout,
+                kwargs={"row_factory": dict_row, "cursor_factory": psycopg.AsyncClientCursor},
+                open=False,
+            )
+            try:
+                await pool.open(wait=True, timeout=self.timeout)
+            except Exception as e:
+                await pool.close()
+                self._failed = (time.monotonic(), str(e))
+                print(f"Async database pool error: {e}")
+                raise DatabaseUnavailable(f"Database unavailable: {e}") from e
+            self._pool, self._failed = pool, None
+
+    async def close(self) -> None:
+        async with self._lock:
+            if self._pool is not None:
+                await self._pool.close()
+                self._pool = None
+
+    @asynccontextmanager
+    async def connection(self, stage: str = "query"):
+        if self._pool is None:
+            await self.open()
+        with span(f"db.{stage}"):
+            try:
+                with span("db.checkout"):
+                    conn = await self._pool.getconn()
+            except psycopg_pool.PoolTimeout as e:
+                raise PoolTimeout(f"No database connection available within {self.timeout}s") from e
+            try:
+                yield conn
+            finally:
+                # putconn rolls back any open transaction and drops broken connections
+                await self._pool.putconn(conn)
+
+    def stats(self) -> dict:
+        s = self._pool.get_stats() if self._pool is not None else {}
+        s["open"] = self._pool is not None
+        s["error"] = self._failed[1] if self._failed is not None else None
+        return s
+
+
+_POOL = ConnectionPool(min(DB_POOL_MIN, DB_SYNC_POOL_MAX), DB_SYNC_POOL_MAX, DB_POOL_TIMEOUT, DB_POOL_PING_AFTER)
+
+
+_APOOL = AsyncPool(DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT, DB_POOL_RETRY_SECS)
+
+
+def init_pool() -> None:
+    _POOL.open()
+
+
+def close_pool() -> None:
+    _POOL.close()
+
+
+def pool_stats() -> dict:
+    return {**_POOL.stats(), "async": _APOOL.stats()}
+
+
+def get_conn():
+    """Borrow a pooled connection: ``with get_conn() as conn: ...``"""
+    return _POOL.connection()
+
+
+async def init_async_pool() -> None:
+    await _APOOL.open()
+
+
+async def close_async_pool() -> None:
+    await _APOOL.close()
+
 
+def get_aconn(stage: str = "query"):
+    """Borrow a pooled async connection: ``async with get_aconn() as conn: ...``
 
+    The time it is held is recorded as the ``db.<stage>`` span.
+    """
+    return _APOOL.connection(stage)
@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import joblib
+
+# Seconds between mtime checks for hot-reload (0 checks on every access)
+MODEL_RELOAD_CHECK_SECS = float(os.getenv("MODEL_RELOAD_CHECK_SECS", "5"))
+
+
+class ModelUnavailable(Exception):
+    """Raised when a registered model file is missing or cannot be loaded."""
+
+
+class _Entry:
+    def __init__(self, path: Path, loader: Callable[[Path], Any]):
+        self.path = path
+        self.loader = loader
+        self.model = None
+        self.mtime: float | None = None
+        self.loaded_at: float | None = None
+        self.checked_at = 0.0
+        self.error: str | None = None
+
+
+class ModelRegistry:
+    """Application-level registry: models are loaded once and shared by requests.
+
+    ``get`` loads lazily when a model was not (or could not be) loaded at
+    startup, and reloads it when the file's mtime changes. A failed reload
+    keeps serving the previous model.
+    """
+
+    def __init__(self, check_interval: float = MODEL_RELOAD_CHECK_SECS):
+        self.check_interval = check_interval
+        self._entries: dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, path: Path, loader: Callable[[Path], Any] = joblib.load) -> None:
+        self._entries[name] = _Entry(Path(path), loader)
+
+    def _load(self, name: str, e: _Entry) -> None:
+        try:
+            mtime = e.path.stat().st_mtime
+        except FileNotFoundError:
+            e.error = f"model file not found: {e.path}"
+            return
+        try:
+            model = e.loader(e.path)
+        except Exception as ex:
+            e.error = f"failed to load {e.path}: {ex}"
+            print(f"Error loading model '{name}': {ex}")
+            return
+        e.model, e.mtime, e.loaded_at, e.error = model, mtime, time.time(), None
+        print(f"Loaded model '{name}' from {e.path}")
+
+    def load_all(self) -> None:
+        for name, e in self._entries.items():
+            with self._lock:
+                self._load(name, e)
+
+    def get(self, name: str):
+        e = self._entries.get(name)
+        if e is None:
+            raise ModelUnavailable(f"model '{name}' is not registered")
+
+        now = time.monotonic()
+        if e.model is None or now - e.checked_at >= self.check_interval:
+            with self._lock:
+                e.checked_at = now
+                try:
+                    changed = e.path.stat().st_mtime != e.mtime
+                except FileNotFoundError:
+                    changed = e.model is None
+                if e.model is None or changed:
+                    self._load(name, e)
+
+        if e.model is None:
+            raise ModelUnavailable(e.error or f"model '{name}' is not loaded")
+        return e.model
+
+    def version(self, name: str) -> str:
+        """Identifies the model file on disk and the loaded one.
+
+        Changes as soon as the file changes, before the model is reloaded, and
+        marks the entry for a reload check on the next ``get``.
+        """
+        e = self._entries.get(name)
+        if e is None:
+            return "none"
+        try:
+            on_disk = e.path.stat().st_mtime
+        except FileNotFoundError:
+            on_disk = None
+        if on_disk != e.mtime:
+            e.checked_at = 0.0
+        return f"{on_disk}:{e.mtime}"
+
+    def status(self) -> dict:
+        return {
+            name: {
+                "path": str(e.path),
+                "loaded": e.model is not None,
+                "loaded_at": e.loaded_at,
+                "error": e.error,
+            }
+            for name, e in self._entries.items()
+        }
+
+
+MODELS = ModelRegistry()
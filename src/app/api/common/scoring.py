@@ -0,0 +1,38 @@
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads that run model scoring / simulations off the event loop. Threads (not
+# processes) so the simulator's season data and pipeline stay shared in memory.
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_executor: ThreadPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=SCORING_WORKERS, thread_name_prefix="scoring")
+    return _executor
+
+
+async def run_scoring(fn, *args, **kwargs):
+    """Run CPU-bound ``fn`` in the scoring pool so the event loop keeps serving I/O."""
+    loop = asyncio.get_running_loop()
+    # run_in_executor does not carry contextvars over; copy them so spans reach the request
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_get_executor(), ctx.run, functools.partial(fn, *args, **kwargs))
+
+
+def shutdown_scoring() -> None:
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
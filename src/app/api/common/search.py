@@ -0,0 +1,122 @@
+import os
+import time
+
+# Seconds before re-checking for the search columns when they were missing
+SEARCH_RECHECK_SECS = float(os.getenv("SEARCH_RECHECK_SECS", "60"))
+
+# name -> (result, checked_at); a True result is never re-checked
+_checks: dict[str, tuple[bool, float]] = {}
+
+
+def _cached(name: str) -> bool | None:
+    ok, checked_at = _checks.get(name, (None, 0.0))
+    if ok or (ok is not None and time.monotonic() - checked_at < SEARCH_RECHECK_SECS):
+        return ok
+    return None
+
+
+def _record(name: str, row) -> bool:
+    ok = bool(row["ok"] if isinstance(row, dict) else row[0])
+    _checks[name] = (ok, time.monotonic())
+    return ok
+
+
+_SEARCH_NAME_SQL = """
+    SELECT COUNT(*) = 2 AS ok
+    FROM information_schema.columns
+    WHERE table_name IN ('players', 'teams') AND column_name = 'search_name';
+"""
+
+_PLAYER_SUMMARY_SQL = "SELECT to_regclass('player_summary_recent') IS NOT NULL AS ok;"
+
+
+def player_summary_ready(cur) -> bool:
+    """True once migration 002_player_summary.sql has created ``player_summary_recent``."""
+    ok = _cached("player_summary")
+    if ok is None:
+        cur.execute(_PLAYER_SUMMARY_SQL)
+        ok = _record("player_summary", cur.fetchone())
+    return ok
+
+
+async def asearch_indexed(cur) -> bool:
+    """True once migration 001_search_names.sql has added ``search_name`` to players and teams.
+
+    Until then the routers fall back to the unindexed ``unaccent(LOWER(name)) LIKE`` queries.
+    """
+    ok = _cached("search_name")
+    if ok is None:
+        await cur.execute(_SEARCH_NAME_SQL)
+        ok = _record("search_name", await cur.fetchone())
+    return ok
+
+
+async def aplayer_summary_ready(cur) -> bool:
+    """``player_summary_ready`` for an async (psycopg 3) cursor."""
+    ok = _cached("player_summary")
+    if ok is None:
+        await cur.execute(_PLAYER_SUMMARY_SQL)
+        ok = _record("player_summary", await cur.fetchone())
+    return ok
+
+
+def like_escape(q: str) -> str:
+    """Escape LIKE wildcards so user input only matches literally."""
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_params(q: str) -> dict:
+    return {"term": q.strip(), "like": like_escape(q.strip())}
+
+
+def name_match(alias: str) -> str:
+    """WHERE clause on ``<alias>.search_name``, served by its trigram index.
+
+    ``f_unaccent`` is IMMUTABLE, so the folded term is a plan-time constant and
+    both branches can use the GIN index. ``<%`` (word similarity) adds typo
+    tolerance on top of the substring match.
+    """
+    return (
+        f"({alias}.search_name LIKE '%%' || f_unaccent(lower(%(like)s)) || '%%'"
+        f" OR f_unaccent(lower(%(term)s)) <%% {alias}.search_name)"
+    )
+
+
+def name_rank(alias: str) -> str:
+    """ORDER BY terms: best word match first, then closest whole-name match."""
+    return (
+        f"word_similarity(f_unaccent(lower(%(term)s)), {alias}.search_name) DESC,"
+        f" similarity(f_unaccent(lower(%(term)s)), {alias}.search_name) DESC"
+    )
+
+
+# Columns returned by /players/search/aggregate, in order
+PLAYER_SUMMARY_COLUMNS = (
+    "id, name, nation, primary_pos, teams, first_season, last_season, seasons_count,"
+    " total_matches, total_goals, total_assists, total_clean_sheets, avg_save_pct"
+)
+
+# Live version of player_summary_recent, used until migration 002 is applied.
+# ``{where}`` filters players before grouping.
+PLAYER_SUMMARY_LIVE = """
+    SELECT
+        p.id,
+        p.name,
+        p.nation,
+        p.primary_pos,
+        string_agg(DISTINCT tm.name, ', ') AS teams,
+        MIN(ps.season) AS first_season,
+        MAX(ps.season) AS last_season,
+        COUNT(DISTINCT ps.season) AS seasons_count,
+        SUM(ps.matches) AS total_matches,
+        SUM(ps.goals) AS total_goals,
+        SUM(ps.assists) AS total_assists,
+        SUM(ps.clean_sheets) AS total_clean_sheets,
+        ROUND(AVG(ps.save_pct)::numeric, 2) AS avg_save_pct
+    FROM player_season_summary ps
+    JOIN players p ON p.id = ps.player_id
+    LEFT JOIN teams tm ON tm.id = ps.team_id
+    WHERE {where}
+      AND ps.season_start_year >= EXTRACT(YEAR FROM CURRENT_DATE) - 4
+    GROUP BY p.id, p.name, p.nation, p.primary_pos
+"""
@@ -0,0 +1,92 @@
+import os
+import threading
+import time
+
+# Set WARMUP_ON_STARTUP=0 to skip warm-up (the simulator then loads on first use)
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1").lower() not in ("0", "false", "no")
+# A failed warm-up is retried after WARMUP_RETRY_SECS, doubling up to WARMUP_RETRY_MAX_SECS
+WARMUP_RETRY_SECS = float(os.getenv("WARMUP_RETRY_SECS", "5"))
+WARMUP_RETRY_MAX_SECS = float(os.getenv("WARMUP_RETRY_MAX_SECS", "300"))
+
+_simulator = None
+_import_lock = threading.Lock()
+_import_seconds: float | None = None
+
+
+def import_simulator():
+    """Import the what-if simulator once per process (pandas/sklearn import cost included)."""
+    global _simulator, _import_seconds
+    if _simulator is None:
+        with _import_lock:
+            if _simulator is None:
+                t0 = time.perf_counter()
+                from ....lib.ml.inference import simulator
+                _import_seconds = time.perf_counter() - t0
+                print(f"Imported simulator in {_import_seconds:.2f}s")
+                _simulator = simulator
+    return _simulator
+
+
+class Warmup:
+    """Background warm-up of the simulator; drives the /ready endpoint.
+
+    A failed warm-up is retried until it succeeds, with the delay doubling
+    from ``retry_secs`` up to ``retry_max_secs``. The worker stays not ready
+    (``retrying``) meanwhile; the last error is reported by /health and /ready.
+    """
+
+    def __init__(self, enabled: bool, retry_secs: float = WARMUP_RETRY_SECS,
+                 retry_max_secs: float = WARMUP_RETRY_MAX_SECS):
+        self.enabled = enabled
+        self.retry_secs = retry_secs
+        self.retry_max_secs = max(retry_secs, retry_max_secs)
+        self.status = "pending" if enabled else "disabled"
+        self.attempt = 0
+        self.error: str | None = None
+        self.timings: dict[str, float] = {}
+        self._thread: threading.Thread | None = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "disabled")
+
+    def _attempt(self) -> bool:
+        t0 = time.perf_counter()
+        self.timings = {}
+        try:
+            simulator = import_simulator()
+            self.timings["import"] = _import_seconds or 0.0
+            self.timings.update(simulator.warm_up())
+            self.error = None
+            return True
+        except Exception as e:
+            self.error = str(e)
+            print(f"Warm-up attempt {self.attempt} failed: {e}")
+            return False
+        finally:
+            self.timings["total"] = time.perf_counter() - t0
+
+    def run(self) -> None:
+        delay = self.retry_secs
+        while True:
+            self.attempt += 1
+            self.status = "running"
+            if self._attempt():
+                break
+            self.status = "retrying"
+            time.sleep(delay)
+            delay = min(delay * 2, self.retry_max_secs)
+        self.status = "ready"
+        print("Warm-up ready: " + ", ".join(f"{k}={v:.2f}s" for k, v in self.timings.items()))
+
+    def start(self) -> None:
+        """Warm up without blocking startup, so /health answers while /ready is still 503."""
+        if self.enabled and self._thread is None:
+            self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def state(self) -> dict:
+        return {"status": self.status, "attempt": self.attempt, "timings": self.timings, "error": self.error}
+
+
+WARMUP = Warmup(WARMUP_ON_STARTUP)
@@ -1,73 +1,157 @@
-from fastapi import APIRouter, Query
-from psycopg2.extras import RealDictCursor
-from ..common.db import get_conn
+import os
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from ..common.autocomplete import AUTOCOMPLETE
+from ..common.cache import RESPONSE_CACHE, RESPONSE_CACHE_SEARCH_TTL, WithHeaders, normalize_query
+from ..common.db import get_aconn
+from ..common.search import (
+    PLAYER_SUMMARY_COLUMNS,
+    PLAYER_SUMMARY_LIVE,
+    aplayer_summary_ready,
+    asearch_indexed,
+    name_match,
+    name_rank,
+    search_params,
+)
 
 
 router = APIRouter(prefix="/players", tags=["players"])
 
+AGGREGATE_PAGE_SIZE = int(os.getenv("AGGREGATE_PAGE_SIZE", "20"))
+AGGREGATE_MAX_PAGE_SIZE = int(os.getenv("AGGREGATE_MAX_PAGE_SIZE", "100"))
+# Cursors for pages served from the autocomplete index are offsets with this prefix
+INDEX_CURSOR = "ix:"
+
 
 @router.get("/search")
-def search_players(q: str):
-    conn = get_conn()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cur.execute(
-        """
-        SELECT p.id, p.name, p.nation, p.primary_pos,
-               tm.name AS team, ps.season,
-               ps.matches, ps.goals, ps.assists,
-               ps.clean_sheets, ps.save_pct
-        FROM players p
-        JOIN player_season_summary ps ON p.id = ps.player_id
-        LEFT JOIN teams tm ON tm.id = ps.team_id
-        WHERE unaccent(LOWER(p.name)) LIKE unaccent(LOWER(%s))
-        ORDER BY ps.season_start_year DESC
-        LIMIT 20;
-        """,
-        (f"%{q}%",),
+async def search_players(q: str, request: Request):
+    q = normalize_query(q)
+    return await RESPONSE_CACHE.arespond(
+        request, "player_search", {"q": q}, lambda: _search_players(q), ttl=RESPONSE_CACHE_SEARCH_TTL
     )
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
+
+
+async def _search_players(q: str):
+    async with get_aconn("player_search") as conn, conn.cursor() as cur:
+        if await asearch_indexed(cur):
+            await cur.execute(
+                f"""
+                SELECT p.id, p.name, p.nation, p.primary_pos,
+                       tm.name AS team, ps.season,
+                       ps.matches, ps.goals, ps.assists,
+                       ps.clean_sheets, ps.save_pct
+                FROM players p
+                JOIN player_season_summary ps ON p.id = ps.player_id
+                LEFT JOIN teams tm ON tm.id = ps.team_id
+                WHERE {name_match("p")}
+                ORDER BY {name_rank("p")}, p.id, ps.season_start_year DESC
+                LIMIT 20;
+                """,
+                search_params(q),
+            )
+        else:
+            await cur.execute(
+                """
+                SELECT p.id, p.name, p.nation, p.primary_pos,
+                       tm.name AS team, ps.season,
+                       ps.matches, ps.goals, ps.assists,
+                       ps.clean_sheets, ps.save_pct
+                FROM players p
+                JOIN player_season_summary ps ON p.id = ps.player_id
+                LEFT JOIN teams tm ON tm.id = ps.team_id
+                WHERE unaccent(LOWER(p.name)) LIKE unaccent(LOWER(%s))
+                ORDER BY ps.season_start_year DESC
+                LIMIT 20;
+                """,
+                (f"%{q}%",),
+            )
+        rows = await cur.fetchall()
     return rows
 
 
-@router.get("/search/aggregate")
-def search_players_aggregate(q: str = Query(..., min_length=1)):
+def _parse_offset(after: str) -> int:
+    offset = after[len(INDEX_CURSOR):]
+    if not offset.isdigit():
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return int(offset)
+
+
+def _parse_cursor(after: str) -> tuple[int, int]:
     try:
-        conn = get_conn()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(
-            """
-            SELECT 
-                p.id, 
-                p.name, 
-                p.nation, 
-                p.primary_pos,
-                string_agg(DISTINCT tm.name, ', ') AS teams,
-                MIN(ps.season) AS first_season,
-                MAX(ps.season) AS last_season,
-                COUNT(DISTINCT ps.season) AS seasons_count,
-                SUM(ps.matches) AS total_matches,
-                SUM(ps.goals) AS total_goals,
-                SUM(ps.assists) AS total_assists,
-                SUM(ps.clean_sheets) AS total_clean_sheets,
-                ROUND(AVG(ps.save_pct)::numeric, 2) AS avg_save_pct
-            FROM player_season_summary ps
-            JOIN players p ON p.id = ps.player_id
-            LEFT JOIN teams tm ON tm.id = ps.team_id
-            WHERE unaccent(LOWER(p.name)) LIKE unaccent(LOWER(%s))
-              AND ps.season_start_year >= EXTRACT(YEAR FROM CURRENT_DATE) - 4
-            GROUP BY p.id, p.name, p.nation, p.primary_pos
-            ORDER BY total_goals DESC NULLS LAST;
-            """,
-            (f"%{q}%",),
+        goals, pid = after.split(":", 1)
+        return int(goals), int(pid)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get("/search/aggregate")
+async def search_players_aggregate(
+    request: Request,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(AGGREGATE_PAGE_SIZE, ge=1, le=AGGREGATE_MAX_PAGE_SIZE),
+    after: str | None = Query(None, description="X-Next-Cursor value from the previous page"),
+):
+    """Players matching ``q`` with last-five-season totals, most goals first.
+
+    Pages are keyset-paginated on (total_goals, id); when more rows remain the
+    cursor for the next page is sent in the ``X-Next-Cursor`` header. With the
+    autocomplete index loaded, pages come from the index in its match order and
+    the cursor is an offset into it.
+    """
+    q = normalize_query(q)
+    return await RESPONSE_CACHE.arespond(
+        request, "player_aggregate", {"q": q, "limit": limit, "after": after},
+        lambda: _search_players_aggregate(q, limit, after),
+        ttl=RESPONSE_CACHE_SEARCH_TTL, version=AUTOCOMPLETE.version,
+    )
+
+
+async def _search_players_aggregate(q: str, limit: int, after: str | None):
+    if AUTOCOMPLETE.ready and (after is None or after.startswith(INDEX_CURSOR)):
+        offset = 0 if after is None else _parse_offset(after)
+        rows = AUTOCOMPLETE.players.search(q, limit + 1, offset)
+        if len(rows) <= limit:
+            return rows
+        return WithHeaders(rows[:limit], {"X-Next-Cursor": f"{INDEX_CURSOR}{offset + limit}"})
+    params: dict = {"limit": limit + 1}
+    keyset = "TRUE"
+    if after is not None:
+        params["k_goals"], params["k_id"] = _parse_cursor(after)
+        keyset = (
+            "(COALESCE(s.total_goals, -1) < %(k_goals)s"
+            " OR (COALESCE(s.total_goals, -1) = %(k_goals)s AND s.id > %(k_id)s))"
         )
-        rows = cur.fetchall()
-        cur.close()
-        conn.close()
-        return rows
+    try:
+        async with get_aconn("player_aggregate") as conn, conn.cursor() as cur:
+            if await aplayer_summary_ready(cur):
+                source, where = "player_summary_recent s", f"{name_match('s')} AND {keyset}"
+                params.update(search_params(q))
+            else:
+                if await asearch_indexed(cur):
+                    match = name_match("p")
+                    params.update(search_params(q))
+                else:
+                    match = "unaccent(LOWER(p.name)) LIKE unaccent(LOWER(%(pattern)s))"
+                    params["pattern"] = f"%{q}%"
+                source, where = f"({PLAYER_SUMMARY_LIVE.format(where=match)}) s", keyset
+            await cur.execute(
+                f"""
+                SELECT {PLAYER_SUMMARY_COLUMNS}
+                FROM {source}
+                WHERE {where}
+                ORDER BY COALESCE(s.total_goals, -1) DESC, s.id
+                LIMIT %(limit)s;
+                """,
+                params,
+            )
+            rows = await cur.fetchall()
     except Exception as e:
+        # Raised rather than returned so the response cache does not keep it
         print(f"Error in search_players_aggregate: {e}")
-        return {"error": "Database connection failed", "details": str(e)}
-
-
+        raise HTTPException(status_code=503, detail=f"Database connection failed: {e}")
+    if len(rows) <= limit:
+        return rows
+    rows = rows[:limit]
+    last = rows[-1]
+    goals = -1 if last["total_goals"] is None else last["total_goals"]
+    return WithHeaders(rows, {"X-Next-Cursor": f"{goals}:{last['id']}"})
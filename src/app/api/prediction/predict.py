@@ -1,9 +1,13 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from psycopg2.extras import RealDictCursor
-from ..common.db import get_conn
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, Field
+from ..common.cache import RESPONSE_CACHE, RESPONSE_CACHE_PREDICTION_TTL, Version
+from ..common.db import get_aconn
+from ..common.models import MODELS, ModelUnavailable
+from ..common.scoring import run_scoring
+from ..common.warmup import import_simulator
+from ....lib.metrics import span
+from ....lib.ml.leagues import league_slug
 import numpy as np
-import joblib
 from pathlib import Path
 import os
 
@@ -13,6 +17,17 @@ class PredictionRequest(BaseModel):
     player_id: int
     team_id: int
 
+# A season is at most 38 x 90 = 3420 minutes; leave room for cup games and extra time
+MAX_MINUTES = 10_000
+
+class MinutesRange(BaseModel):
+    start: int = Field(0, ge=0, le=MAX_MINUTES)
+    stop: int = Field(..., ge=0, le=MAX_MINUTES)       # inclusive
+    step: int = Field(..., gt=0, le=MAX_MINUTES)
+
+    def steps(self) -> int:
+        return (self.stop - self.start) // self.step + 1
+
 class WhatIfRequest(BaseModel):
     team_name: str
     incoming_player_name: str
@@ -20,26 +35,55 @@ class WhatIfRequest(BaseModel):
     projected_minutes_in: int
     outgoing_minutes: dict[str, int] | None = None
     cross_league_scale: float = 1.0
+    minutes_range: MinutesRange | None = None
+    league: str | None = None          # model league (slug or name); default: team's previous-season league
 
-def load_model():
-    """Load the trained model"""
-    try:
-        model_path = Path(__file__).parent.parent.parent.parent.parent / "model.pkl"
-        if model_path.exists():
-            return joblib.load(model_path)
-        else:
-            return None
-    except Exception as e:
-        print(f"Error loading model: {e}")
-        return None
+class WhatIfCandidate(BaseModel):
+    incoming_player_name: str
+    projected_minutes_in: int
+    outgoing_minutes: dict[str, int] | None = None
+    cross_league_scale: float = 1.0
+
+class WhatIfBatchRequest(BaseModel):
+    team_name: str
+    target_season: str
+    candidates: list[WhatIfCandidate] = Field(..., min_length=1, max_length=500)
+    top_k: int | None = Field(None, ge=1, le=500)
+    league: str | None = None
 
-def get_player_features(player_id: int, team_id: int):
+class RecommendRequest(BaseModel):
+    team_name: str
+    target_season: str
+    projected_minutes_in: int
+    outgoing_minutes: dict[str, int] | None = None
+    cross_league_scale: float = 1.0
+    positions: list[str] | None = None
+    min_age: float | None = None
+    max_age: float | None = None
+    min_minutes: int = 0
+    leagues: list[str] | None = None   # candidate pool filter
+    top_k: int = Field(10, ge=1, le=100)
+    league: str | None = None          # model league of team_name
+
+class ScenarioArrival(BaseModel):
+    incoming_player_name: str
+    projected_minutes_in: int
+    cross_league_scale: float = 1.0
+
+class ScenarioRequest(BaseModel):
+    team_name: str
+    target_season: str
+    arrivals: list[ScenarioArrival] = Field(default_factory=list, max_length=20)
+    departures: dict[str, int] = Field(default_factory=dict, max_length=30)
+    league: str | None = None
+
+MODEL_PATH = Path(__file__).parent.parent.parent.parent.parent / "model.pkl"
+MODELS.register("impact", MODEL_PATH)
+
+async def get_player_features(player_id: int, team_id: int):
     """Get player and team features for prediction"""
-    conn = get_conn()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    
-    try:
-        cur.execute("""
+    async with get_aconn("player_features") as conn, conn.cursor() as cur:
+        await cur.execute("""
             SELECT 
                 p.id,
                 p.name as player_name,
@@ -57,11 +101,11 @@ def get_player_features(player_id: int, team_id: int):
             GROUP BY p.id, p.name, p.primary_pos, p.nation
         """, (player_id,))
         
-        player_data = cur.fetchone()
+        player_data = await cur.fetchone()
         if not player_data:
             raise HTTPException(status_code=404, detail="Player not found")
         
-        cur.execute("""
+        await cur.execute("""
             SELECT 
                 tm.id,
                 tm.name as team_name,
@@ -75,15 +119,11 @@ def get_player_features(player_id: int, team_id: int):
             WHERE tm.id = %s
         """, (team_id,))
         
-        team_data = cur.fetchone()
+        team_data = await cur.fetchone()
         if not team_data:
             raise HTTPException(status_code=404, detail="Team not found")
         
         return player_data, team_data
-        
-    finally:
-        cur.close()
-        conn.close()
 
 def create_feature_vector(player_data, team_data):
     """Create feature vector for prediction"""
@@ -118,17 +158,29 @@ def create_feature_vector(player_data, team_data):
     
     return feature_vector
 
+_impact_version = Version(lambda: MODELS.version("impact"))
+
 @router.post("/predict")
-def predict_impact(request: PredictionRequest):
+async def predict_impact(request: PredictionRequest, http_request: Request):
     """Predict the impact of a player joining a team"""
+    return await RESPONSE_CACHE.arespond(
+        http_request, "predict", request.model_dump(), lambda: _predict_impact(request),
+        ttl=RESPONSE_CACHE_PREDICTION_TTL, version=_impact_version,
+    )
+
+def _score_impact(features):
+    model = MODELS.get("impact")
+    with span("model.impact_predict"):
+        return model.predict(features)[0]
+
+async def _predict_impact(request: PredictionRequest):
     try:
-        player_data, team_data = get_player_features(request.player_id, request.team_id)
+        player_data, team_data = await get_player_features(request.player_id, request.team_id)
         
         features = create_feature_vector(player_data, team_data)
         
-        model = load_model()
-        
-        prediction = model.predict(features)[0]
+        # Model load (first use) and predict are CPU-bound; keep them off the event loop
+        prediction = await run_scoring(_score_impact, features)
         confidence = 0.85 
 
         
@@ -152,36 +204,67 @@ def predict_impact(request: PredictionRequest):
             }
         }
         
+    except HTTPException:
+        raise
+    except ModelUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Prediction model unavailable: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+def _simulator():
+    """The what-if simulator module (imported once per process, usually during warm-up)."""
+    try:
+        return import_simulator()
+    except Exception as ie:
+        raise HTTPException(status_code=500, detail=f"Simulator import failed: {ie}")
+
+# Pipeline file + season CSV mtimes; a new model or new data starts a fresh cache generation
+_simulator_version = Version(lambda: _simulator().data_version())
+
 @router.post("/whatif")
-def predict_points_delta(request: WhatIfRequest):
+async def predict_points_delta(request: WhatIfRequest, http_request: Request):
     """Predict baseline points, with-transfer points, and delta using simulator."""
+    # First import (pandas, sklearn) happens off the loop; the version check needs it
+    simulator = await run_scoring(_simulator)
+    r = request.minutes_range
+    if r is not None:
+        if r.stop < r.start:
+            raise HTTPException(status_code=400, detail="minutes_range.stop must be >= minutes_range.start")
+        if r.steps() > simulator.MAX_SWEEP_STEPS:
+            raise HTTPException(status_code=400,
+                                detail=f"minutes_range has more than {simulator.MAX_SWEEP_STEPS} steps")
+    return await RESPONSE_CACHE.arespond(
+        http_request, "whatif", request.model_dump(), lambda: run_scoring(_points_delta, request),
+        ttl=RESPONSE_CACHE_PREDICTION_TTL, version=_simulator_version,
+    )
+
+def _points_delta(request: WhatIfRequest):
     try:
-        import sys
-        from pathlib import Path as _Path
-        try:
-            root = _Path(__file__).resolve().parents[5]
-            if str(root) not in sys.path:
-                sys.path.append(str(root))
-        except Exception:
-            pass
-
-        try:
-            from src.lib.ml.inference.simulator import predict_with_and_without_transfer
-        except Exception as ie:
-            raise HTTPException(status_code=500, detail=f"Simulator import failed: {ie}")
-
-
-        res = predict_with_and_without_transfer(
-            team=request.team_name,
-            target_season=request.target_season,
-            incoming_player_name=request.incoming_player_name,
-            projected_minutes_in=request.projected_minutes_in,
-            outgoing_minutes=request.outgoing_minutes,
-            cross_league_scale=request.cross_league_scale,
-        )
+        simulator = _simulator()
+
+        if request.minutes_range is None:
+            res = simulator.predict_with_and_without_transfer(
+                team=request.team_name,
+                target_season=request.target_season,
+                incoming_player_name=request.incoming_player_name,
+                projected_minutes_in=request.projected_minutes_in,
+                outgoing_minutes=request.outgoing_minutes,
+                cross_league_scale=request.cross_league_scale,
+                league=request.league,
+            )
+        else:
+            # One squad / baseline build and one predict for the point and the curve
+            r = request.minutes_range
+            res = simulator.predict_minutes_sweep(
+                team=request.team_name,
+                target_season=request.target_season,
+                incoming_player_name=request.incoming_player_name,
+                minutes=simulator.minutes_grid(r.start, r.stop, r.step),
+                outgoing_minutes=request.outgoing_minutes,
+                cross_league_scale=request.cross_league_scale,
+                league=request.league,
+                projected_minutes_in=request.projected_minutes_in,
+            )
         return {
             "team_name": request.team_name,
             "incoming_player_name": request.incoming_player_name,
@@ -189,10 +272,102 @@ def predict_points_delta(request: WhatIfRequest):
         }
     except HTTPException:
         raise
+    except simulator.PipelineUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"What-if model unavailable: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"What-if prediction failed: {str(e)}")
 
 
+@router.post("/whatif/batch")
+async def predict_points_delta_batch(request: WhatIfBatchRequest):
+    """Score many incoming players against one squad; results ranked by delta."""
+    return await run_scoring(_points_delta_batch, request)
+
+def _points_delta_batch(request: WhatIfBatchRequest):
+    try:
+        simulator = _simulator()
+
+        res = simulator.predict_whatif_batch(
+            team=request.team_name,
+            target_season=request.target_season,
+            candidates=[c.model_dump() for c in request.candidates],
+            league=request.league,
+        )
+        if request.top_k is not None:
+            res["results"] = res["results"][:request.top_k]
+        return {"team_name": request.team_name, **res}
+    except HTTPException:
+        raise
+    except simulator.PipelineUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"What-if model unavailable: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch what-if prediction failed: {str(e)}")
+
+
+@router.post("/recommend")
+async def recommend_transfers(request: RecommendRequest):
+    """Scan the previous-season player pool for the biggest points delta."""
+    try:
+        for lg in [*(request.leagues or []), *([request.league] if request.league else [])]:
+            league_slug(lg)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await run_scoring(_recommend_transfers, request)
+
+def _recommend_transfers(request: RecommendRequest):
+    try:
+        simulator = _simulator()
+
+        res = simulator.recommend_transfers(
+            team=request.team_name,
+            target_season=request.target_season,
+            projected_minutes_in=request.projected_minutes_in,
+            outgoing_minutes=request.outgoing_minutes,
+            cross_league_scale=request.cross_league_scale,
+            positions=request.positions,
+            min_age=request.min_age,
+            max_age=request.max_age,
+            min_minutes=request.min_minutes,
+            leagues=request.leagues,
+            top_k=request.top_k,
+            league=request.league,
+        )
+        return {"team_name": request.team_name, **res}
+    except HTTPException:
+        raise
+    except simulator.PipelineUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"What-if model unavailable: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Recommendation failed: {str(e)}")
+
+
+@router.post("/scenario")
+async def simulate_transfer_window(request: ScenarioRequest):
+    """Combined points delta of several arrivals and departures, with per-move marginals."""
+    if not request.arrivals and not request.departures:
+        raise HTTPException(status_code=400, detail="Scenario needs at least one arrival or departure")
+    return await run_scoring(_simulate_transfer_window, request)
+
+def _simulate_transfer_window(request: ScenarioRequest):
+    try:
+        simulator = _simulator()
+
+        res = simulator.simulate_transfer_window(
+            team=request.team_name,
+            target_season=request.target_season,
+            arrivals=[a.model_dump() for a in request.arrivals],
+            departures=request.departures,
+            league=request.league,
+        )
+        return {"team_name": request.team_name, **res}
+    except HTTPException:
+        raise
+    except simulator.PipelineUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"What-if model unavailable: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Scenario simulation failed: {str(e)}")
+
+
 def get_impact_level(score):
     """Convert impact score to descriptive level"""
     if score >= 8.5:
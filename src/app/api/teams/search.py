@@ -1,46 +1,69 @@
-from fastapi import APIRouter
-from psycopg2.extras import RealDictCursor
-from ..common.db import get_conn
+from fastapi import APIRouter, Request
+from ..common.autocomplete import AUTOCOMPLETE
+from ..common.cache import RESPONSE_CACHE, RESPONSE_CACHE_SEARCH_TTL, normalize_query
+from ..common.db import get_aconn
+from ..common.search import asearch_indexed, search_params, name_match, name_rank
 
 
 router = APIRouter(prefix="/team", tags=["teams"])
 
+_COLUMNS = """
+                tm.id,
+                tm.name,
+                tm.country,
+                tm.league,
+                '2024-2025' AS latest_season,
+                true AS active_2024_2025,
+                tm.wins_2425,
+                tm.points_2425,
+                tm.position_2425,
+                tm.losses_2425"""
+
+_LEAGUES = """tm.league IN (
+                  'Premier League',
+                  'La Liga', 
+                  'Bundesliga',
+                  'Serie A',
+                  'Ligue 1'
+              )"""
+
 
 @router.get("/search")
-def search_teams(q: str):
-    conn = get_conn()
-    cur = conn.cursor(cursor_factory=RealDictCursor)
-    cur.execute(
-        """
-        SELECT 
-            tm.id,
-            tm.name,
-            tm.country,
-            tm.league,
-            '2024-2025' AS latest_season,
-            true AS active_2024_2025,
-            tm.wins_2425,
-            tm.points_2425,
-            tm.position_2425,
-            tm.losses_2425
-        FROM teams tm
-        WHERE unaccent(LOWER(tm.name)) LIKE unaccent(LOWER(%s))
-          AND tm.league IN (
-              'Premier League',
-              'La Liga', 
-              'Bundesliga',
-              'Serie A',
-              'Ligue 1'
-          )
-        ORDER BY tm.name ASC
-        LIMIT 20;
-        """,
-        (f"%{q}%",),
+async def search_teams(q: str, request: Request):
+    q = normalize_query(q)
+    return await RESPONSE_CACHE.arespond(
+        request, "team_search", {"q": q}, lambda: _search_teams(q),
+        ttl=RESPONSE_CACHE_SEARCH_TTL, version=AUTOCOMPLETE.version,
     )
-    rows = cur.fetchall()
-    cur.close()
-    conn.close()
-    return rows
-
 
 
+async def _search_teams(q: str):
+    if AUTOCOMPLETE.ready:
+        return AUTOCOMPLETE.teams.search(q)
+    async with get_aconn("team_search") as conn, conn.cursor() as cur:
+        if await asearch_indexed(cur):
+            await cur.execute(
+                f"""
+                SELECT {_COLUMNS}
+                FROM teams tm
+                WHERE {name_match("tm")}
+                  AND {_LEAGUES}
+                ORDER BY {name_rank("tm")}, tm.name ASC
+                LIMIT 20;
+                """,
+                search_params(q),
+            )
+        else:
+            await cur.execute(
+                f"""
+                SELECT {_COLUMNS}
+                FROM teams tm
+                WHERE unaccent(LOWER(tm.name)) LIKE unaccent(LOWER(%s))
+                  AND {_LEAGUES}
+                ORDER BY tm.name ASC
+                LIMIT 20;
+                """,
+                (f"%{q}%",),
+            )
+        rows = await cur.fetchall()
+    return rows
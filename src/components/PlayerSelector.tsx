@@ -42,7 +42,7 @@ export function PlayerSelector({
     setLoading(true);
     try {
       const url = `${baseUrl}/players/search/aggregate?q=${encodeURIComponent(query)}`;
-      const response = await fetch(url, { cache: 'no-store' });
+      const response = await fetch(url, { cache: 'no-cache' });
       if (!response.ok) {
         setSearchResults([]);
       } else {
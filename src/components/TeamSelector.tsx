@@ -63,7 +63,7 @@ export function TeamSelector({
     setTeamLoading(true);
     try {
       const url = `${baseUrl}/team/search?q=${encodeURIComponent(query)}`;
-      const response = await fetch(url, { cache: 'no-store' });
+      const response = await fetch(url, { cache: 'no-cache' });
       if (!response.ok) {
         setTeamSearchResults([]);
       } else {
@@ -0,0 +1,75 @@
+"""
+Columnar (Parquet) sidecars for the season CSVs in ``src/lib/data``.
+
+The scrapers and cleaning scripts write ``<name>.parquet`` next to every
+``<name>.csv`` they produce, with the dtypes pandas inferred (numbers stay
+numbers, no re-parsing on load). Loaders call ``read_table`` with the columns
+they use; only those are decoded. The CSV stays the source of record: when the
+Parquet file is missing, older than the CSV, or pyarrow is not installed, the
+CSV is read instead (with the same column projection).
+
+    df = read_table(DATA_DIR / "fbref_clean_2024_2025.csv", ["Player", "Squad", "Min"])
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Callable, Iterable
+
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:          # optional: without it everything reads the CSVs
+    pq = None
+
+Columns = Iterable[str] | Callable[[str], bool] | None
+
+
+def columnar_path(csv_path: Path | str) -> Path:
+    return Path(csv_path).with_suffix(".parquet")
+
+
+def source_path(csv_path: Path | str) -> Path:
+    """The file ``read_table`` would read: the Parquet sidecar if usable, else the CSV."""
+    csv_path = Path(csv_path)
+    pq_path = columnar_path(csv_path)
+    if pq is None or not pq_path.exists():
+        return csv_path
+    if csv_path.exists() and csv_path.stat().st_mtime > pq_path.stat().st_mtime:
+        return csv_path                               # CSV rewritten since the sidecar was built
+    return pq_path
+
+
+def _selector(columns: Columns) -> Callable[[str], bool] | None:
+    if columns is None or callable(columns):
+        return columns
+    wanted = set(columns)
+    return lambda c: c in wanted
+
+
+def read_table(csv_path: Path | str, columns: Columns = None) -> pd.DataFrame:
+    """Read a season table, decoding only ``columns`` (names or a predicate on names).
+
+    Columns that are asked for but missing from the file are skipped, like
+    ``usecols`` with a callable; file column order is kept either way.
+    """
+    path = source_path(csv_path)
+    keep = _selector(columns)
+    if path.suffix == ".parquet":
+        names = pq.read_schema(path).names
+        return pd.read_parquet(path, columns=[c for c in names if keep is None or keep(c)])
+    return pd.read_csv(path, usecols=keep)
+
+
+def write_columnar(df: pd.DataFrame, csv_path: Path | str) -> Path | None:
+    """Write ``df`` as the Parquet sidecar of ``csv_path`` (no-op without pyarrow)."""
+    if pq is None:
+        print(" pyarrow not installed; skipped Parquet output")
+        return None
+    out = columnar_path(csv_path)
+    df.to_parquet(out, index=False)
+    return out
+
+
+def convert(csv_path: Path | str) -> Path | None:
+    """Build the sidecar for an existing CSV, with the dtypes ``read_csv`` infers."""
+    return write_columnar(pd.read_csv(csv_path), csv_path)
@@ -0,0 +1,80 @@
+"""
+Apply the SQL migrations in src/lib/db/migrations/ in filename order.
+
+Applied files are recorded in ``schema_migrations`` so re-running is a no-op.
+Connection settings come from the same DB_* variables as the API.
+
+Usage:
+    python src/lib/db/migrate.py            # apply pending migrations
+    python src/lib/db/migrate.py --list     # show applied / pending
+"""
+import argparse
+import os
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+
+def connect():
+    load_dotenv()
+    return psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASS"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT", "5432"),
+    )
+
+
+def applied(cur) -> set[str]:
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name TEXT PRIMARY KEY,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        """
+    )
+    cur.execute("SELECT name FROM schema_migrations;")
+    return {r[0] for r in cur.fetchall()}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Apply database migrations")
+    ap.add_argument("--list", action="store_true", help="List migrations without applying them")
+    args = ap.parse_args()
+
+    files = sorted(MIGRATIONS_DIR.glob("*.sql"))
+    conn = connect()
+    try:
+        with conn.cursor() as cur:
+            done = applied(cur)
+        conn.commit()
+
+        if args.list:
+            for f in files:
+                print(f"{'applied' if f.name in done else 'pending'}  {f.name}")
+            return
+
+        for f in files:
+            if f.name in done:
+                continue
+            print(f"Applying {f.name} ...")
+            # Each file runs in its own transaction so a failure leaves no partial migration
+            with conn.cursor() as cur:
+                cur.execute(f.read_text())
+                cur.execute("INSERT INTO schema_migrations (name) VALUES (%s);", (f.name,))
+            conn.commit()
+        print("Migrations up to date.")
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+-- Accent-folded, trigram-indexed name columns for player/team search.
+--
+-- unaccent() is only STABLE (it depends on the search_path), so it cannot be
+-- used in a generated column or an index expression directly. f_unaccent pins
+-- the dictionary and is declared IMMUTABLE.
+
+CREATE EXTENSION IF NOT EXISTS unaccent;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$;
+
+ALTER TABLE players
+    ADD COLUMN IF NOT EXISTS search_name text
+    GENERATED ALWAYS AS (f_unaccent(lower(name))) STORED;
+
+ALTER TABLE teams
+    ADD COLUMN IF NOT EXISTS search_name text
+    GENERATED ALWAYS AS (f_unaccent(lower(name))) STORED;
+
+-- GIN trigram indexes serve both LIKE '%q%' and the word-similarity operator (<%)
+CREATE INDEX IF NOT EXISTS players_search_name_trgm
+    ON players USING gin (search_name gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS teams_search_name_trgm
+    ON teams USING gin (search_name gin_trgm_ops);
+
+-- Season rows are fetched per matched player, newest first
+CREATE INDEX IF NOT EXISTS player_season_summary_player_year
+    ON player_season_summary (player_id, season_start_year DESC);
+
+ANALYZE players;
+ANALYZE teams;
@@ -0,0 +1,41 @@
+-- Rolling-window player aggregate behind /players/search/aggregate.
+--
+-- Holds one row per player over the last five seasons, so aggregate search no
+-- longer re-groups player_season_summary on every keystroke. The window is
+-- fixed when the view is refreshed; src/lib/db/refresh.py must run after each
+-- load into player_season_summary (and at least once a year).
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS player_summary_recent AS
+SELECT
+    p.id,
+    p.name,
+    p.nation,
+    p.primary_pos,
+    p.search_name,
+    string_agg(DISTINCT tm.name, ', ') AS teams,
+    MIN(ps.season) AS first_season,
+    MAX(ps.season) AS last_season,
+    COUNT(DISTINCT ps.season) AS seasons_count,
+    SUM(ps.matches) AS total_matches,
+    SUM(ps.goals) AS total_goals,
+    SUM(ps.assists) AS total_assists,
+    SUM(ps.clean_sheets) AS total_clean_sheets,
+    ROUND(AVG(ps.save_pct)::numeric, 2) AS avg_save_pct
+FROM player_season_summary ps
+JOIN players p ON p.id = ps.player_id
+LEFT JOIN teams tm ON tm.id = ps.team_id
+WHERE ps.season_start_year >= EXTRACT(YEAR FROM CURRENT_DATE) - 4
+GROUP BY p.id, p.name, p.nation, p.primary_pos, p.search_name;
+
+-- Required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS player_summary_recent_id
+    ON player_summary_recent (id);
+
+CREATE INDEX IF NOT EXISTS player_summary_recent_search_name_trgm
+    ON player_summary_recent USING gin (search_name gin_trgm_ops);
+
+-- Keyset pagination order: most goals first, id breaks ties
+CREATE INDEX IF NOT EXISTS player_summary_recent_goals
+    ON player_summary_recent ((COALESCE(total_goals, -1)) DESC, id);
+
+ANALYZE player_summary_recent;
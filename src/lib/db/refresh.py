@@ -0,0 +1,41 @@
+"""
+Refresh the materialized views derived from player_season_summary.
+
+Run this at the end of every load into ``player_season_summary``. Views are
+refreshed CONCURRENTLY so the API keeps reading the previous contents meanwhile.
+
+Usage:
+    python src/lib/db/refresh.py
+"""
+import time
+
+from migrate import connect
+
+VIEWS = ["player_summary_recent"]
+
+
+def refresh(conn, views=VIEWS) -> None:
+    # REFRESH ... CONCURRENTLY cannot run inside a transaction block
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        for view in views:
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL;", (view,))
+            if not cur.fetchone()[0]:
+                print(f"Skipping {view}: not created yet (run migrate.py)")
+                continue
+            t0 = time.perf_counter()
+            cur.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view};")
+            cur.execute(f"ANALYZE {view};")
+            print(f"Refreshed {view} in {time.perf_counter() - t0:.2f}s")
+
+
+def main():
+    conn = connect()
+    try:
+        refresh(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Lightweight timing spans and histograms, exported in Prometheus text format.
+
+``span("stage")`` times a block, records it in the ``stage_seconds`` histogram
+and, inside an HTTP request, appends it to that request's timings (used for the
+``Server-Timing`` header). Code outside a request (scripts, warm-up) still
+feeds the histograms.
+
+    with span("whatif.predict"):
+        y = pipe.predict(X)
+"""
+from __future__ import annotations
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds; wide enough for 0.5 ms cache hits and multi-second scans
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series: dict[tuple, list] = {}         # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *label_values: str) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(label_values)
+            if s is None:
+                s = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            if i < len(self.buckets):
+                s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for label_values, s in sorted(series.items()):
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            sep = "," if base else ""
+            cumulative = 0
+            for le, n in zip(self.buckets, s):
+                cumulative += n
+                out.append(f'{self.name}_bucket{{{base}{sep}le="{le}"}} {cumulative}')
+            out.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {s[-1]}')
+            labels = f"{{{base}}}" if base else ""
+            out.append(f"{self.name}_sum{labels} {s[-2]:.6f}")
+            out.append(f"{self.name}_count{labels} {s[-1]}")
+        return out
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+)
+STAGE_SECONDS = Histogram("stage_seconds", "Time spent in instrumented stages", ("stage",))
+
+# (stage, seconds) recorded during the current request; None outside requests
+_request_spans: contextvars.ContextVar[list | None] = contextvars.ContextVar("request_spans", default=None)
+
+
+@contextmanager
+def span(stage: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - t0
+        STAGE_SECONDS.observe(elapsed, stage)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((stage, elapsed))
+
+
+def start_request() -> list:
+    """Begin collecting spans for the current request; returns the list they land in."""
+    spans: list = []
+    _request_spans.set(spans)
+    return spans
+
+
+def server_timing(spans: list, total: float) -> str:
+    """``Server-Timing`` header value; repeated stages are summed."""
+    totals: dict[str, float] = {}
+    for stage, sec in spans:
+        totals[stage] = totals.get(stage, 0.0) + sec
+    parts = [f"{stage};dur={sec * 1000:.2f}" for stage, sec in totals.items()]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def render() -> str:
+    return "\n".join(REQUEST_SECONDS.render() + STAGE_SECONDS.render()) + "\n"
@@ -0,0 +1,81 @@
+"""
+History features shared by training (``scripts/v1.py``) and inference
+(``inference/simulator.py``).
+
+Both describe a team by its per-season metrics over the seasons before the
+target season and summarize each metric as ``last1``, ``mean_all``, ``expw``
+and ``trend``. ``history_features`` does this for a whole
+(teams x seasons x metrics) array at once in closed form, so there is one
+definition of the features and no per-team, per-metric Python loop.
+"""
+from __future__ import annotations
+import numpy as np
+
+HALF_LIFE = 1.0      # seasons; expw weight of the season k back is 0.5 ** (k / HALF_LIFE)
+
+
+def history_features(
+    hist: np.ndarray,
+    metrics: list[str],
+    half_life: float = HALF_LIFE,
+    trend_fill: float = np.nan,
+) -> dict[str, np.ndarray]:
+    """``last1_``/``mean_all_``/``expw_``/``trend_<metric>`` arrays, one entry per team.
+
+    ``hist`` is (teams x seasons x len(metrics)), most recent season first.
+    Position k is season k back; NaN entries (missing values, or padding after
+    a team's last season) are ignored:
+
+    - last1: the value at position 0 (NaN if missing)
+    - mean_all: mean of the finite values
+    - expw: weights 0.5 ** (k / half_life), renormalized over the finite values
+    - trend: least-squares slope of value against position; ``trend_fill``
+      with fewer than two finite values
+
+    mean_all and expw are NaN when a team has no finite value for a metric.
+    """
+    hist = np.asarray(hist, dtype=float)
+    n, L, k = hist.shape
+    if k != len(metrics):
+        raise ValueError(f"history has {k} metrics, expected {len(metrics)}")
+
+    finite = np.isfinite(hist)
+    vals = np.where(finite, hist, 0.0)
+    count = finite.sum(axis=1)
+    pos = np.arange(L, dtype=float)[None, :, None]
+    w = np.where(finite, 0.5 ** (pos / half_life), 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        expw = (vals * (w / w.sum(axis=1, keepdims=True))).sum(axis=1)
+        mean_all = vals.sum(axis=1) / count
+        x_mean = np.where(finite, pos, 0.0).sum(axis=1) / count
+        dx = np.where(finite, pos - x_mean[:, None, :], 0.0)
+        dy = np.where(finite, vals - mean_all[:, None, :], 0.0)
+        trend = (dx * dy).sum(axis=1) / (dx * dx).sum(axis=1)
+
+    last1 = hist[:, 0, :] if L else np.full((n, k), np.nan)
+    has_any = count > 0
+    out: dict[str, np.ndarray] = {}
+    for j, m in enumerate(metrics):
+        out[f"last1_{m}"] = last1[:, j]
+        out[f"mean_all_{m}"] = np.where(has_any[:, j], mean_all[:, j], np.nan)
+        out[f"expw_{m}"] = np.where(has_any[:, j], expw[:, j], np.nan)
+        out[f"trend_{m}"] = np.where(count[:, j] >= 2, trend[:, j], trend_fill)
+    return out
+
+
+def pack_history(hist: np.ndarray, present: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Move each team's present seasons to the front (order kept), NaN after; returns (hist, lengths).
+
+    A season a team has no row for is skipped, not left as a gap, so position k
+    is the k-th most recent season the team actually has.
+    """
+    order = np.argsort(~present, axis=1, kind="stable")
+    packed = np.take_along_axis(hist, order[:, :, None], axis=1)
+    lengths = present.sum(axis=1)
+    packed[np.arange(hist.shape[1])[None, :] >= lengths[:, None]] = np.nan
+    return packed, lengths
+
+
+def stack_history(rows: list[dict], metrics: list[str]) -> np.ndarray:
+    """(1 x len(rows) x metrics) array from per-season feature dicts, most recent first."""
+    return np.array([[r.get(m, np.nan) for m in metrics] for r in rows], dtype=float).reshape(1, len(rows), len(metrics))
@@ -0,0 +1,85 @@
+"""
+Model input columns and the feature frame both training and inference build.
+
+``history_frame`` is the single place a (teams x seasons x metrics) history
+array becomes model rows, so ``scripts/v1.py`` and the simulator cannot drift
+apart. ``FeatureSchema`` is the ``columns.json`` a pipeline was trained with,
+checked against what this library produces when it is loaded.
+"""
+from __future__ import annotations
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .history import history_features
+
+BASES = ["gls_per90","ast_per90","sot_per90","sca_per90",
+         "tklint_per90","blocks_per90","prgp_per90","prgc_per90","prgr_per90","avg_age_mwa"]
+HIST_METRICS = BASES + ["team_minutes"]
+
+TREND_FEATURES = [f"trend_{m}" for m in BASES] + ["trend_team_minutes"]
+NON_TREND_NUMS = (
+    [f"last1_{m}" for m in BASES] +
+    [f"expw_{m}"  for m in BASES] +
+    ["last1_team_minutes","expw_team_minutes","history_len","promoted","missing_prev"]
+)
+NUM_FEATURES = NON_TREND_NUMS + TREND_FEATURES
+ID_COLUMNS = ["Season", "Squad"]
+
+
+def history_frame(season: str, squads, hist: np.ndarray, history_len, promoted) -> pd.DataFrame:
+    """Model rows for ``squads`` in target ``season``.
+
+    ``hist`` is (squads x seasons x HIST_METRICS), most recent season first, each
+    squad's seasons packed to the front and NaN-padded. ``history_len`` is the
+    number of seasons each squad has, ``promoted`` is 1 where it has no row for
+    the most recent history season. Returns ID_COLUMNS, history_len, promoted,
+    every history feature (including mean_all_*) and missing_prev.
+    """
+    n = hist.shape[0]
+    out = pd.DataFrame({
+        "Season": [season] * n,
+        "Squad": np.asarray(squads, dtype=object),
+        "promoted": np.broadcast_to(np.asarray(promoted, dtype=int), (n,)),
+        "history_len": np.broadcast_to(np.asarray(history_len, dtype=int), (n,)),
+    })
+    feats = pd.DataFrame(history_features(hist, HIST_METRICS), index=out.index)
+    out = pd.concat([out, feats], axis=1)
+    out["missing_prev"] = out[[f"last1_{m}" for m in HIST_METRICS]].isna().any(axis=1).astype(int)
+    return out
+
+
+@dataclass(frozen=True)
+class FeatureSchema:
+    """Columns a trained pipeline reads, in order."""
+    numeric: tuple[str, ...]
+
+    @property
+    def columns(self) -> list[str]:
+        return ID_COLUMNS + list(self.numeric)
+
+    @classmethod
+    def load(cls, path: Path) -> "FeatureSchema":
+        """Schema from ``columns.json``; the library default when the file does not exist."""
+        path = Path(path)
+        if not path.exists():
+            return cls(tuple(NUM_FEATURES))
+        raw = json.loads(path.read_text())["raw_columns"]
+        numeric = tuple(c for c in raw if c not in ("Season", "Squad", "points"))
+        unknown = sorted(set(numeric) - set(NUM_FEATURES))
+        if unknown:
+            raise ValueError(f"{path} expects features this library does not build: {unknown}")
+        return cls(numeric)
+
+    def select(self, frame: pd.DataFrame) -> pd.DataFrame:
+        return frame[self.columns]
+
+    def write(self, path: Path) -> None:
+        schema = {
+            "raw_columns": ["Season", "Squad", "points"] + list(self.numeric),
+            "note": "ColumnTransformer selects features by name; keep names stable at inference.",
+        }
+        Path(path).write_text(json.dumps(schema, indent=2))
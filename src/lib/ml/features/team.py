@@ -0,0 +1,110 @@
+"""
+Per-season team features from player rows, shared by training and inference.
+
+``team_features_from_players`` turns one season of player stats into one row
+per squad: total minutes, per-90 rates of the counting stats and the
+minutes-weighted age. ``normalize_columns`` maps the column spellings found in
+the scraped files onto the names used here.
+"""
+from __future__ import annotations
+import pandas as pd
+
+COLUMN_ALIASES = {
+    "squad": "Squad", "team": "Squad", "club": "Squad", "squad_x": "Squad", "squad_y": "Squad",
+    "comp": "Comp", "competition": "Comp", "league": "Comp",
+    "player": "Player", "name": "Player",
+    "min": "Min", "minutes": "Min",
+    "gls": "Gls", "goals": "Gls",
+    "ast": "Ast", "assists": "Ast",
+    "sh": "Sh", "shots": "Sh",
+    "sot": "SoT",
+    "prgp": "PrgP", "prg p": "PrgP",
+    "prgc": "PrgC", "prg c": "PrgC",
+    "prgr": "PrgR", "prg r": "PrgR",
+    "tkl+int": "Tkl+Int", "tkl_int": "Tkl+Int",
+    "tkl": "Tkl", "int": "Int",
+    "blocks": "Blocks",
+    "age": "Age",
+    "sca": "SCA",
+}
+
+# team feature -> player column summed per squad and expressed per 90 team minutes
+PER90_FROM_TOTAL = {
+    "gls_per90": "Gls", "ast_per90": "Ast", "sh_per90": "Sh", "sot_per90": "SoT",
+    "sca_per90": "SCA", "tklint_per90": "Tkl+Int", "blocks_per90": "Blocks",
+    "prgp_per90": "PrgP", "prgc_per90": "PrgC", "prgr_per90": "PrgR",
+}
+
+TEAM_FEATURES = ["team_minutes", *PER90_FROM_TOTAL, "avg_age_mwa"]
+
+# Lower-cased raw column names team_features_from_players can use, for column projection
+PLAYER_COLUMNS = frozenset(COLUMN_ALIASES) | {c.lower() for c in COLUMN_ALIASES.values()}
+
+
+def is_player_column(name: str) -> bool:
+    return str(name).strip().lower() in PLAYER_COLUMNS
+
+
+def _num(s):
+    return pd.to_numeric(s, errors="coerce")
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    lower_to_orig = {c.lower(): c for c in df.columns}
+    for lk, target in COLUMN_ALIASES.items():
+        if lk in lower_to_orig and target not in df.columns:
+            df = df.rename(columns={lower_to_orig[lk]: target})
+
+    if "Tkl+Int" not in df.columns and {"Tkl", "Int"}.issubset(df.columns):
+        df["Tkl+Int"] = _num(df["Tkl"]) + _num(df["Int"])
+
+    df.columns = [str(c).strip() for c in df.columns]
+    return df
+
+
+def in_league(comp: pd.Series, league_name: str) -> pd.Series:
+    """Rows whose competition contains ``league_name``, ignoring case.
+
+    The scraped player files prefix the country ("eng Premier League"), so an
+    exact comparison would drop every row.
+    """
+    return comp.astype(str).str.lower().str.contains(league_name.lower(), regex=False, na=False)
+
+
+def filter_league(df: pd.DataFrame, league_name: str | None) -> pd.DataFrame:
+    if not league_name or "Comp" not in df.columns:
+        return df
+    return df[in_league(df["Comp"], league_name)]
+
+
+def team_features_from_players(players: pd.DataFrame, league_name: str | None = None) -> pd.DataFrame:
+    """One row per squad (sorted by name) with TEAM_FEATURES.
+
+    Counting stats that are missing or non-numeric count as 0; per-90 rates and
+    the weighted age are NaN for a squad without minutes.
+    """
+    df = filter_league(normalize_columns(players.copy()), league_name)
+
+    for k in ["Player", "Squad"]:
+        if k in df.columns:
+            df[k] = df[k].astype(str).str.strip()
+
+    if "Squad" not in df.columns or "Min" not in df.columns:
+        raise ValueError("Expected 'Squad' and 'Min' columns in player DF.")
+
+    # one grouped sum over every count column, the weighted age as sum(age * min) / sum(min)
+    mins = _num(df["Min"])
+    totals = pd.DataFrame({col: _num(df[col]).fillna(0.0) if col in df.columns else 0.0
+                           for col in PER90_FROM_TOTAL.values()}, index=df.index)
+    totals["_team_minutes"] = mins
+    totals["_age_x_min"] = (_num(df["Age"]).fillna(0.0) if "Age" in df.columns else 0.0) * mins.fillna(0.0)
+    totals["_min_nz"] = mins.fillna(0.0)
+    sums = totals.groupby(df["Squad"]).sum()
+
+    team_minutes = sums["_team_minutes"].astype(float)
+    per90_den = (team_minutes / 90.0).where(team_minutes > 0)
+    feats = pd.DataFrame({"Squad": sums.index, "team_minutes": team_minutes.to_numpy()})
+    for feat, col in PER90_FROM_TOTAL.items():
+        feats[feat] = (sums[col] / per90_den).to_numpy()
+    feats["avg_age_mwa"] = (sums["_age_x_min"] / sums["_min_nz"].where(sums["_min_nz"] > 0)).to_numpy()
+    return feats
@@ -0,0 +1,77 @@
+from __future__ import annotations
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable
+
+import joblib
+
+# League pipelines kept in memory per process; the least recently used is dropped beyond this
+PIPELINE_CACHE_SIZE = int(os.getenv("PIPELINE_CACHE_SIZE", "3"))
+
+
+class PipelineUnavailable(FileNotFoundError):
+    """Raised when a league has no trained pipeline on disk."""
+
+
+class PipelineRegistry:
+    """Per-league pipelines, unpickled on first use and evicted least-recently-used.
+
+    ``<root>/<slug>/pipeline.joblib`` is loaded the first time a league is asked
+    for. At most ``max_loaded`` pipelines stay in memory; asking for another one
+    drops the league used longest ago, which is reloaded from disk if needed
+    again. A pipeline whose file changed is reloaded on next ``get``.
+    """
+
+    def __init__(self, root: Path, max_loaded: int = PIPELINE_CACHE_SIZE,
+                 loader: Callable[[Path], Any] = joblib.load):
+        self.root = Path(root)
+        self.max_loaded = max(1, max_loaded)
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._loaded: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def path(self, slug: str) -> Path:
+        return self.root / slug / "pipeline.joblib"
+
+    def available(self) -> list[str]:
+        """Slugs with a trained pipeline on disk."""
+        return sorted(p.parent.name for p in self.root.glob("*/pipeline.joblib"))
+
+    def get(self, slug: str):
+        path = self.path(slug)
+        try:
+            mtime = path.stat().st_mtime
+        except FileNotFoundError:
+            raise PipelineUnavailable(f"No trained pipeline for league '{slug}' ({path}); "
+                                      f"run scripts/v1.py --leagues {slug}") from None
+        with self._lock:
+            cached = self._loaded.get(slug)
+            if cached is not None and cached[0] == mtime:
+                self._loaded.move_to_end(slug)
+                return cached[1]
+            pipe = self._loader(path)
+            self._loaded[slug] = (mtime, pipe)
+            self._loaded.move_to_end(slug)
+            while len(self._loaded) > self.max_loaded:
+                evicted, _ = self._loaded.popitem(last=False)
+                print(f"Pipeline registry: evicted '{evicted}'")
+            return pipe
+
+    def loaded(self) -> list[str]:
+        """Slugs in memory, least recently used first."""
+        with self._lock:
+            return list(self._loaded)
+
+    def invalidate(self, slug: str | None = None) -> None:
+        with self._lock:
+            if slug is None:
+                self._loaded.clear()
+            else:
+                self._loaded.pop(slug, None)
+
+    def warm(self, slugs: list[str]) -> None:
+        """Load ``slugs`` that have a pipeline, up to ``max_loaded`` (the first ones win)."""
+        for slug in [s for s in slugs if self.path(s).exists()][:self.max_loaded][::-1]:
+            self.get(slug)
@@ -0,0 +1,101 @@
+from __future__ import annotations
+import threading
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+from ...columnar import read_table, source_path
+
+
+class SeasonStore:
+    """Loaded-once, process-wide cache of ``fbref_merged_<season>.csv`` frames.
+
+    Only the columns accepted by ``columns`` (a predicate on raw column names)
+    are read, from the Parquet sidecar when one is up to date (see
+    ``src/lib/columnar.py``). Each season is parsed and normalized once; league-filtered views are cached
+    per ``(season, league)``. A file whose mtime changed is reloaded on the next
+    ``get`` and ``invalidate`` drops entries explicitly (e.g. after a scrape).
+    Returned frames are shared between requests and must be treated as read-only.
+    ``read`` parses a season without caching it, for one-off builds whose result
+    is kept elsewhere.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path,
+        normalize: Callable[[pd.DataFrame], pd.DataFrame],
+        columns: Callable[[str], bool] | None = None,
+    ):
+        self.data_dir = Path(data_dir)
+        self._normalize = normalize
+        self._columns = columns
+        self._lock = threading.RLock()
+        self._frames: dict[str, tuple[float, pd.DataFrame]] = {}
+        self._views: dict[tuple[str, str], pd.DataFrame] = {}
+
+    def path(self, season: str) -> Path:
+        return self.data_dir / f"fbref_merged_{season.replace('-', '_')}.csv"
+
+    def source(self, season: str) -> Path:
+        """The file the season is read from (Parquet sidecar or CSV)."""
+        return source_path(self.path(season))
+
+    def available(self) -> list[str]:
+        return sorted({p.name.split("fbref_merged_")[-1].split(".csv")[0].replace("_", "-")
+                       for p in self.data_dir.glob("fbref_merged_*.csv")})
+
+    def _read(self, season: str) -> pd.DataFrame:
+        df = read_table(self.path(season), self._columns)
+        df = self._normalize(df)
+        for k in ["Player", "Squad"]:
+            if k in df.columns: df[k] = df[k].astype(str).str.strip()
+        return df
+
+    def _frame(self, season: str) -> pd.DataFrame:
+        mtime = self.source(season).stat().st_mtime
+        cached = self._frames.get(season)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with self._lock:
+            cached = self._frames.get(season)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            self.invalidate(season)
+            df = self._read(season)
+            self._frames[season] = (mtime, df)
+            return df
+
+    @staticmethod
+    def _league(df: pd.DataFrame, league_name: str) -> pd.DataFrame:
+        if "Comp" not in df.columns:
+            return df
+        return df[df["Comp"].astype(str).str.lower().str.contains(league_name.lower(), na=False)]
+
+    def get(self, season: str, league_name: str = "") -> pd.DataFrame:
+        """Players for ``season`` whose ``Comp`` contains ``league_name`` (case-insensitive)."""
+        df = self._frame(season)
+        key = (season, league_name.lower())
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = self._league(df, league_name)
+        return view
+
+    def read(self, season: str, league_name: str = "") -> pd.DataFrame:
+        """``get`` without the cache: parsed on every call and owned by the caller."""
+        return self._league(self._read(season), league_name)
+
+    def invalidate(self, season: str | None = None) -> None:
+        """Drop one season (or everything) so it is re-read on next access."""
+        with self._lock:
+            if season is None:
+                self._frames.clear()
+                self._views.clear()
+                return
+            self._frames.pop(season, None)
+            for k in [k for k in self._views if k[0] == season]:
+                self._views.pop(k, None)
+
+    def warm(self, seasons: list[str] | None = None) -> None:
+        for s in (seasons if seasons is not None else self.available()):
+            self._frame(s)
@@ -1,106 +1,103 @@
 from __future__ import annotations
+import time
+import zlib
+from dataclasses import dataclass
 from pathlib import Path
-import joblib
 import numpy as np
 import pandas as pd
 
+from ...metrics import span
+from ..features.history import stack_history
+from ..features.schema import HIST_METRICS, FeatureSchema, history_frame
+from ..features.team import PER90_FROM_TOTAL, PLAYER_COLUMNS, normalize_columns, team_features_from_players
+from ..leagues import DEFAULT_LEAGUE, LEAGUES, league_for_comp, league_slug
+from .pipeline_registry import PipelineRegistry, PipelineUnavailable
+from .season_store import SeasonStore
+from .squad_store import SquadStore
+from .team_table import TeamFeatureTable
+
 ROOT = Path(__file__).resolve().parents[4]
-LEAGUE_SLUG = "pl"
+LEAGUE_SLUG = DEFAULT_LEAGUE                      # model used when a caller does not name a league
 DATA_DIR   = ROOT / "src/lib/data"               
-MODELS_DIR = ROOT / f"src/lib/ml/v1/{LEAGUE_SLUG}"  
-PIPE = joblib.load(MODELS_DIR / "pipeline.joblib")
+MODELS_ROOT = ROOT / "src/lib/ml/v1"              # one <slug>/ directory per league
+MODELS_DIR = MODELS_ROOT / LEAGUE_SLUG
+
+# League pipelines, unpickled on first use; at most PIPELINE_CACHE_SIZE stay loaded
+PIPELINES = PipelineRegistry(MODELS_ROOT)
+
+def get_pipeline(league: str = LEAGUE_SLUG):
+    """The trained pipeline for ``league`` (a slug), loaded on first use rather than at import."""
+    return PIPELINES.get(league)
 
+def __getattr__(name):
+    # keeps `from simulator import PIPE` working without loading at import time
+    if name == "PIPE":
+        return get_pipeline()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-LEAGUE_NAME = "Premier League"            
-BASES = ["gls_per90","ast_per90","sot_per90","sca_per90","tklint_per90","blocks_per90","prgp_per90","prgc_per90","prgr_per90","avg_age_mwa"]
-TREND_FEATURES = [f"trend_{m}" for m in BASES] + ["trend_team_minutes"]
-NON_TREND_NUMS = [f"last1_{m}" for m in BASES] + [f"expw_{m}" for m in BASES] + ["last1_team_minutes","expw_team_minutes","history_len","promoted","missing_prev"]
-NUM_FEATURES = NON_TREND_NUMS + TREND_FEATURES
+
+LEAGUE_NAME = LEAGUES[LEAGUE_SLUG]
 
 def previous_season(season: str) -> str:
     a, b = season.split("-")
     y1, y2 = int(a), int(b)
     return f"{y1-1}-{y1}"
 def _num(s): return pd.to_numeric(s, errors="coerce")
-def _normalize_cols(df: pd.DataFrame) -> pd.DataFrame:
-    lo = {c.lower(): c for c in df.columns}
-    alias = {
-        "squad":"Squad","team":"Squad","club":"Squad",
-        "comp":"Comp","competition":"Comp","league":"Comp",
-        "player":"Player","name":"Player",
-        "min":"Min","minutes":"Min",
-        "gls":"Gls","goals":"Gls","ast":"Ast","assists":"Ast",
-        "sh":"Sh","shots":"Sh","sot":"SoT",
-        "prgp":"PrgP","prgc":"PrgC","prgr":"PrgR",
-        "tkl+int":"Tkl+Int","tkl":"Tkl","int":"Int",
-        "blocks":"Blocks","age":"Age","sca":"SCA",
-    }
-    for k,t in alias.items():
-        if k in lo and t not in df.columns:
-            df = df.rename(columns={lo[k]: t})
-    if "Tkl+Int" not in df.columns and {"Tkl","Int"}.issubset(df.columns):
-        df["Tkl+Int"] = _num(df["Tkl"]) + _num(df["Int"])
-    df.columns = [str(c).strip() for c in df.columns]
-    return df
-
-def _load_players(season: str, league_name: str) -> pd.DataFrame:
-    p = DATA_DIR / f"fbref_merged_{season.replace('-', '_')}.csv"
-    df = pd.read_csv(p)
-    df = _normalize_cols(df)
-    if "Comp" in df.columns:
-        df = df[df["Comp"].astype(str).str.lower().str.contains(league_name.lower(), na=False)]
-    for k in ["Player","Squad"]: 
-        if k in df.columns: df[k] = df[k].astype(str).str.strip()
-    return df
-
-def _team_features_from_players(players: pd.DataFrame) -> pd.DataFrame:
-    df = _normalize_cols(players)
-    if "Comp" in df.columns:
-        df = df[df["Comp"].astype(str).str.lower().str.contains(LEAGUE_NAME.lower(), na=False)]
-    g = df.groupby("Squad", as_index=False)
-    feats = []
-    for squad, gg in g:
-        mins = _num(gg.get("Min", 0)).fillna(0)
-        tot_min = float(mins.sum())
-        def per90_total(col):
-            total = float(_num(gg.get(col, 0)).fillna(0).sum())
-            return (total / (tot_min / 90.0)) if tot_min > 0 else np.nan
-        def mwa(col):
-            s = _num(gg.get(col, 0)).fillna(0)
-            return float((s*mins).sum()/mins.sum()) if mins.sum() > 0 else np.nan
-        feats.append({
-            "Squad": squad,
-            "team_minutes": tot_min,
-            "gls_per90": per90_total("Gls"),
-            "ast_per90": per90_total("Ast"),
-            "sh_per90": per90_total("Sh"),
-            "sot_per90": per90_total("SoT"),
-            "sca_per90": per90_total("SCA"),
-            "tklint_per90": per90_total("Tkl+Int"),
-            "blocks_per90": per90_total("Blocks"),
-            "prgp_per90": per90_total("PrgP"),
-            "prgc_per90": per90_total("PrgC"),
-            "prgr_per90": per90_total("PrgR"),
-            "avg_age_mwa": mwa("Age"),
-        })
-    return pd.DataFrame(feats)
-
-def _expw(vals: list[float], half_life=1.0) -> float:
-    arr = np.array(vals, float)
-    m = np.isfinite(arr)
-    if not m.any(): return np.nan
-    ages = np.arange(len(arr), dtype=float) 
-    w = 0.5 ** (ages / half_life)
-    w = (w[m] / w[m].sum())
-    return float((arr[m] * w).sum())
-
-def _trend(vals: list[float]) -> float:
-    arr = np.array(vals, float)
-    m = np.isfinite(arr)
-    if m.sum() < 2: return 0.0
-    x = np.arange(len(arr), dtype=float)[m]
-    y = arr[m]
-    return float(np.polyfit(x, y, 1)[0])
+# Raw columns the simulator reads (any spelling normalize_columns understands);
+# the other ~280 columns of fbref_merged_*.csv are never decoded.
+_SEASON_COLUMNS = PLAYER_COLUMNS | {"pos", *PER90_FROM_TOTAL}
+def _season_column(name: str) -> bool:
+    return str(name).strip().lower() in _SEASON_COLUMNS
+
+# Season files are only parsed to build the squad store and team-feature tables;
+# requests read players from the memory-mapped squad store, so workers keep no frames.
+SEASONS = SeasonStore(DATA_DIR, normalize_columns, columns=_season_column)
+
+def _available_seasons() -> list[str]:
+    return SEASONS.available()
+
+def _team_features_from_players(players: pd.DataFrame, league_name: str = LEAGUE_NAME) -> pd.DataFrame:
+    return team_features_from_players(players, league_name)
+
+@dataclass
+class LeagueModel:
+    """What one league's pipeline needs besides the squad: history rows and its input columns."""
+    slug: str
+    name: str
+    models_dir: Path
+    team_table: TeamFeatureTable
+    schema: FeatureSchema          # model inputs in the order the pipeline was trained with (columns.json)
+
+def _league_model(slug: str) -> LeagueModel:
+    name = LEAGUES[slug]
+    models_dir = MODELS_ROOT / slug
+    # Historical seasons never change: their team features are precomputed into
+    # team_features.csv (see write_team_feature_table) and looked up by squad.
+    table = TeamFeatureTable(models_dir / "team_features.csv",
+                             lambda season: _team_features_from_players(SEASONS.read(season, name), name),
+                             SEASONS.path)
+    return LeagueModel(slug, name, models_dir, table, FeatureSchema.load(models_dir / "columns.json"))
+
+LEAGUE_MODELS = {slug: _league_model(slug) for slug in LEAGUES}
+
+def league_model(team: str, season: str, league: str | None = None) -> LeagueModel:
+    """Model for ``league`` (slug or name), else for the league ``team`` played in during ``season``."""
+    if league is not None:
+        return LEAGUE_MODELS[league_slug(league)]
+    sm = SQUADS.get(season)
+    rows = sm.squad(team)
+    if rows is None:
+        raise ValueError(f"{team} not found in {season} players.")
+    if sm.comps_lower is None:
+        return LEAGUE_MODELS[LEAGUE_SLUG]
+    slug = league_for_comp(sm.comps_lower[rows][0])
+    if slug is None:
+        raise ValueError(f"{team} played in {sm.comps_lower[rows][0]!r} in {season}, which has no model.")
+    return LEAGUE_MODELS[slug]
+
+def write_team_feature_table(seasons: list[str] | None = None, league: str = LEAGUE_SLUG) -> pd.DataFrame:
+    table = LEAGUE_MODELS[league_slug(league)].team_table
+    return table.write(seasons if seasons is not None else _available_seasons())
 
 def _history_seasons(target_season: str, available: list[str]) -> list[str]:
     ty = int(target_season.split("-")[0])
@@ -108,6 +105,78 @@ def _history_seasons(target_season: str, available: list[str]) -> list[str]:
     hist.sort(key=lambda s: int(s.split("-")[0]), reverse=True)
     return hist
 
+COUNT_COLS = ["Min","Gls","Ast","Sh","SoT","SCA","Tkl","Int","Blocks","PrgP","PrgC","PrgR","Tkl+Int"]
+PER90_TO_TOTAL = [
+    ("gls_per90","Gls"), ("ast_per90","Ast"), ("sot_per90","SoT"),
+    ("sca_per90","SCA"), ("prgp_per90","PrgP"), ("prgc_per90","PrgC"),
+    ("prgr_per90","PrgR"), ("tklint_per90","Tkl+Int"),
+]
+DONOR_CAP_FRACTION = 0.25
+
+# Every season's squads as one memory-mapped count matrix (plus Age), shared by
+# all worker processes; swap simulations work on views of it.
+SQUADS = SquadStore(DATA_DIR / "squads", SEASONS.read, SEASONS.source, COUNT_COLS + ["Age"])
+
+def _nz(a: np.ndarray) -> np.ndarray:
+    return np.where(np.isnan(a), 0.0, a)
+
+def _outfield_mask(df: pd.DataFrame) -> np.ndarray:
+    if "Pos" in df.columns:
+        return ~df["Pos"].astype(str).str.contains("GK", case=False, na=False).to_numpy()
+    return np.ones(len(df), dtype=bool)
+
+def _apply_outgoing(M: np.ndarray, j_min: int, names_lower: np.ndarray, outgoing_minutes: dict[str, int] | None) -> None:
+    """Scale departing players' count rows in place by the share of minutes leaving."""
+    for name, mins_out in (outgoing_minutes or {}).items():
+        if mins_out <= 0:
+            continue
+        mask = names_lower == str(name).lower()
+        if not mask.any():
+            continue
+        cur_min = float(_nz(M[mask, j_min]).sum())
+        if cur_min <= 0:
+            continue
+        frac = max(0.0, min(mins_out / cur_min, 1.0))
+        M[mask] = M[mask] * (1.0 - frac)
+
+def _redistribute_minutes(M: np.ndarray, j_min: int, donors: np.ndarray, delta: float) -> None:
+    """Rebalance squad minutes in place so the team total is unchanged.
+
+    ``donors`` are row positions eligible to give or take minutes. Surplus minutes
+    are taken greedily from the biggest donors, at most DONOR_CAP_FRACTION of each
+    one's minutes, with any leftover spread proportionally; a deficit scales every
+    donor up. All count columns of a donor row scale with its minutes.
+    """
+    if abs(delta) <= 1e-6 or donors.size == 0:
+        return
+    if delta > 0:
+        cur_all = _nz(M[donors, j_min])
+        order = pd.Series(cur_all).sort_values(ascending=False).index.to_numpy()
+        rows, cur = donors[order], cur_all[order]
+        cap = np.where(cur > 0, cur * DONOR_CAP_FRACTION, 0.0)
+        # remaining[i] is what is still owed before donor i (same left-to-right subtraction as a loop)
+        remaining = np.subtract.accumulate(np.concatenate(([delta], cap)))
+        active = (remaining[:-1] > 1e-6) & (cur > 0)
+        take = np.minimum(cap, remaining[:-1])
+        factor = np.maximum(0.0, (cur - take) / np.maximum(cur, 1e-9))
+        M[rows[active]] = M[rows[active]] * factor[active, None]
+
+        done = np.flatnonzero(remaining <= 1e-6)
+        left = max(float(remaining[done[0] if done.size else -1]), 0.0)
+        if left > 1e-6:
+            mins = _nz(M[donors, j_min])
+            tot = float(mins.sum())
+            if tot > 0:
+                frac = np.clip(mins / tot, 0, 1)
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    scale = 1.0 - _nz(left * frac / np.where(mins == 0, np.nan, mins))
+                scale = np.maximum(scale, 0.0)
+                M[donors] = M[donors] * scale[:, None]
+    else:
+        pool_min = float(_nz(M[donors, j_min]).sum())
+        if pool_min > 0:
+            M[donors] = M[donors] * (1.0 + (-delta) / pool_min)
+
 def apply_transfer_to_players(
     team_players_prev: pd.DataFrame,
     incoming_row: pd.Series,
@@ -116,42 +185,25 @@ def apply_transfer_to_players(
     cross_league_scale: float = 1.0, 
 ) -> pd.DataFrame:
 
-    df = _normalize_cols(team_players_prev.copy())
-    COUNT_COLS = ["Min","Gls","Ast","Sh","SoT","SCA","Tkl","Int","Blocks","PrgP","PrgC","PrgR","Tkl+Int"]
+    df = normalize_columns(team_players_prev.copy())
     for c in COUNT_COLS:
         if c in df.columns:
             df[c] = _num(df[c]).astype(float)
+    cols = [c for c in COUNT_COLS if c in df.columns]
+    j_min = cols.index("Min")
+
+    M = df[cols].to_numpy(dtype=float)
+    team_minutes_baseline = float(_nz(M[:, j_min]).sum())
+    _apply_outgoing(M, j_min, df["Player"].astype(str).str.lower().to_numpy(), outgoing_minutes)
+    df[cols] = M
 
-    team_minutes_baseline = float(_num(df.get("Min", 0)).fillna(0).sum())
-
-    if outgoing_minutes:
-        for name, mins_out in outgoing_minutes.items():
-            if mins_out <= 0:
-                continue
-            mask = df["Player"].astype(str).str.lower() == str(name).lower()
-            if not mask.any():
-                continue
-            cur_min = float(_num(df.loc[mask, "Min"]).sum())
-            if cur_min <= 0:
-                continue
-            frac = max(0.0, min(mins_out / cur_min, 1.0))
-            for col in COUNT_COLS:
-                if col in df.columns:
-                    cur = _num(df.loc[mask, col]).astype(float)
-                    df.loc[mask, col] = (cur * (1.0 - frac)).astype(float)
-
-    inc = _normalize_cols(pd.DataFrame([incoming_row])).iloc[0].to_dict()
+    inc = normalize_columns(pd.DataFrame([incoming_row])).iloc[0].to_dict()
     inc["Squad"] = df["Squad"].iloc[0]
     if "Comp" in df.columns:
         inc["Comp"] = df["Comp"].iloc[0]
     inc["Min"] = float(projected_minutes_in)
 
-    per90_to_total = [
-        ("gls_per90","Gls"), ("ast_per90","Ast"), ("sot_per90","SoT"),
-        ("sca_per90","SCA"), ("prgp_per90","PrgP"), ("prgc_per90","PrgC"),
-        ("prgr_per90","PrgR"), ("tklint_per90","Tkl+Int"),
-    ]
-    for p90, tot in per90_to_total:
+    for p90, tot in PER90_TO_TOTAL:
         if p90 in inc and inc[p90] is not None and not pd.isna(inc[p90]):
             inc[tot] = cross_league_scale * float(inc[p90]) * inc["Min"] / 90.0
 
@@ -162,96 +214,29 @@ def apply_transfer_to_players(
             inc[col] = cross_league_scale * float(inc[col])
 
     df = pd.concat([df, pd.DataFrame([inc])], ignore_index=True)
+    cols = [c for c in COUNT_COLS if c in df.columns]
+    j_min = cols.index("Min")
+    M = df[cols].to_numpy(dtype=float)
 
-    total_after = float(_num(df.get("Min", 0)).fillna(0).sum())
-    delta = total_after - team_minutes_baseline
-
-    if abs(delta) > 1e-6:
-        if "Pos" in df.columns:
-            outfield_mask = ~df["Pos"].astype(str).str.contains("GK", case=False, na=False)
-        else:
-            outfield_mask = pd.Series(True, index=df.index)
-
-        incoming_idx = df.index[-1]
-        candidates = df.index[outfield_mask & (df.index != incoming_idx)]
-
-        if delta > 0:
-            df = df.copy()
-            donors = df.loc[candidates].copy()
-            donors["_min"] = _num(donors.get("Min", 0)).fillna(0).astype(float)
-            donors = donors.sort_values("_min", ascending=False)
-            remaining = delta
-            cap_fraction = 0.25
-            for idx, rowp in donors.iterrows():
-                if remaining <= 1e-6:
-                    break
-                cur = float(rowp["_min"])
-                if cur <= 0:
-                    continue
-                take = min(cur * cap_fraction, remaining)
-                factor = max(0.0, (cur - take) / max(cur, 1e-9))
-                for col in COUNT_COLS:
-                    if col in df.columns:
-                        curv = _num(df.at[idx, col]).astype(float) if np.ndim(df.at[idx, col]) != 0 else float(_num(df.at[idx, col]))
-                        df.at[idx, col] = float(curv) * factor
-                remaining -= take
-
-            if remaining > 1e-6:
-                mins = _num(df.loc[candidates, "Min"]).fillna(0).astype(float)
-                tot = float(mins.sum())
-                if tot > 0:
-                    frac = (mins / tot).clip(lower=0, upper=1)
-                    scale = 1.0 - (remaining * frac / mins.replace(0, np.nan)).fillna(0)
-                    scale = scale.clip(lower=0.0)
-                    for idx, fac in scale.items():
-                        for col in COUNT_COLS:
-                            if col in df.columns:
-                                df.at[idx, col] = float(_num(df.at[idx, col])) * float(fac)
-
-        else:
-            need = -delta
-            pool = df.loc[candidates].copy()
-            pool_min = float(_num(pool.get("Min", 0)).fillna(0).sum())
-            if pool_min > 0:
-                factor_up = 1.0 + need / pool_min
-                for idx in pool.index:
-                    for col in COUNT_COLS:
-                        if col in df.columns:
-                            df.at[idx, col] = float(_num(df.at[idx, col])) * float(factor_up)
-
-    for c in COUNT_COLS:
-        if c in df.columns:
-            arr = _num(df[c]).astype(float)
-            arr[arr < 0] = 0.0
-            df[c] = arr
+    delta = float(_nz(M[:, j_min]).sum()) - team_minutes_baseline
+    donors = np.flatnonzero(_outfield_mask(df)[:-1])          # the incoming row never donates
+    _redistribute_minutes(M, j_min, donors, delta)
 
+    M[M < 0] = 0.0
+    df[cols] = M
     return df
-def build_feature_vector_baseline(team: str, target_season: str) -> pd.DataFrame:
+def build_feature_vector_baseline(team: str, target_season: str, league: str | None = None) -> pd.DataFrame:
     prev = previous_season(target_season)              
-    available = sorted({p.name.split("fbref_merged_")[-1].split(".csv")[0].replace("_","-")
-                        for p in DATA_DIR.glob("fbref_merged_*.csv")})
+    available = _available_seasons()
     hist = _history_seasons(target_season, available)
     if not hist or hist[0] != prev:
         raise ValueError(f"Expected history's most recent season to be {prev}, found {hist[:1]}")
 
-    hist_rows = []
-    for s in hist:                                     
-        feats = _team_features_from_players(_load_players(s, LEAGUE_NAME))
-        row = feats[feats["Squad"].str.lower() == team.lower()]
-        if not row.empty:
-            hist_rows.append(row.iloc[0].to_dict())
-
-    out = {"Season": target_season, "Squad": team,
-           "history_len": len(hist_rows), "promoted": 0, "missing_prev": int(len(hist_rows)==0)}
-    for m in BASES + ["team_minutes"]:
-        seq = [r.get(m, np.nan) for r in hist_rows]    
-        out[f"last1_{m}"] = seq[0] if seq else np.nan
-        out[f"expw_{m}"]  = _expw(seq) if seq else np.nan
-        out[f"trend_{m}"] = _trend(seq) if seq else 0.0
-    X = pd.DataFrame([out])
-    for c in NUM_FEATURES:
-        if c not in X.columns: X[c] = np.nan
-    return X[["Season","Squad"] + NUM_FEATURES]
+    lg = league_model(team, prev, league)
+    rows = [lg.team_table.row(s, team) for s in hist]
+    hist_rows = [r for r in rows if r is not None]
+    promoted = int(rows[0] is None)                    # no row for the previous season, as in training
+    return _history_frame(team, target_season, stack_history(hist_rows, HIST_METRICS), lg.schema, promoted)
 
 def build_feature_vector_with_swap(
     team: str,
@@ -261,55 +246,35 @@ def build_feature_vector_with_swap(
     projected_minutes_in: int,
     outgoing_minutes: dict[str,int] | None = None,
     cross_league_scale: float = 1.0,
+    league: str | None = None,
 ) -> pd.DataFrame:
+    """Feature row for ``team`` after the swap.
+
+    Works on the squad's rows of the memory-mapped season matrix; the only copy
+    made is the redistributed squad (same numbers as apply_transfer_to_players
+    followed by _team_features_from_players).
+    """
     prev = previous_season(target_season)              
     if incoming_source_season is not None and incoming_source_season != prev:
         raise ValueError(f"incoming_source_season must be {prev} for target {target_season}, got {incoming_source_season}")
 
-   
-    available = sorted({p.name.split("fbref_merged_")[-1].split(".csv")[0].replace("_","-")
-                        for p in DATA_DIR.glob("fbref_merged_*.csv")})
-    hist = _history_seasons(target_season, available)
-    if not hist or hist[0] != prev:
-        raise ValueError(f"Expected history's most recent season to be {prev}, found {hist[:1]}")
-
-    prev_players = _load_players(prev, LEAGUE_NAME)
-    team_prev = prev_players[prev_players["Squad"].str.lower() == team.lower()].copy()
-    if team_prev.empty:
-        raise ValueError(f"{team} not found in {prev} players.")
-
-    src_df = _load_players(prev, "")
-    inc_rows = src_df[src_df["Player"].str.lower() == incoming_player_name.lower()]
-    if inc_rows.empty:
+    with span("whatif.load_players"):
+        prev, sq, older, lg = _swap_context(team, target_season, league)
+        sm = SQUADS.get(prev)                           # all leagues
+        row = sm.first_row(incoming_player_name)
+    if row is None:
         raise ValueError(f"Incoming player {incoming_player_name} not found in season {prev}.")
-    incoming_row = inc_rows.iloc[0]
+    incoming = sm.frame([row])
 
-    team_prev_swapped = apply_transfer_to_players(
-        team_prev, incoming_row, projected_minutes_in,
-        outgoing_minutes, cross_league_scale=cross_league_scale
-    )
+    with span("whatif.redistribute"):
+        M_after = squad_after_moves(sq, projected_minutes_in, outgoing_minutes)
 
-    hist_rows = []
-    for s in hist:                                     
-        feats = (_team_features_from_players(team_prev_swapped)
-                 if s == prev else
-                 _team_features_from_players(_load_players(s, LEAGUE_NAME)))
-        row = feats[feats["Squad"].str.lower() == team.lower()]
-        if not row.empty:
-            hist_rows.append(row.iloc[0].to_dict())
-
-    out = {"Season": target_season, "Squad": team,
-           "history_len": len(hist_rows), "promoted": 0, "missing_prev": int(len(hist_rows)==0)}
-    for m in BASES + ["team_minutes"]:
-        seq = [r.get(m, np.nan) for r in hist_rows]
-        out[f"last1_{m}"] = seq[0] if seq else np.nan
-        out[f"expw_{m}"]  = _expw(seq) if seq else np.nan
-        out[f"trend_{m}"] = _trend(seq) if seq else 0.0
-
-    X = pd.DataFrame([out])
-    for c in NUM_FEATURES:
-        if c not in X.columns: X[c] = np.nan
-    return X[["Season","Squad"] + NUM_FEATURES]
+    with span("whatif.team_features"):
+        V = incoming_matrix(incoming, sq.cols, projected_minutes_in, cross_league_scale)
+        age_in = _num(incoming["Age"]).astype(float).to_numpy() if "Age" in incoming.columns else np.zeros(1)
+        feats = team_features_batch(M_after, sq.age, sq.cols, V, age_in)
+
+    return _swap_feature_frame(team, target_season, older, feats, lg.schema)
 
 def predict_with_and_without_transfer(
     team: str,
@@ -318,20 +283,502 @@ def predict_with_and_without_transfer(
     projected_minutes_in: int,
     outgoing_minutes: dict[str,int] | None = None,
     cross_league_scale: float = 1.0,
+    league: str | None = None,
 ) -> dict:
-    X_base = build_feature_vector_baseline(team, target_season)
-    base_pred = float(PIPE.predict(X_base)[0])
-
-    X_swap = build_feature_vector_with_swap(
-        team, target_season, incoming_player_name, None,
-        projected_minutes_in, outgoing_minutes, cross_league_scale
-    )
-    with_pred = float(PIPE.predict(X_swap)[0])
+    lg = league_model(team, previous_season(target_season), league)
+    with span("whatif.baseline_features"):
+        X_base = build_feature_vector_baseline(team, target_season, lg.slug)
+    with span("whatif.predict"):
+        base_pred = float(get_pipeline(lg.slug).predict(X_base)[0])
+
+    with span("whatif.swap_features"):
+        X_swap = build_feature_vector_with_swap(
+            team, target_season, incoming_player_name, None,
+            projected_minutes_in, outgoing_minutes, cross_league_scale, lg.slug
+        )
+    with span("whatif.predict"):
+        with_pred = float(get_pipeline(lg.slug).predict(X_swap)[0])
 
     return {
+        "league": lg.slug,
         "season_target": target_season,
         "season_features_from": previous_season(target_season),
         "points_base": base_pred,
         "points_with": with_pred,
         "delta": with_pred - base_pred
     }
+
+
+# -------------------
+# Batched swaps: one prepared squad, many incoming candidates, one predict
+# -------------------
+@dataclass
+class PreparedSquad:
+    """Previous-season squad as a count matrix, built once and reused across swaps."""
+    squad: str
+    cols: list[str]
+    M: np.ndarray             # players x cols; float32 view of the squad store or a float64 array
+    age: np.ndarray           # players, NaN -> 0 (as in the minutes-weighted mean)
+    names_lower: np.ndarray
+    donors: np.ndarray        # row positions of outfield players
+    baseline_minutes: float
+
+    @property
+    def j_min(self) -> int:
+        return self.cols.index("Min")
+
+def prepare_squad_from_store(season: str, team: str, league_name: str) -> PreparedSquad | None:
+    """PreparedSquad over rows of the season matrix (a view, no DataFrame copies)."""
+    sm = SQUADS.get(season)
+    rows = sm.squad(team, league_name)
+    if rows is None:
+        return None
+    M = sm.M[rows]
+    cols = list(sm.cols)
+    if "Age" in cols:
+        age = _nz(M[:, cols.index("Age")].astype(float))
+        cols.pop(cols.index("Age"))
+        M = M[:, :len(cols)]                   # Age is the last store column
+    else:
+        age = np.zeros(M.shape[0])
+    return PreparedSquad(
+        squad=sm.squad_names[team.lower()],
+        cols=cols,
+        M=M,
+        age=age,
+        names_lower=sm.names_lower[rows],
+        donors=np.flatnonzero(sm.outfield[rows]),
+        baseline_minutes=float(_nz(M[:, cols.index("Min")].astype(float)).sum()),
+    )
+
+def squad_after_moves(sq: PreparedSquad, minutes_in, outgoing_minutes: dict[str, int] | None = None) -> np.ndarray:
+    """Squad matrix after departures and the redistribution caused by arrivals.
+
+    ``minutes_in`` is one arrival's minutes or a sequence with one entry per
+    arrival. Incoming rows never donate, so the result is the same for every
+    candidate arriving with the same minutes and departures.
+    """
+    M = np.array(sq.M, dtype=float)            # the only copy of the squad per scenario
+    _apply_outgoing(M, sq.j_min, sq.names_lower, outgoing_minutes)
+    arrivals = np.atleast_1d(np.asarray(minutes_in, dtype=float))
+    total_after = float(_nz(np.append(M[:, sq.j_min], arrivals)).sum())   # same summation as with the rows appended
+    delta = total_after - sq.baseline_minutes
+    _redistribute_minutes(M, sq.j_min, sq.donors, delta)
+    M[M < 0] = 0.0
+    return M
+
+def incoming_matrix(rows: pd.DataFrame, cols: list[str], minutes_in, scale) -> np.ndarray:
+    """Count rows for incoming players (same conversion as apply_transfer_to_players)."""
+    n = len(rows)
+    minutes_in = np.broadcast_to(np.asarray(minutes_in, float), (n,))
+    scale = np.broadcast_to(np.asarray(scale, float), (n,))
+    V = np.full((n, len(cols)), np.nan)
+    for j, c in enumerate(cols):
+        if c == "Min":
+            V[:, j] = minutes_in
+            continue
+        v = _num(rows[c]).astype(float).to_numpy() if c in rows.columns else np.full(n, np.nan)
+        p90 = next((p for p, tot in PER90_TO_TOTAL if tot == c and p in rows.columns), None)
+        if p90 is not None:
+            r = _num(rows[p90]).astype(float).to_numpy()
+            v = np.where(np.isnan(r), v, scale * r * minutes_in / 90.0)
+        V[:, j] = scale * v
+    V[V < 0] = 0.0
+    return V
+
+def team_features_batch(M_after: np.ndarray, age: np.ndarray, cols: list[str],
+                        V_in: np.ndarray, age_in: np.ndarray) -> dict[str, np.ndarray]:
+    """Team features (as _team_features_from_players) for the squad plus each incoming row.
+
+    ``M_after`` is either one squad matrix shared by every incoming row or a
+    stack with one squad matrix per row (e.g. a minutes sweep). ``V_in`` holds
+    one newcomer per row, or ``(rows, arrivals, cols)`` for several newcomers
+    (all-NaN rows stand for "no arrival"). Returns one array per feature with
+    an entry per row. Sums run over players along a contiguous axis, in squad
+    order with the newcomers last.
+    """
+    V_in = np.asarray(V_in, dtype=float)
+    if V_in.ndim == 2:
+        V_in = V_in[:, None, :]
+    age_in = np.asarray(age_in, dtype=float).reshape(V_in.shape[:2])
+    C, a = V_in.shape[:2]
+    n, k = M_after.shape[-2:]
+    T = np.empty((C, k, n + a))              # C order: the player axis must be contiguous for pairwise sums
+    T[:, :, :n] = np.swapaxes(M_after, -1, -2)
+    T[:, :, n:] = np.swapaxes(V_in, 1, 2)
+    T = _nz(T)
+    sums = T.sum(axis=2)
+    j_min = cols.index("Min")
+    mins = T[:, j_min, :]
+    tot_min = sums[:, j_min]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = {"team_minutes": tot_min}
+        for feat, col in PER90_FROM_TOTAL.items():
+            out[feat] = np.where(tot_min > 0, sums[:, cols.index(col)] / (tot_min / 90.0), np.nan)
+        ages = np.empty((C, n + a))
+        ages[:, :n] = age
+        ages[:, n:] = _nz(age_in)
+        msum = mins.sum(axis=1)
+        out["avg_age_mwa"] = np.where(msum > 0, (ages * mins).sum(axis=1) / msum, np.nan)
+    return out
+
+def _history_frame(team: str, target_season: str, hist: np.ndarray, schema: FeatureSchema,
+                   promoted: int = 0) -> pd.DataFrame:
+    """Model rows from a (rows x history x HIST_METRICS) array, most recent season first.
+
+    Built by the same ``history_frame`` as the training set; trend is NaN for a
+    single season and filled by the pipeline's imputer.
+    """
+    n, L, _ = hist.shape
+    return schema.select(history_frame(target_season, [team] * n, hist, L, promoted))
+
+def history_features_batch(team: str, target_season: str, seqs: dict[str, np.ndarray],
+                           schema: FeatureSchema) -> pd.DataFrame:
+    """Feature frame from per-metric (rows x history) arrays, most recent season first."""
+    return _history_frame(team, target_season, np.stack([seqs[m] for m in HIST_METRICS], axis=2), schema)
+
+def _swap_context(team: str, target_season: str,
+                  league: str | None = None) -> tuple[str, PreparedSquad, list[dict], LeagueModel]:
+    """Previous season, the team's previous-season squad, its older history rows and its league model."""
+    prev = previous_season(target_season)
+    hist = _history_seasons(target_season, _available_seasons())
+    if not hist or hist[0] != prev:
+        raise ValueError(f"Expected history's most recent season to be {prev}, found {hist[:1]}")
+    lg = league_model(team, prev, league)
+    sq = prepare_squad_from_store(prev, team, lg.name)
+    if sq is None:
+        raise ValueError(f"{team} not found in {prev} {lg.name} players.")
+    older = [r for r in (lg.team_table.row(s, team) for s in hist[1:]) if r is not None]
+    return prev, sq, older, lg
+
+def _swap_feature_frame(team: str, target_season: str, older: list[dict],
+                        prev_feats: dict[str, np.ndarray], schema: FeatureSchema) -> pd.DataFrame:
+    n = len(prev_feats["team_minutes"])
+    seqs = {}
+    for m in HIST_METRICS:
+        tail = np.array([r.get(m, np.nan) for r in older], dtype=float)
+        seqs[m] = np.column_stack([prev_feats[m], np.broadcast_to(tail, (n, len(tail)))])
+    return history_features_batch(team, target_season, seqs, schema)
+
+def _incoming_feature_frame(team: str, target_season: str, older: list[dict], sq: PreparedSquad,
+                            rows: pd.DataFrame, minutes_in: float,
+                            outgoing_minutes: dict[str, int] | None, scale,
+                            schema: FeatureSchema) -> pd.DataFrame:
+    """Feature rows for ``rows`` each arriving alone with the same minutes and departures."""
+    M_after = squad_after_moves(sq, minutes_in, outgoing_minutes)
+    V = incoming_matrix(rows, sq.cols, minutes_in, scale)
+    age_in = _num(rows["Age"]).astype(float).to_numpy() if "Age" in rows.columns else np.zeros(len(rows))
+    feats = team_features_batch(M_after, sq.age, sq.cols, V, age_in)
+    return _swap_feature_frame(team, target_season, older, feats, schema)
+
+def predict_whatif_batch(team: str, target_season: str, candidates: list[dict],
+                         league: str | None = None) -> dict:
+    """Score many incoming players against one squad with a single PIPE.predict.
+
+    ``candidates`` items take ``incoming_player_name``, ``projected_minutes_in`` and
+    optionally ``outgoing_minutes`` and ``cross_league_scale``. Candidates sharing the
+    same minutes and departures share one redistributed squad matrix.
+    """
+    prev, sq, older, lg = _swap_context(team, target_season, league)
+
+    sm = SQUADS.get(prev)
+
+    found, errors = [], []
+    for c in candidates:
+        pos = sm.first_row(c["incoming_player_name"])
+        if pos is None:
+            errors.append({"incoming_player_name": c["incoming_player_name"],
+                           "error": f"Incoming player {c['incoming_player_name']} not found in season {prev}."})
+        else:
+            found.append((c, pos))
+
+    frames = [build_feature_vector_baseline(team, target_season, lg.slug)]
+    groups: dict[tuple, list[int]] = {}
+    for i, (c, _) in enumerate(found):
+        key = (float(c["projected_minutes_in"]), tuple(sorted((c.get("outgoing_minutes") or {}).items())))
+        groups.setdefault(key, []).append(i)
+    order = []
+    for (minutes_in, outgoing), idx in groups.items():
+        rows = sm.frame([found[i][1] for i in idx])
+        scale = [found[i][0].get("cross_league_scale", 1.0) for i in idx]
+        frames.append(_incoming_feature_frame(team, target_season, older, sq, rows,
+                                              minutes_in, dict(outgoing), scale, lg.schema))
+        order.extend(idx)
+
+    preds = get_pipeline(lg.slug).predict(pd.concat(frames, ignore_index=True))
+    base_pred = float(preds[0])
+    results = []
+    for i, p in zip(order, preds[1:]):
+        c = found[i][0]
+        results.append({
+            "incoming_player_name": c["incoming_player_name"],
+            "projected_minutes_in": c["projected_minutes_in"],
+            "points_with": float(p),
+            "delta": float(p) - base_pred,
+        })
+    results.sort(key=lambda r: r["delta"], reverse=True)
+    for rank, r in enumerate(results, 1):
+        r["rank"] = rank
+
+    return {
+        "league": lg.slug,
+        "season_target": target_season,
+        "season_features_from": prev,
+        "points_base": base_pred,
+        "results": results,
+        "errors": errors,
+    }
+
+
+def recommend_transfers(
+    team: str,
+    target_season: str,
+    projected_minutes_in: int,
+    outgoing_minutes: dict[str,int] | None = None,
+    cross_league_scale: float = 1.0,
+    positions: list[str] | None = None,
+    min_age: float | None = None,
+    max_age: float | None = None,
+    min_minutes: int = 0,
+    leagues: list[str] | None = None,
+    top_k: int = 10,
+    league: str | None = None,
+) -> dict:
+    """Scan every eligible previous-season player and return the top-K by points delta.
+
+    All candidates arrive with the same minutes and departures, so the squad is
+    redistributed once and the whole pool is scored with one predict. ``leagues``
+    (slugs or names, as ``league``) filters the candidate pool by the league of
+    their competition; ``league`` picks the model for ``team``.
+    """
+    slugs = {league_slug(l) for l in leagues} if leagues else None     # ValueError on an unknown league
+    prev, sq, older, lg = _swap_context(team, target_season, league)
+
+    pool = SQUADS.get(prev).frame()
+    pool = pool[pool["Squad"].str.lower() != team.lower()]
+    pool = pool[~pool["Player"].str.lower().duplicated()]            # first row per name, as /whatif resolves it
+    keep = np.ones(len(pool), dtype=bool)
+    if positions:
+        pos = pool["Pos"].astype(str).str.upper()
+        keep &= np.logical_or.reduce([pos.str.contains(p.upper(), regex=False).to_numpy() for p in positions])
+    age = _num(pool["Age"]).to_numpy(dtype=float)
+    if min_age is not None: keep &= age >= min_age
+    if max_age is not None: keep &= age <= max_age
+    if min_minutes: keep &= _nz(_num(pool["Min"]).to_numpy(dtype=float)) >= min_minutes
+    if slugs and "Comp" in pool.columns:
+        comp = pool["Comp"]
+        keep &= comp.map({c: league_for_comp(c) in slugs for c in comp.unique()}).to_numpy(dtype=bool)
+    pool = pool[keep]
+
+    X_base = build_feature_vector_baseline(team, target_season, lg.slug)
+    if pool.empty:
+        base_pred = float(get_pipeline(lg.slug).predict(X_base)[0])
+        scanned, top = 0, []
+    else:
+        X = _incoming_feature_frame(team, target_season, older, sq, pool,
+                                    projected_minutes_in, outgoing_minutes, cross_league_scale, lg.schema)
+        preds = get_pipeline(lg.slug).predict(pd.concat([X_base, X], ignore_index=True))
+        base_pred = float(preds[0])
+        delta = preds[1:] - base_pred
+        scanned = len(pool)
+        k = min(top_k, scanned)
+        best = np.argpartition(-delta, k - 1)[:k]
+        best = best[np.argsort(-delta[best], kind="stable")]
+        top = []
+        for rank, i in enumerate(best, 1):
+            r = pool.iloc[i]
+            top.append({
+                "rank": rank,
+                "player_name": r["Player"],
+                "squad": r["Squad"],
+                "comp": r.get("Comp"),
+                "pos": r.get("Pos"),
+                "age": None if pd.isna(r.get("Age")) else float(r["Age"]),
+                "minutes_prev": None if pd.isna(r.get("Min")) else float(r["Min"]),
+                "points_with": float(preds[1 + i]),
+                "delta": float(delta[i]),
+            })
+
+    return {
+        "league": lg.slug,
+        "season_target": target_season,
+        "season_features_from": prev,
+        "points_base": base_pred,
+        "projected_minutes_in": projected_minutes_in,
+        "scanned": scanned,
+        "results": top,
+    }
+
+MAX_SWEEP_STEPS = 200
+
+def minutes_grid(start: int, stop: int, step: int, max_steps: int = MAX_SWEEP_STEPS) -> list[int]:
+    """Inclusive minutes range, e.g. minutes_grid(0, 3420, 270).
+
+    The step count is checked before the list is built, so a huge range costs nothing.
+    """
+    if step <= 0 or stop < start:
+        raise ValueError(f"Invalid minutes range start={start} stop={stop} step={step}")
+    n = (stop - start) // step + 1
+    if n > max_steps:
+        raise ValueError(f"Minutes range has {n} steps, more than {max_steps}")
+    return list(range(start, stop + 1, step))
+
+def predict_minutes_sweep(
+    team: str,
+    target_season: str,
+    incoming_player_name: str,
+    minutes: list[int],
+    outgoing_minutes: dict[str,int] | None = None,
+    cross_league_scale: float = 1.0,
+    league: str | None = None,
+    projected_minutes_in: int | None = None,
+) -> dict:
+    """Points-delta curve for one incoming player as projected minutes vary.
+
+    The baseline vector and prepared squad are built once; each step only
+    re-runs the matrix redistribution, and all steps share one predict.
+    With ``projected_minutes_in`` the result also has that point's
+    ``points_with`` / ``delta`` (as predict_with_and_without_transfer),
+    scored in the same predict.
+    """
+    prev, sq, older, lg = _swap_context(team, target_season, league)
+
+    sm = SQUADS.get(prev)
+    row = sm.first_row(incoming_player_name)
+    if row is None:
+        raise ValueError(f"Incoming player {incoming_player_name} not found in season {prev}.")
+    steps = list(minutes) if projected_minutes_in is None else [projected_minutes_in, *minutes]
+    rows = sm.frame([row] * len(steps))
+
+    M_steps = np.stack([squad_after_moves(sq, m, outgoing_minutes) for m in steps])
+    V = incoming_matrix(rows, sq.cols, steps, cross_league_scale)
+    age_in = _num(rows["Age"]).astype(float).to_numpy() if "Age" in rows.columns else np.zeros(len(rows))
+    X = _swap_feature_frame(team, target_season, older, team_features_batch(M_steps, sq.age, sq.cols, V, age_in),
+                            lg.schema)
+
+    X_base = build_feature_vector_baseline(team, target_season, lg.slug)
+    preds = get_pipeline(lg.slug).predict(pd.concat([X_base, X], ignore_index=True))
+    base_pred, preds = float(preds[0]), preds[1:]
+    res = {
+        "league": lg.slug,
+        "season_target": target_season,
+        "season_features_from": prev,
+        "points_base": base_pred,
+    }
+    if projected_minutes_in is not None:
+        with_pred, preds = float(preds[0]), preds[1:]
+        res.update(points_with=with_pred, delta=with_pred - base_pred)
+    res["curve"] = [{"projected_minutes_in": m, "points_with": float(p), "delta": float(p) - base_pred}
+                    for m, p in zip(minutes, preds)]
+    return res
+
+def simulate_transfer_window(
+    team: str,
+    target_season: str,
+    arrivals: list[dict],
+    departures: dict[str,int] | None = None,
+    league: str | None = None,
+) -> dict:
+    """Apply several arrivals and departures to the previous-season squad at once.
+
+    ``arrivals`` items take ``incoming_player_name``, ``projected_minutes_in`` and
+    optionally ``cross_league_scale``; ``departures`` maps squad players to minutes
+    leaving. Each move's marginal contribution is the full window's delta minus the
+    delta of the window without that move. The squad matrix is prepared once and
+    the full window plus every leave-one-out variant share one predict.
+    """
+    departures = {k: v for k, v in (departures or {}).items()}
+    prev, sq, older, lg = _swap_context(team, target_season, league)
+
+    unknown = [nm for nm in departures if not (sq.names_lower == str(nm).lower()).any()]
+    if unknown:
+        raise ValueError(f"Departing players not in {team} {prev} squad: {unknown}")
+
+    sm = SQUADS.get(prev)
+    pos = []
+    for a in arrivals:
+        row = sm.first_row(a["incoming_player_name"])
+        if row is None:
+            raise ValueError(f"Incoming player {a['incoming_player_name']} not found in season {prev}.")
+        pos.append(row)
+
+    moves = ([("in", a["incoming_player_name"], i) for i, a in enumerate(arrivals)] +
+             [("out", nm, None) for nm in departures])
+    # scenario 0 is the full window, scenario j+1 drops moves[j]
+    A = len(arrivals)
+    arrival_on = np.ones((len(moves) + 1, A), dtype=bool)
+    outgoing = [dict(departures)]
+    for j, (kind, name, i) in enumerate(moves):
+        if kind == "in":
+            arrival_on[j + 1, i] = False
+            outgoing.append(dict(departures))
+        else:
+            outgoing.append({k: v for k, v in departures.items() if k != name})
+
+    mins_in = np.array([float(a["projected_minutes_in"]) for a in arrivals])
+    rows = sm.frame(pos)
+    V = incoming_matrix(rows, sq.cols, mins_in, [a.get("cross_league_scale", 1.0) for a in arrivals])
+    age = _num(rows["Age"]).astype(float).to_numpy() if "Age" in rows.columns else np.zeros(A)
+
+    M_steps = np.stack([squad_after_moves(sq, mins_in[on], out) for on, out in zip(arrival_on, outgoing)])
+    V_s = np.where(arrival_on[:, :, None], V[None, :, :], np.nan)
+    age_s = np.where(arrival_on, age[None, :], np.nan)
+    X = _swap_feature_frame(team, target_season, older, team_features_batch(M_steps, sq.age, sq.cols, V_s, age_s),
+                            lg.schema)
+
+    X_base = build_feature_vector_baseline(team, target_season, lg.slug)
+    preds = get_pipeline(lg.slug).predict(pd.concat([X_base, X], ignore_index=True))
+    base_pred, with_pred = float(preds[0]), float(preds[1])
+    out_moves = []
+    for j, (kind, name, i) in enumerate(moves):
+        m = {"type": kind, "player_name": name}
+        if kind == "in":
+            m["projected_minutes_in"] = arrivals[i]["projected_minutes_in"]
+        else:
+            m["minutes_out"] = departures[name]
+        m["marginal_delta"] = with_pred - float(preds[j + 2])
+        out_moves.append(m)
+
+    return {
+        "league": lg.slug,
+        "season_target": target_season,
+        "season_features_from": prev,
+        "points_base": base_pred,
+        "points_with": with_pred,
+        "delta": with_pred - base_pred,
+        "moves": out_moves,
+    }
+
+def data_version() -> str:
+    """Changes whenever any league's pipeline file or any season file changes (for response caching)."""
+    paths = [*sorted(MODELS_ROOT.glob("*/pipeline.joblib")), *sorted(DATA_DIR.glob("fbref_merged_*.csv")),
+             *sorted(DATA_DIR.glob("fbref_merged_*.parquet"))]
+    stamp = ";".join(f"{p.name}:{p.stat().st_mtime_ns}" for p in paths if p.exists())
+    return format(zlib.crc32(stamp.encode()), "08x")
+
+def warm_up() -> dict:
+    """Load the pipelines, squad store and team-feature tables; returns seconds per stage.
+
+    Pipelines are loaded for the default league first, then the other trained
+    leagues until the registry is full.
+    """
+    timings = {}
+    t0 = time.perf_counter()
+    PIPELINES.warm([LEAGUE_SLUG] + [s for s in PIPELINES.available() if s != LEAGUE_SLUG])
+    timings["pipeline"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    seasons = _available_seasons()
+    SQUADS.warm(seasons)
+    timings["squad_store"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for lg in LEAGUE_MODELS.values():
+        lg.team_table.warm(seasons)
+    timings["team_features"] = time.perf_counter() - t0
+    return timings
+
+if __name__ == "__main__":
+    for slug, lg in LEAGUE_MODELS.items():
+        out = write_team_feature_table(league=slug)
+        print(f"Saved {len(out)} team-season rows to {lg.team_table.path}")
@@ -0,0 +1,242 @@
+from __future__ import annotations
+import json
+import os
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+
+# Bump when the files' layout changes, so existing stores are rebuilt
+FORMAT = 2
+
+
+@dataclass
+class SeasonMatrix:
+    """One season's players as a single (players x cols) matrix, squads contiguous.
+
+    Besides the numbers it carries each row's name, position and competition and
+    its row in the season file, so player lookups never need the season frame.
+    """
+    season: str
+    cols: list[str]
+    M: np.ndarray                 # float32 (float64 if float32 would round), usually a read-only memmap
+    names_lower: np.ndarray
+    comps_lower: np.ndarray | None
+    outfield: np.ndarray
+    offsets: dict[str, tuple[int, int]]   # lower-cased squad -> (start, stop) rows
+    squad_names: dict[str, str]           # lower-cased squad -> name as first spelled in the file
+    players: np.ndarray                   # names as spelled in the file
+    squads: np.ndarray                    # squad_names entry of each row
+    pos: np.ndarray
+    comps: np.ndarray | None
+    file_order: np.ndarray                # matrix rows in season-file order
+    first_by_name: dict[str, int]         # lower-cased name -> matrix row of its first file row
+
+    def first_row(self, name: str) -> int | None:
+        """Matrix row of the first season-file row named ``name`` (case-insensitive)."""
+        return self.first_by_name.get(str(name).lower())
+
+    def frame(self, rows=None) -> pd.DataFrame:
+        """Player, Pos, Squad, Comp and the matrix columns for ``rows`` (default: every row in file order)."""
+        rows = self.file_order if rows is None else np.asarray(rows, dtype=int)
+        out = {"Player": self.players[rows], "Pos": self.pos[rows], "Squad": self.squads[rows]}
+        if self.comps is not None:
+            out["Comp"] = self.comps[rows]
+        M = np.asarray(self.M[rows], dtype=float)
+        for j, c in enumerate(self.cols):
+            out[c] = M[:, j]
+        return pd.DataFrame(out)
+
+    def squad(self, team: str, league_name: str = "") -> slice | np.ndarray | None:
+        """Rows of ``team`` whose Comp contains ``league_name``.
+
+        A slice (so ``M[rows]`` is a view) unless only part of the squad's rows
+        belong to the league, then an index array. None for an unknown squad.
+        """
+        span = self.offsets.get(team.lower())
+        if span is None:
+            return None
+        start, stop = span
+        if self.comps_lower is None or not league_name:
+            return slice(start, stop)
+        keep = np.array([league_name.lower() in c for c in self.comps_lower[start:stop]], dtype=bool)
+        if keep.all():
+            return slice(start, stop)
+        return np.flatnonzero(keep) + start if keep.any() else None
+
+
+class SquadStore:
+    """Per-season squad matrices on disk, memory-mapped by every process that uses them.
+
+    ``<root>/<season>-<stamp>.npy`` holds the count matrix (rows grouped by squad,
+    file order kept within a squad) and ``<root>/<season>.json`` the columns,
+    squad offsets, player names, positions, competitions, outfield flags and
+    each row's position in the season file. ``stamp``
+    identifies the season file the matrix was built from, so a changed source
+    is rebuilt on next access. Files are written to a temporary name and
+    renamed, so workers building the same season at once do not see partial
+    files. When ``root`` is not writable the matrix is kept in memory instead.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        frame: Callable[[str], pd.DataFrame],
+        source: Callable[[str], Path],
+        cols: list[str],
+    ):
+        self.root = Path(root)
+        self._frame = frame
+        self._source = source
+        self._cols = cols
+        self._lock = threading.RLock()
+        self._seasons: dict[str, tuple[str, SeasonMatrix]] = {}
+
+    def _stamp(self, season: str) -> str:
+        st = self._source(season).stat()
+        key = f"{FORMAT}:{self._source(season).name}:{st.st_mtime_ns}:{st.st_size}:{','.join(self._cols)}"
+        return format(zlib.crc32(key.encode()), "08x")
+
+    def get(self, season: str) -> SeasonMatrix:
+        stamp = self._stamp(season)
+        cached = self._seasons.get(season)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        with self._lock:
+            cached = self._seasons.get(season)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+            sm = self._open(season, stamp)
+            if sm is None:
+                sm = self._build(season, stamp)
+            self._seasons[season] = (stamp, sm)
+            return sm
+
+    def _open(self, season: str, stamp: str) -> SeasonMatrix | None:
+        meta_path = self.root / f"{season}.json"
+        try:
+            meta = json.loads(meta_path.read_text())
+            if meta["stamp"] != stamp:
+                return None
+            M = np.load(self.root / meta["matrix"], mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            return None
+        return _season_matrix(season, meta["cols"], M, meta["players"], meta["pos"], meta["comps"],
+                              meta["outfield"], meta["offsets"], meta["squad_names"], meta["order"])
+
+    def _build(self, season: str, stamp: str) -> SeasonMatrix:
+        df = self._frame(season)
+        squads = df["Squad"].astype(str).str.lower().to_numpy()
+        codes, uniques = pd.factorize(squads)                # codes in order of first appearance
+        order = np.argsort(codes, kind="stable")
+        bounds = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(uniques)))))
+        offsets = {str(u): (int(bounds[i]), int(bounds[i + 1])) for i, u in enumerate(uniques)}
+        first = df["Squad"].astype(str).to_numpy()[order][bounds[:-1]]
+        squad_names = {str(u): str(n) for u, n in zip(uniques, first)}
+
+        cols = [c for c in self._cols if c in df.columns]
+        M64 = np.column_stack([pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float)[order] for c in cols])
+        M = M64.astype(np.float32)
+        if not np.array_equal(M.astype(float), M64, equal_nan=True):
+            M = M64                                        # keep results exact for fractional stats
+        comps = df["Comp"].to_numpy()[order] if "Comp" in df.columns else None
+        if "Pos" in df.columns:
+            pos = df["Pos"].to_numpy()[order]
+            outfield = ~df["Pos"].astype(str).str.contains("GK", case=False, na=False).to_numpy()[order]
+        else:
+            pos = np.full(len(df), None, dtype=object)
+            outfield = np.ones(len(df), dtype=bool)
+
+        sm = _season_matrix(season, cols, M, df["Player"].astype(str).to_numpy()[order], pos, comps,
+                            outfield, offsets, squad_names, order)
+        try:
+            self._write(sm, stamp)
+            opened = self._open(season, stamp)
+            if opened is not None:
+                return opened
+        except OSError as e:
+            print(f"Squad store: keeping {season} in memory ({e})")
+        return sm
+
+    def _write(self, sm: SeasonMatrix, stamp: str) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        matrix = f"{sm.season}-{stamp}.npy"
+        tmp = self.root / f".{matrix}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(sm.M))
+        os.replace(tmp, self.root / matrix)
+
+        meta = {
+            "season": sm.season,
+            "stamp": stamp,
+            "matrix": matrix,
+            "dtype": str(sm.M.dtype),
+            "cols": sm.cols,
+            "offsets": sm.offsets,
+            "squad_names": sm.squad_names,
+            "players": sm.players.tolist(),
+            "pos": [_json_str(v) for v in sm.pos],
+            "comps": None if sm.comps is None else [_json_str(v) for v in sm.comps],
+            "outfield": sm.outfield.tolist(),
+            "order": np.argsort(sm.file_order).tolist(),
+        }
+        tmp = self.root / f".{sm.season}.json.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.root / f"{sm.season}.json")
+
+        for old in self.root.glob(f"{sm.season}-*.npy"):
+            if old.name != matrix:
+                try:
+                    old.unlink()       # open memmaps keep their pages until closed
+                except OSError:
+                    pass
+
+    def invalidate(self, season: str | None = None) -> None:
+        with self._lock:
+            if season is None:
+                self._seasons.clear()
+            else:
+                self._seasons.pop(season, None)
+
+    def warm(self, seasons: list[str]) -> None:
+        for s in seasons:
+            self.get(s)
+
+
+def _json_str(v) -> str | None:
+    return None if v is None or v != v else str(v)     # NaN -> None
+
+
+def _season_matrix(season, cols, M, players, pos, comps, outfield, offsets, squad_names, order) -> SeasonMatrix:
+    """``order`` gives each matrix row's position in the season file."""
+    players = np.asarray(players, dtype=object)
+    names_lower = np.array([str(p).lower() for p in players], dtype=object)
+    comps = None if comps is None else np.asarray(comps, dtype=object)
+    file_order = np.argsort(np.asarray(order), kind="stable")
+    squads = np.empty(len(players), dtype=object)
+    for key, (start, stop) in offsets.items():
+        squads[start:stop] = squad_names[key]
+    first_by_name: dict[str, int] = {}
+    for row in file_order.tolist():
+        first_by_name.setdefault(names_lower[row], row)
+    return SeasonMatrix(
+        season=season,
+        cols=list(cols),
+        M=M,
+        names_lower=names_lower,
+        comps_lower=None if comps is None else np.array([str(c).lower() for c in comps], dtype=object),
+        outfield=np.asarray(outfield, dtype=bool),
+        offsets={k: tuple(v) for k, v in offsets.items()},
+        squad_names=dict(squad_names),
+        players=players,
+        squads=squads,
+        pos=np.asarray(pos, dtype=object),
+        comps=comps,
+        file_order=file_order,
+        first_by_name=first_by_name,
+    )
@@ -0,0 +1,106 @@
+from __future__ import annotations
+import hashlib
+import threading
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class TeamFeatureTable:
+    """Per-season team features, precomputed once and looked up by squad.
+
+    Backed by a CSV artifact (``team_features.csv`` next to ``pipeline.joblib``)
+    holding one row per (Season, Squad) plus the digest of the season file it was
+    built from. A season that is missing from the artifact, or whose source file
+    no longer matches the digest, is computed live with ``compute`` and kept in
+    memory for the life of the process.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        compute: Callable[[str], pd.DataFrame],
+        source_path: Callable[[str], Path],
+    ):
+        self.path = Path(path)
+        self._compute = compute
+        self._source_path = source_path
+        self._lock = threading.RLock()
+        self._persisted: dict[str, tuple[str, dict[str, dict]]] | None = None
+        self._rows: dict[str, dict[str, dict]] = {}
+        self._checked: dict[str, float] = {}       # season -> source mtime last verified
+
+    @staticmethod
+    def _index(feats: pd.DataFrame) -> dict[str, dict]:
+        idx: dict[str, dict] = {}
+        for r in feats.to_dict("records"):
+            idx.setdefault(str(r["Squad"]).lower(), r)   # first match wins, like a boolean filter + iloc[0]
+        return idx
+
+    def _load_persisted(self) -> dict[str, tuple[str, dict[str, dict]]]:
+        if self._persisted is None:
+            out: dict[str, tuple[str, dict[str, dict]]] = {}
+            if self.path.exists():
+                df = pd.read_csv(self.path, float_precision="round_trip")
+                for season, g in df.groupby("Season", sort=False):
+                    digest = str(g["source_digest"].iloc[0])
+                    feats = g.drop(columns=["Season", "source_digest"])
+                    out[str(season)] = (digest, self._index(feats))
+            self._persisted = out
+        return self._persisted
+
+    def _season_rows(self, season: str) -> dict[str, dict]:
+        src = self._source_path(season)
+        mtime = src.stat().st_mtime
+        rows = self._rows.get(season)
+        if rows is not None and self._checked.get(season) == mtime:
+            return rows
+        with self._lock:
+            persisted = self._load_persisted().get(season)
+            if persisted is not None and persisted[0] == file_digest(src):
+                rows = persisted[1]
+            else:
+                rows = self._index(self._compute(season))
+            self._rows[season] = rows
+            self._checked[season] = mtime
+            return rows
+
+    def row(self, season: str, squad: str) -> dict | None:
+        return self._season_rows(season).get(squad.lower())
+
+    def warm(self, seasons: list[str]) -> None:
+        for s in seasons:
+            self._season_rows(s)
+
+    def invalidate(self, season: str | None = None) -> None:
+        with self._lock:
+            if season is None:
+                self._rows.clear()
+                self._checked.clear()
+                self._persisted = None
+            else:
+                self._rows.pop(season, None)
+                self._checked.pop(season, None)
+
+    def write(self, seasons: list[str]) -> pd.DataFrame:
+        """Recompute ``seasons`` and persist them as the artifact."""
+        frames = []
+        for s in seasons:
+            feats = self._compute(s).copy()
+            feats.insert(0, "Season", s)
+            feats["source_digest"] = file_digest(self._source_path(s))
+            frames.append(feats)
+        out = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        out.to_csv(self.path, index=False)
+        self.invalidate()
+        return out
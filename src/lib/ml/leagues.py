@@ -0,0 +1,36 @@
+"""
+Leagues with a points model, keyed by the slug used in file and model paths.
+
+Team files are ``src/lib/data/<slug>_<season>_team_clean.csv`` and each league's
+pipeline lives in ``src/lib/ml/v1/<slug>/``. Player files name the competition
+with a country prefix ("eng Premier League"), so a competition belongs to the
+league whose name it contains.
+"""
+from __future__ import annotations
+
+LEAGUES = {
+    "pl": "Premier League",
+    "la-liga": "La Liga",
+    "bundesliga": "Bundesliga",
+    "serie-a": "Serie A",
+    "ligue-1": "Ligue 1",
+}
+DEFAULT_LEAGUE = "pl"
+
+
+def league_slug(league: str) -> str:
+    """Slug for a league given by slug or name, ignoring case."""
+    key = str(league).strip().lower()
+    for slug, name in LEAGUES.items():
+        if key in (slug, name.lower()):
+            return slug
+    raise ValueError(f"Unknown league {league!r}; expected one of {sorted(LEAGUES)}")
+
+
+def league_for_comp(comp: str) -> str | None:
+    """Slug of the league a player-file competition belongs to, None if it has no model."""
+    comp = str(comp).lower()
+    for slug, name in LEAGUES.items():
+        if name.lower() in comp:
+            return slug
+    return None
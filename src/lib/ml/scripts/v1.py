@@ -1,5 +1,6 @@
 from __future__ import annotations
-import json, math
+import argparse, json, math, os, sys, time, zlib
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List
@@ -18,28 +19,54 @@ import joblib
 from xgboost import XGBRegressor
 from pathlib import Path
 
+if str(Path(__file__).resolve().parents[4]) not in sys.path:
+    sys.path.append(str(Path(__file__).resolve().parents[4]))
+from src.lib.columnar import read_table
+from src.lib.ml.features.history import pack_history
+from src.lib.ml.features.schema import (
+    HIST_METRICS, NON_TREND_NUMS, NUM_FEATURES, TREND_FEATURES, FeatureSchema, history_frame,
+)
+from src.lib.ml.features.team import is_player_column, team_features_from_players
+from src.lib.ml.leagues import DEFAULT_LEAGUE, LEAGUES, league_slug
+
 # -------------------
 # CONFIG (edit paths)
 # -------------------
 
 ROOT = Path(__file__).resolve().parents[4]
 
-LEAGUE_NAME = "Premier League"  
-LEAGUE_SLUG = "pl"
+# One pipeline per league in LEAGUES; these are the defaults of the per-league functions
+LEAGUE_SLUG = DEFAULT_LEAGUE
+LEAGUE_NAME = LEAGUES[LEAGUE_SLUG]
 
 DATA_DIRS = [
     ROOT / "src/lib/data",
     ROOT / "src/ml/data/processed",
 ]
-MODELS_DIR = ROOT / f"src/lib/ml/v1/{LEAGUE_SLUG}"
-MODELS_DIR.mkdir(parents=True, exist_ok=True)
+MODELS_ROOT = ROOT / "src/lib/ml/v1"
+
+def models_dir(league: str) -> Path:
+    return MODELS_ROOT / league
 
 FEATURE_SEASONS = ["2021-2022", "2022-2023", "2023-2024"]
 TARGET_SEASONS = ["2022-2023", "2023-2024", "2024-2025"]
 
-CV_FOLDS = [dict(train=["2022-2023"], val="2023-2024")]
 TEST_SEASON = "2024-2025"
 
+def rolling_origin_folds(seasons: List[str], test_season: str, min_train: int = 1) -> List[dict]:
+    """Expanding-window folds before ``test_season``: train on every earlier season, validate on the next."""
+    start = lambda s: int(s.split("-")[0])
+    pre = sorted((s for s in seasons if start(s) < start(test_season)), key=start)
+    return [dict(train=pre[:i], val=pre[i]) for i in range(min_train, len(pre))]
+
+CV_FOLDS = rolling_origin_folds(TARGET_SEASONS, TEST_SEASON)
+
+# Hyperparameters tried per model; each combination runs on every fold of every league
+PARAM_GRID = {
+    "ridge": [{"alpha": a} for a in (1.0, 3.0, 10.0, 30.0)],
+    "xgb": [{"max_depth": d, "learning_rate": lr} for d in (3, 4) for lr in (0.03, 0.07)],
+}
+
 RANDOM_SEED = 42
 np.random.seed(RANDOM_SEED)
 
@@ -56,22 +83,21 @@ def load_player_df_for_season(season: str) -> pd.DataFrame | None:
     for d in DATA_DIRS:
         p = d / fname
         if p.exists():
-            df = pd.read_csv(p)
+            df = read_table(p, is_player_column)
             df["Season"] = season
             return df
     print(f"!! Missing player CSV for season {season} in {DATA_DIRS}")
     return None
 
-def load_targets() -> pd.DataFrame:
+def load_targets(league: str = LEAGUE_SLUG) -> pd.DataFrame:
+    # the file name identifies the league: the cleaned team files carry no usable Comp
     frames = []
     for season in TARGET_SEASONS:
-        pat = f"*_{season.replace('-', '_')}_team_clean.csv"
+        pat = f"{league}_{season.replace('-', '_')}_team_clean.csv"
         found_any = False
         for d in DATA_DIRS:
             for p in d.glob(pat):
-                df = pd.read_csv(p)
-                if "Comp" in df.columns:
-                    df = df[df["Comp"].astype(str).str.strip() == LEAGUE_NAME]
+                df = read_table(p, ["Squad", "Pts", "Points"])
                 if df.empty: 
                     continue
                 df["Season"] = season
@@ -85,108 +111,22 @@ def load_targets() -> pd.DataFrame:
         if not found_any:
             print(f"!! No team file found for {season} matching {pat} in {DATA_DIRS}")
     if not frames:
-        raise FileNotFoundError("No targets assembled from team files.")
+        raise FileNotFoundError(f"No {league} targets assembled from team files.")
     return pd.concat(frames, ignore_index=True)
 
 # -------------------
 # Feature engineering (per season → team features)
 # -------------------
-NUMSAFE = lambda s: pd.to_numeric(s, errors="coerce")
-
-def minutes_weighted_avg(series: pd.Series, minutes: pd.Series) -> float:
-    s = NUMSAFE(series).fillna(0.0)
-    m = NUMSAFE(minutes).fillna(0.0)
-    wsum = (s * m).sum()
-    denom = m.sum()
-    return float(wsum / denom) if denom > 0 else np.nan
-
-def sum_safe(series: pd.Series) -> float:
-    return float(NUMSAFE(series).fillna(0.0).sum())
-
-def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    lower_to_orig = {c.lower(): c for c in df.columns}
-
-    aliases = {
-        "squad": "Squad", "team": "Squad", "club": "Squad", "squad_x": "Squad", "squad_y": "Squad",
-        "comp": "Comp", "competition": "Comp", "league": "Comp",
-        "player": "Player", "name": "Player",
-        "min": "Min", "minutes": "Min",
-        "gls": "Gls", "goals": "Gls",
-        "ast": "Ast", "assists": "Ast",
-        "sh": "Sh", "shots": "Sh",
-        "sot": "SoT",
-        "prgp": "PrgP", "prg p": "PrgP",
-        "prgc": "PrgC", "prg c": "PrgC",
-        "prgr": "PrgR", "prg r": "PrgR",
-        "tkl+int": "Tkl+Int", "tkl_int": "Tkl+Int",
-        "tkl": "Tkl", "int": "Int",
-        "blocks": "Blocks",
-        "age": "Age",
-        "sca": "SCA",
-    }
+def build_team_features_from_players(players_prev: pd.DataFrame, league_name: str = LEAGUE_NAME) -> pd.DataFrame:
+    return team_features_from_players(players_prev, league_name)
 
-    for lk, target in aliases.items():
-        if lk in lower_to_orig and target not in df.columns:
-            df = df.rename(columns={lower_to_orig[lk]: target})
-
-    if "Tkl+Int" not in df.columns and {"Tkl","Int"}.issubset(df.columns):
-        df["Tkl+Int"] = pd.to_numeric(df["Tkl"], errors="coerce") + pd.to_numeric(df["Int"], errors="coerce")
-
-    df.columns = [str(c).strip() for c in df.columns]
-    return df
-
-
-def build_team_features_from_players(players_prev: pd.DataFrame) -> pd.DataFrame:
-    df = players_prev.copy()
-    df = normalize_columns(df)
-
-    if "Comp" in df.columns:
-        df = df[df["Comp"].astype(str).str.strip() == LEAGUE_NAME]
-
-    for k in ["Player","Squad"]:
-        if k in df.columns:
-            df[k] = df[k].astype(str).str.strip()
-
-    if "Squad" not in df.columns or "Min" not in df.columns:
-        raise ValueError("Expected 'Squad' and 'Min' columns in player DF.")
-
-    groups = df.groupby("Squad", as_index=False)
-    feats = []
-    for squad, g in groups:
-        mins = NUMSAFE(g.get("Min", 0))
-        team_minutes = mins.sum()
-
-        def per90_from_total(col):
-            total = sum_safe(g.get(col, 0))
-            return (total / (team_minutes / 90.0)) if team_minutes > 0 else np.nan
-
-        def mwa(col):
-            return minutes_weighted_avg(g.get(col, 0), mins)
-
-        feats.append({
-            "Squad": squad,
-            "team_minutes": float(team_minutes),
-            "gls_per90": per90_from_total("Gls"),
-            "ast_per90": per90_from_total("Ast"),
-            "sh_per90": per90_from_total("Sh"),
-            "sot_per90": per90_from_total("SoT"),
-            "sca_per90": per90_from_total("SCA"),
-            "tklint_per90": per90_from_total("Tkl+Int"),
-            "blocks_per90": per90_from_total("Blocks"),
-            "prgp_per90": per90_from_total("PrgP"),
-            "prgc_per90": per90_from_total("PrgC"),
-            "prgr_per90": per90_from_total("PrgR"),
-            "avg_age_mwa": mwa("Age"),
-        })
-    return pd.DataFrame(feats)
-
-def make_team_features_by_season() -> dict[str, pd.DataFrame]:
+def make_team_features_by_season(league_name: str = LEAGUE_NAME) -> dict[str, pd.DataFrame]:
     team_feats_by_season = {}
     for s in FEATURE_SEASONS:
         pdf = load_player_df_for_season(s)
         if pdf is None:
             continue
-        tdf = build_team_features_from_players(pdf)
+        tdf = build_team_features_from_players(pdf, league_name)
         tdf["FeaturesSeason"] = s
         team_feats_by_season[s] = tdf
     return team_feats_by_season
@@ -201,112 +141,50 @@ def history_seasons_for(t: str) -> List[str]:
     hist.sort(key=season_start_year, reverse=True)
     return hist
 
-HIST_METRICS = [
-    "gls_per90","ast_per90","sot_per90","sca_per90",
-    "tklint_per90","blocks_per90",
-    "prgp_per90","prgc_per90","prgr_per90",
-    "avg_age_mwa","team_minutes",
-]
-
-def exp_decay_weights(n: int, half_life: float = 1.0) -> np.ndarray:
-    ages = np.arange(n, dtype=float)
-    w = 0.5 ** (ages / half_life)
-    return w / w.sum() if w.sum() > 0 else np.ones(n)/n
-
-def linear_trend(values: List[float]) -> float:
-    x = np.arange(len(values), dtype=float)
-    y = np.array(values, dtype=float)
-    mask = np.isfinite(y)
-    if mask.sum() < 2:
-        return np.nan
-    return float(np.polyfit(x[mask], y[mask], 1)[0])
-
-def aggregate_history(rows: List[dict]) -> dict:
-    out = {}
-    out["history_len"] = len(rows)
-    if not rows:
-        for m in HIST_METRICS:
-            out[f"last1_{m}"] = np.nan
-            out[f"expw_{m}"] = np.nan
-            out[f"trend_{m}"] = np.nan
-            out[f"mean_all_{m}"] = np.nan
-        return out
-
-    for m in HIST_METRICS:
-        seq = [r.get(m, np.nan) for r in rows] 
-        out[f"last1_{m}"] = seq[0]
-
-        arr = np.array(seq, dtype=float)
-        out[f"mean_all_{m}"] = float(np.nanmean(arr)) if np.isfinite(arr).any() else np.nan
-
-        w = exp_decay_weights(len(seq), half_life=1.0)
-        mask = np.isfinite(arr)
-        out[f"expw_{m}"] = float((arr[mask] * (w[mask] / w[mask].sum())).sum()) if mask.any() else np.nan
-
-        out[f"trend_{m}"] = linear_trend(seq)
-    return out
-
 # -------------------
 # Build dataset 
 # -------------------
-def build_team_season_dataset_multi() -> pd.DataFrame:
-    team_feats_by_season = make_team_features_by_season()
-    targets = load_targets()
+def build_team_season_dataset_multi(league: str = LEAGUE_SLUG) -> pd.DataFrame:
+    team_feats_by_season = make_team_features_by_season(LEAGUES[league])
+    targets = load_targets(league)
+    if not team_feats_by_season:
+        return pd.DataFrame()
 
-    rows = []
+    # one Squad x (metric, season) pivot holds every history row
+    feats = pd.concat(team_feats_by_season.values(), ignore_index=True)
+    cube = feats.pivot(index="Squad", columns="FeaturesSeason", values=HIST_METRICS)
+
+    frames = []
     for t in TARGET_SEASONS:
         hist_seasons = [s for s in history_seasons_for(t) if s in team_feats_by_season]
         if not hist_seasons:
             print(f"Skipping {t}: no previous feature seasons found.")
             continue
 
-        tgt_t = targets[targets["Season"] == t].copy()
+        tgt_t = targets[targets["Season"] == t]
         if tgt_t.empty:
-            print(f"!! No targets for {t}.")
+            print(f"!! No {league} targets for {t}.")
             continue
 
-        by_season = {s: team_feats_by_season[s].set_index("Squad") for s in hist_seasons}
-
-        most_recent_prev = hist_seasons[0]
-        prev_teams = set(by_season[most_recent_prev].index.tolist())
-        tgt_t["promoted"] = (~tgt_t["Squad"].isin(prev_teams)).astype(int)
-
-        for _, row in tgt_t.iterrows():
-            team = row["Squad"]
-
-            hist_rows = []
-            for s in hist_seasons:
-                df = by_season[s]
-                if team in df.index:
-                    d = df.loc[team].to_dict()
-                    d["FeaturesSeason"] = s
-                    hist_rows.append(d)
+        teams = tgt_t["Squad"].to_numpy()
+        present = np.column_stack([np.isin(teams, team_feats_by_season[s]["Squad"].to_numpy()) for s in hist_seasons])
+        cols = pd.MultiIndex.from_product([HIST_METRICS, hist_seasons])
+        hist = cube.reindex(index=teams, columns=cols).to_numpy(dtype=float)
+        hist = hist.reshape(len(teams), len(HIST_METRICS), len(hist_seasons)).transpose(0, 2, 1)
+        hist, hist_len = pack_history(hist, present)
 
-            agg = aggregate_history(hist_rows)
-            out = {"Season": t, "Squad": team, "points": row["points"], "promoted": int(row["promoted"])}
-            out.update(agg)
-            rows.append(out)
+        out = history_frame(t, teams, hist, hist_len, promoted=~present[:, 0])
+        out.insert(2, "points", tgt_t["points"].to_numpy())
+        frames.append(out)
 
-    data = pd.DataFrame(rows)
-    last1_cols = [f"last1_{m}" for m in HIST_METRICS]
-    data["missing_prev"] = data[last1_cols].isna().any(axis=1).astype(int)
-    return data
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
 
 # -------------------
 # Modeling
 # -------------------
-BASES = ["gls_per90","ast_per90","sot_per90","sca_per90",
-         "tklint_per90","blocks_per90","prgp_per90","prgc_per90","prgr_per90","avg_age_mwa"]
-
-TREND_FEATURES = [f"trend_{m}" for m in BASES] + ["trend_team_minutes"]
-NON_TREND_NUMS = (
-    [f"last1_{m}" for m in BASES] +
-    [f"expw_{m}"  for m in BASES] +
-    ["last1_team_minutes","expw_team_minutes","history_len","promoted","missing_prev"]
-)
-NUM_FEATURES = NON_TREND_NUMS + TREND_FEATURES
-
-def ridge_pipeline():
+def ridge_pipeline(alpha: float = 3.0, seed: int = RANDOM_SEED):
     return Pipeline([
         ("prep", ColumnTransformer(
             transformers=[
@@ -318,10 +196,15 @@ def ridge_pipeline():
             ],
             remainder="drop",
         )),
-        ("mdl", Ridge(alpha=3.0, random_state=42)),
+        ("mdl", Ridge(alpha=alpha, random_state=seed)),
     ])
 
-def xgb_pipeline():
+def xgb_pipeline(seed: int = RANDOM_SEED, n_jobs: int = 4, **params):
+    xgb_params = dict(
+        n_estimators=400, max_depth=4, learning_rate=0.07,
+        subsample=0.9, colsample_bytree=0.8, reg_lambda=1.0,
+    )
+    xgb_params.update(params)
     return Pipeline([
         ("prep", ColumnTransformer(
             transformers=[
@@ -330,13 +213,21 @@ def xgb_pipeline():
             ],
             remainder="drop",
         )),
-        ("mdl", XGBRegressor(
-            n_estimators=400, max_depth=4, learning_rate=0.07,
-            subsample=0.9, colsample_bytree=0.8, reg_lambda=1.0,
-            random_state=42, n_jobs=4, tree_method="hist",
-        )),
+        ("mdl", XGBRegressor(**xgb_params, random_state=seed, n_jobs=n_jobs, tree_method="hist")),
     ])
 
+def make_pipeline(model: str, params: dict, seed: int, n_jobs: int = 4):
+    if model == "ridge":
+        return ridge_pipeline(seed=seed, **params)
+    if model == "xgb":
+        return xgb_pipeline(seed=seed, n_jobs=n_jobs, **params)
+    raise ValueError(f"Unknown model {model!r}; expected one of {sorted(PARAM_GRID)}")
+
+def task_seed(league: str, model: str, params: dict) -> int:
+    """Seed for one configuration: the same in every fold and in the refit, whatever process runs it."""
+    key = json.dumps([league, model, params], sort_keys=True)
+    return (RANDOM_SEED + zlib.crc32(key.encode())) % 2**31
+
 @dataclass
 class Metrics:
     mae: float
@@ -349,85 +240,156 @@ def eval_metrics(y_true, y_pred) -> Metrics:
     rho = spearmanr(y_true, y_pred, nan_policy="omit").statistic
     return Metrics(mae, rmse, rho)
 
-def run_cv_and_select(X: pd.DataFrame, y: pd.Series):
-    results = []
-    for fold in CV_FOLDS:
-        tr_seasons, val_season = fold["train"], fold["val"]
-        tr_idx = X["Season"].isin(tr_seasons).values
-        va_idx = X["Season"] == val_season
-
-        Xtr, ytr = X.loc[tr_idx, :], y.loc[tr_idx]
-        Xva, yva = X.loc[va_idx, :], y.loc[va_idx]
-
-        models = {
-            "ridge": ridge_pipeline(),
-            "xgb": xgb_pipeline(),
-        }
-        for name, pipe in models.items():
-            pipe.fit(Xtr, ytr)
-            pred = pipe.predict(Xva)
-            m = eval_metrics(yva, pred)
-            results.append({"model": name, "fold": val_season, **m.__dict__})
-            print(f"[CV] {name} → {val_season}: MAE={m.mae:.2f}  RMSE={m.rmse:.2f}  ρ={m.spearman:.3f}")
-
-    dfres = pd.DataFrame(results)
-    best_name = dfres.groupby("model")["mae"].mean().sort_values().index[0]
-    print("\nBest by mean CV MAE:", best_name)
-    return best_name, dfres
-
-def refit_and_test(best_name: str, data: pd.DataFrame):
+# -------------------
+# Grid runner (leagues x models x hyperparameters x folds, across processes)
+# -------------------
+def build_datasets(leagues: List[str]) -> dict[str, pd.DataFrame]:
+    """Each league's modelling table, built once and shared by every fit."""
+    datasets = {}
+    for league in leagues:
+        data = build_team_season_dataset_multi(league)
+        if data.empty:
+            raise SystemExit(f"No data built for {league}. Check your input CSV paths and team files.")
+        cols = ["Season","Squad","points"] + NUM_FEATURES
+        for c in cols:
+            if c not in data.columns:
+                data[c] = np.nan
+        datasets[league] = data[cols].reset_index(drop=True)
+    return datasets
+
+def expand_grid(leagues: List[str], models: List[str]) -> List[dict]:
+    return [
+        {"league": league, "model": model, "params": params, "train": fold["train"], "val": fold["val"]}
+        for league in leagues
+        for model in models
+        for params in PARAM_GRID[model]
+        for fold in CV_FOLDS
+    ]
+
+# Set in every worker by _init_worker: the datasets and the threads each XGB fit may use
+_DATASETS: dict[str, pd.DataFrame] = {}
+_MODEL_THREADS = 4
+
+def _init_worker(datasets: dict[str, pd.DataFrame], model_threads: int) -> None:
+    global _DATASETS, _MODEL_THREADS
+    _DATASETS, _MODEL_THREADS = datasets, model_threads
+
+def run_cv_task(task: dict) -> dict:
+    data = _DATASETS[task["league"]]
+    tr_idx = data["Season"].isin(task["train"]).to_numpy()
+    va_idx = (data["Season"] == task["val"]).to_numpy()
+    seed = task_seed(task["league"], task["model"], task["params"])
+
+    t0 = time.perf_counter()
+    pipe = make_pipeline(task["model"], task["params"], seed, _MODEL_THREADS)
+    pipe.fit(data.loc[tr_idx], data.loc[tr_idx, "points"])
+    m = eval_metrics(data.loc[va_idx, "points"], pipe.predict(data.loc[va_idx]))
+    return {
+        "league": task["league"],
+        "model": task["model"],
+        "params": json.dumps(task["params"], sort_keys=True),
+        "fold": task["val"],
+        "train_seasons": ",".join(task["train"]),
+        "n_train": int(tr_idx.sum()),
+        "n_val": int(va_idx.sum()),
+        "seed": seed,
+        **m.__dict__,
+        "fit_seconds": time.perf_counter() - t0,
+    }
+
+def run_parallel(fn, items: list, datasets: dict[str, pd.DataFrame], jobs: int) -> list:
+    """``fn`` over ``items`` in ``jobs`` processes, results in input order."""
+    if jobs == 1:
+        _init_worker(datasets, 4)
+        return [fn(it) for it in items]
+    # one thread per XGB fit so the pool, not the model, uses the cores
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(datasets, 1)) as ex:
+        return list(ex.map(fn, items))
+
+def select_best(cv: pd.DataFrame) -> pd.DataFrame:
+    """Per league, the (model, params) with the lowest mean validation MAE (ties: first in grid order)."""
+    mean = (cv.groupby(["league", "model", "params"], sort=False)[["mae", "rmse", "spearman"]]
+              .mean().reset_index())
+    return mean.loc[mean.groupby("league", sort=False)["mae"].idxmin()].reset_index(drop=True)
+
+def refit_and_test(best: dict) -> dict:
+    """Fit ``best`` (league, model, params) on every season before TEST_SEASON, test, and save the artifacts."""
+    league, best_name, params = best["league"], best["model"], json.loads(best["params"])
+    data = _DATASETS[league]
+    out_dir = models_dir(league)
+    out_dir.mkdir(parents=True, exist_ok=True)
 
     train_idx = data["Season"] != TEST_SEASON
     test_idx = data["Season"] == TEST_SEASON
     Xtr, ytr = data.loc[train_idx, :], data.loc[train_idx, "points"]
     Xte, yte = data.loc[test_idx, :], data.loc[test_idx, "points"]
 
-    pipe = ridge_pipeline() if best_name == "ridge" else xgb_pipeline()
+    seed = task_seed(league, best_name, params)
+    pipe = make_pipeline(best_name, params, seed, _MODEL_THREADS)
     pipe.fit(Xtr, ytr)
     yhat = pipe.predict(Xte)
 
     m = eval_metrics(yte, yhat)
-    print(f"\n[TEST {TEST_SEASON}] {best_name}: MAE={m.mae:.2f}  RMSE={m.rmse:.2f}  ρ={m.spearman:.3f}")
+    print(f"[TEST {league} {TEST_SEASON}] {best_name} {best['params']}: MAE={m.mae:.2f}  RMSE={m.rmse:.2f}  ρ={m.spearman:.3f}")
 
-    joblib.dump(pipe, MODELS_DIR / "pipeline.joblib")
+    joblib.dump(pipe, out_dir / "pipeline.joblib")
 
     meta = {
+        "league": LEAGUES[league],
         "model": best_name,
+        "params": params,
+        "seed": seed,
         "cv_folds": CV_FOLDS,
         "test_season": TEST_SEASON,
         "metrics": {"test_mae": m.mae, "test_rmse": m.rmse, "test_spearman": m.spearman},
         "features": {"numeric": NUM_FEATURES},
     }
-    (MODELS_DIR / "metadata.json").write_text(json.dumps(meta, indent=2))
+    (out_dir / "metadata.json").write_text(json.dumps(meta, indent=2))
 
-    schema = {
-        "raw_columns": ["Season","Squad","points"] + NUM_FEATURES,
-        "note": "ColumnTransformer selects features by name; keep names stable at inference.",
-    }
-    (MODELS_DIR / "columns.json").write_text(json.dumps(schema, indent=2))
+    FeatureSchema(tuple(NUM_FEATURES)).write(out_dir / "columns.json")
 
     out = pd.DataFrame({"Squad": Xte["Squad"], "Season": Xte["Season"], "actual": yte, "pred": yhat})
-    out.sort_values("actual", ascending=False).to_csv(MODELS_DIR / f"pred_vs_actual_{TEST_SEASON}.csv", index=False)
-    print(f"Saved artifacts in {MODELS_DIR.resolve()}")
+    out.sort_values("actual", ascending=False).to_csv(out_dir / f"pred_vs_actual_{TEST_SEASON}.csv", index=False)
+    return {"league": league, "rows": len(data), "model": best_name, "params": best["params"],
+            "cv_mae": best["mae"], "test_mae": m.mae, "test_rmse": m.rmse, "test_spearman": m.spearman}
 
 # -------------------
 # Entry
 # -------------------
-def main():
-    data = build_team_season_dataset_multi()
-    if data.empty:
-        raise SystemExit("No data built. Check your input CSV paths and targets.csv.")
-
-    cols = ["Season","Squad","points"] + NUM_FEATURES
-    for c in cols:
-        if c not in data.columns:
-            data[c] = np.nan
-    data = data[cols].reset_index(drop=True)
-
-    best_name, dfres = run_cv_and_select(data, data["points"])
-    dfres.to_csv(MODELS_DIR / "cv_results.csv", index=False)
-
-    refit_and_test(best_name, data)
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Cross-validate a model grid and train one points pipeline per league.")
+    ap.add_argument("--leagues", nargs="+", default=list(LEAGUES),
+                    help=f"league slugs or names (default: all of {', '.join(LEAGUES)})")
+    ap.add_argument("--models", nargs="+", default=list(PARAM_GRID), choices=list(PARAM_GRID),
+                    help="model families to cross-validate (default: all)")
+    ap.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--cv-only", action="store_true", help="write cv_results.csv without refitting pipelines")
+    args = ap.parse_args(argv)
+    leagues = list(dict.fromkeys(league_slug(l) for l in args.leagues))
+
+    datasets = build_datasets(leagues)
+    tasks = expand_grid(leagues, args.models)
+    jobs = max(1, min(args.jobs or os.cpu_count() or 1, len(tasks)))
+    print(f"{len(tasks)} CV fits ({len(leagues)} leagues x {sum(len(PARAM_GRID[m]) for m in args.models)} "
+          f"configurations x {len(CV_FOLDS)} folds) on {jobs} processes")
+
+    t0 = time.perf_counter()
+    cv = pd.DataFrame(run_parallel(run_cv_task, tasks, datasets, jobs))
+    print(f"CV done in {time.perf_counter() - t0:.1f}s")
+    MODELS_ROOT.mkdir(parents=True, exist_ok=True)
+    cv.to_csv(MODELS_ROOT / "cv_results.csv", index=False)
+    for league, g in cv.groupby("league", sort=False):
+        models_dir(league).mkdir(parents=True, exist_ok=True)
+        g.to_csv(models_dir(league) / "cv_results.csv", index=False)
+
+    best = select_best(cv)
+    print("\nBest by mean CV MAE:\n" + best.to_string(index=False))
+    if args.cv_only:
+        return
+
+    results = run_parallel(refit_and_test, best.to_dict("records"), datasets, min(jobs, len(best)))
+    print("\n" + pd.DataFrame(results).to_string(index=False))
+    print(f"Saved artifacts in {MODELS_ROOT.resolve()}/<league>/")
 
 if __name__ == "__main__":
     main()
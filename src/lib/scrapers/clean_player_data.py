@@ -1,7 +1,15 @@
 import os
 import re
+import sys
 import pandas as pd
 from io import StringIO
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parents[3]
+if str(_ROOT) not in sys.path:
+    sys.path.append(str(_ROOT))
+
+from src.lib.columnar import convert
 
 CORE_FEATURES = [
     # Identity / context
@@ -213,4 +221,5 @@ if __name__ == "__main__":
     cleaned = load_and_clean(in_csv, season="2024-2025")
     out_csv = os.path.join(out_dir, "fbref_clean_2024_2025.csv")
     cleaned.to_csv(out_csv, index=False)
-    print(f" Saved cleaned file: {out_csv} (shape={cleaned.shape})")
+    convert(out_csv)
+    print(f" Saved cleaned file: {out_csv} (+ .parquet, shape={cleaned.shape})")
@@ -1,9 +1,18 @@
 import os
 import re
+import sys
 import glob
 import argparse
+from pathlib import Path
+
 import pandas as pd
 
+_ROOT = Path(__file__).resolve().parents[3]
+if str(_ROOT) not in sys.path:
+    sys.path.append(str(_ROOT))
+
+from src.lib.columnar import convert
+
 KEEP_SCHEMA = [
     # identity
     "Squad", "Comp", "Season",
@@ -145,7 +154,8 @@ def main():
         out_name = base.replace("_team_merged.csv", "_team_clean.csv")
         out_path = os.path.join(args.out_dir, out_name)
         df_clean.to_csv(out_path, index=False)
-        print(f"  → saved {out_path} ({len(df_clean)} rows, {len(df_clean.columns)} cols)")
+        convert(out_path)
+        print(f"  → saved {out_path} (+ .parquet, {len(df_clean)} rows, {len(df_clean.columns)} cols)")
 
 if __name__ == "__main__":
     main()
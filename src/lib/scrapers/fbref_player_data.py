@@ -1,11 +1,19 @@
 import os
+import sys
 import time
 from io import StringIO
+from pathlib import Path
 
 import pandas as pd
 import requests
 from bs4 import BeautifulSoup, Comment
 
+_ROOT = Path(__file__).resolve().parents[3]
+if str(_ROOT) not in sys.path:
+    sys.path.append(str(_ROOT))
+
+from src.lib.columnar import convert
+
 table_types = {
     "standard": "stats",
     "shooting": "shooting",
@@ -136,7 +144,8 @@ def collect_season_player_stats(season: str, save_csv: bool = True):
         os.makedirs(out_dir, exist_ok=True)
         out_path = os.path.join(out_dir, f"fbref_merged_{season.replace('-', '_')}.csv")
         merged_df.to_csv(out_path, index=False)
-        print(f" Saved merged stats to {out_path}")
+        convert(out_path)   # Parquet sidecar, read back from the CSV so headers match what loaders see
+        print(f" Saved merged stats to {out_path} (+ .parquet)")
 
     return merged_df
 
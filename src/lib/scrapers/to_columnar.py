@@ -0,0 +1,35 @@
+import argparse
+import glob
+import sys
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parents[3]
+if str(_ROOT) not in sys.path:
+    sys.path.append(str(_ROOT))
+
+from src.lib.columnar import columnar_path, convert, pq
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Write Parquet sidecars for existing season CSVs.")
+    ap.add_argument("--glob", default="../data/*.csv", help="Input glob, e.g. ../data/fbref_merged_*.csv")
+    ap.add_argument("--force", action="store_true", help="Rebuild sidecars that are already up to date")
+    args = ap.parse_args()
+
+    if pq is None:
+        raise SystemExit("pyarrow is required: pip install pyarrow")
+
+    paths = sorted(glob.glob(args.glob))
+    if not paths:
+        print(f"No files matched: {args.glob}")
+        return
+
+    for p in paths:
+        out = columnar_path(p)
+        if not args.force and out.exists() and out.stat().st_mtime >= Path(p).stat().st_mtime:
+            continue
+        convert(p)
+        print(f"  → saved {out} ({out.stat().st_size / Path(p).stat().st_size:.0%} of CSV size)")
+
+if __name__ == "__main__":
+    main()